@@ -1,44 +1,96 @@
-from collections.abc import Iterable
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from itertools import groupby
 
 from django.core.cache import cache
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, QuerySet
 
 from trcustoms.awards.models import UserAward
+from trcustoms.awards.requirements.base import BaseAwardRequirement
 from trcustoms.awards.specs import ALL_AWARD_SPECS
 from trcustoms.awards.specs.base import AwardSpec
 from trcustoms.users.models import User
 
+AWARD_STATS_CACHE_KEY = "award_stats"
 
-def update_award_stats(award_code: str, tier: int) -> int:
-    awarded = User.objects.filter(
-        awards__code=award_code, awards__tier=tier
-    ).count()
-    total = User.objects.count()
-    rarity = min(100, 100 - ((awarded - 1) / total) * 100)
-    user_percentage = awarded * 100 / total
-    cache.set(f"award_rarity__{award_code}_{tier}", rarity)
-    cache.set(f"award_user_percentage__{award_code}_{tier}", user_percentage)
-    return rarity
+
+@dataclass
+class AwardStats:
+    rarity: float
+    user_percentage: float
+
+
+def calculate_award_stats(awarded: int, total: int) -> AwardStats:
+    if not total:
+        return AwardStats(rarity=100, user_percentage=0)
+    return AwardStats(
+        rarity=min(100, 100 - ((awarded - 1) / total) * 100),
+        user_percentage=awarded * 100 / total,
+    )
 
 
-def update_all_awards_stats() -> None:
+def update_all_awards_stats() -> dict[tuple[str, int], AwardStats]:
+    """Recalculate the rarity table of all awards and store it in cache.
+
+    The number of recipients of every (code, tier) pair comes from a single
+    grouped query.
+    """
+    total = User.objects.count()
+    awarded = {
+        (code, tier): count
+        for code, tier, count in UserAward.objects.order_by()
+        .values("code", "tier")
+        .annotate(count=Count("pk"))
+        .values_list("code", "tier", "count")
+    }
     for spec in ALL_AWARD_SPECS:
-        update_award_stats(spec.code, spec.tier)
+        awarded.setdefault((spec.code, spec.tier), 0)
 
+    all_stats = {
+        key: calculate_award_stats(count, total)
+        for key, count in awarded.items()
+    }
+    cache.set(AWARD_STATS_CACHE_KEY, all_stats, timeout=None)
+    return all_stats
 
-def get_award_rarity(award_code: str, tier: int) -> int:
-    rarity = cache.get(f"award_rarity__{award_code}_{tier}")
-    if rarity is None:
-        rarity = update_award_stats(award_code, tier)
-    return rarity
 
+def get_all_awards_stats() -> dict[tuple[str, int], AwardStats]:
+    all_stats = cache.get(AWARD_STATS_CACHE_KEY)
+    if all_stats is None:
+        all_stats = update_all_awards_stats()
+    return all_stats
 
-def get_award_user_percentage(award_code: str, tier: int) -> int:
-    user_percentage = cache.get(f"award_user_percentage__{award_code}_{tier}")
-    if user_percentage is None:
-        user_percentage = update_award_stats(award_code, tier)
-    return user_percentage
+
+def get_award_stats(
+    award_code: str,
+    tier: int,
+    all_stats: dict[tuple[str, int], AwardStats] | None = None,
+) -> AwardStats:
+    if all_stats is None:
+        all_stats = get_all_awards_stats()
+    if (stats := all_stats.get((award_code, tier))) is None:
+        stats = update_award_stats(award_code, tier)
+    return stats
+
+
+def update_award_stats(award_code: str, tier: int) -> AwardStats:
+    awarded = UserAward.objects.filter(code=award_code, tier=tier).count()
+    stats = calculate_award_stats(awarded, User.objects.count())
+    all_stats = cache.get(AWARD_STATS_CACHE_KEY)
+    if all_stats is not None:
+        all_stats[award_code, tier] = stats
+        cache.set(AWARD_STATS_CACHE_KEY, all_stats, timeout=None)
+    return stats
+
+
+def get_award_rarity(award_code: str, tier: int) -> float:
+    return get_award_stats(award_code, tier).rarity
+
+
+def get_award_user_percentage(award_code: str, tier: int) -> float:
+    return get_award_stats(award_code, tier).user_percentage
 
 
 def update_user_award_tier(
@@ -109,3 +161,97 @@ def update_awards(user: User, update_rarity: bool = True) -> None:
             if update_rarity:
                 update_award_stats(code, tier=current_tier)
                 update_award_stats(code, tier=max_eligible_tier)
+
+
+def get_eligible_user_ids(
+    requirement: Callable[[User], bool], users: QuerySet
+) -> set[int]:
+    if isinstance(requirement, BaseAwardRequirement):
+        return requirement.get_eligible_user_ids(users)
+    return {user.pk for user in users.iterator() if requirement(user)}
+
+
+def update_awards_batch(
+    users: QuerySet | None = None, update_rarity: bool = True
+) -> int:
+    """Update awards of many users at once.
+
+    Evaluates every requirement for all users with grouped queries, picks
+    the tiers in memory using the same rules as update_awards and writes
+    the differences in bulk. Returns the number of changed user awards.
+    """
+    if users is None:
+        users = User.objects.all()
+
+    user_ids = set(users.values_list("pk", flat=True))
+    user_awards = {
+        (user_id, code): tier
+        for user_id, code, tier in UserAward.objects.filter(
+            user__in=users
+        ).values_list("user_id", "code", "tier")
+    }
+
+    awards_to_save: list[UserAward] = []
+    awards_to_delete: dict[str, list[int]] = defaultdict(list)
+
+    for code, group in groupby(ALL_AWARD_SPECS, lambda spec: spec.code):
+        group = list(group)
+        can_be_removed = any(spec.can_be_removed for spec in group)
+        eligible_user_ids = [
+            get_eligible_user_ids(spec.requirement, users) for spec in group
+        ]
+
+        for user_id in user_ids:
+            current_tier = user_awards.get((user_id, code), -1)
+            max_eligible_spec = max(
+                (
+                    spec
+                    for spec, spec_user_ids in zip(group, eligible_user_ids)
+                    if user_id in spec_user_ids
+                ),
+                key=lambda spec: spec.tier,
+                default=None,
+            )
+            max_eligible_tier = (
+                max_eligible_spec.tier if max_eligible_spec else -1
+            )
+
+            if max_eligible_tier > current_tier or (
+                max_eligible_tier < current_tier and can_be_removed
+            ):
+                if max_eligible_spec:
+                    awards_to_save.append(
+                        UserAward(
+                            user_id=user_id,
+                            code=max_eligible_spec.code,
+                            tier=max_eligible_spec.tier,
+                            title=max_eligible_spec.title,
+                            position=ALL_AWARD_SPECS.index(max_eligible_spec),
+                            description=max_eligible_spec.description,
+                        )
+                    )
+                else:
+                    awards_to_delete[code].append(user_id)
+
+    with transaction.atomic():
+        UserAward.objects.bulk_create(
+            awards_to_save,
+            update_conflicts=True,
+            unique_fields=["user", "code"],
+            update_fields=[
+                "tier",
+                "title",
+                "position",
+                "description",
+                "last_updated",
+            ],
+        )
+        for code, code_user_ids in awards_to_delete.items():
+            UserAward.objects.filter(
+                code=code, user_id__in=code_user_ids
+            ).delete()
+
+    changed = len(awards_to_save) + sum(map(len, awards_to_delete.values()))
+    if update_rarity and changed:
+        update_all_awards_stats()
+    return changed
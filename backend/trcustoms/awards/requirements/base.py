@@ -1,5 +1,7 @@
 import operator
 
+from django.db.models import QuerySet
+
 from trcustoms.users.models import User
 
 
@@ -7,6 +9,16 @@ class BaseAwardRequirement:
     def check_eligible(self, user: User) -> bool:
         raise NotImplementedError("not implemented")
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        """Return the ids of the given users that meet this requirement.
+
+        The default implementation checks the users one by one; subclasses
+        override it with grouped queries that evaluate everyone at once.
+        """
+        return {
+            user.pk for user in users.iterator() if self.check_eligible(user)
+        }
+
     def __call__(self, user: User) -> bool:
         return self.check_eligible(user)
 
@@ -28,6 +40,14 @@ class IsUnaryFunctor(BaseAwardRequirement):
     def check_eligible(self, user: User) -> bool:
         return self.func(self.lhs.check_eligible(user))
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        lhs_ids = self.lhs.get_eligible_user_ids(users)
+        return {
+            user_id
+            for user_id in users.values_list("pk", flat=True)
+            if self.func(user_id in lhs_ids)
+        }
+
 
 class IsBinaryFunctor(BaseAwardRequirement):
     def __init__(self, lhs, rhs, func):
@@ -40,3 +60,16 @@ class IsBinaryFunctor(BaseAwardRequirement):
             self.lhs.check_eligible(user),
             self.rhs.check_eligible(user),
         )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        lhs_ids = self.lhs.get_eligible_user_ids(users)
+        rhs_ids = self.rhs.get_eligible_user_ids(users)
+        if self.func is operator.and_:
+            return lhs_ids & rhs_ids
+        if self.func is operator.or_:
+            return lhs_ids | rhs_ids
+        return {
+            user_id
+            for user_id in users.values_list("pk", flat=True)
+            if self.func(user_id in lhs_ids, user_id in rhs_ids)
+        }
@@ -1,12 +1,42 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
+from collections.abc import Iterable
 from datetime import date, datetime, timedelta
 
-from django.db.models import Count, F
+from django.db.models import Aggregate, Count, F, QuerySet
 
 from trcustoms.awards.requirements.base import BaseAwardRequirement
+from trcustoms.levels.models import Level
 from trcustoms.playlists.models import PlaylistItem
+from trcustoms.reviews.models import Review
 from trcustoms.users.models import User
 from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
+from trcustoms.walkthroughs.models import Walkthrough
+
+
+def get_authorships(users: QuerySet) -> QuerySet:
+    return Level.authors.through.objects.filter(
+        user__in=users, level__is_approved=True
+    )
+
+
+def get_user_ids_with_min_count(
+    users: QuerySet,
+    queryset: QuerySet,
+    user_field: str,
+    min_count: int,
+    count: Aggregate | None = None,
+) -> set[int]:
+    """Return ids of users that have at least min_count rows in queryset."""
+    if min_count <= 0:
+        return set(users.values_list("pk", flat=True))
+    return set(
+        queryset.filter(**{f"{user_field}__in": users})
+        .order_by()
+        .values(user_field)
+        .annotate(total=count or Count("pk"))
+        .filter(total__gte=min_count)
+        .values_list(user_field, flat=True)
+    )
 
 
 class AuthoredLevelsAwardRequirement(BaseAwardRequirement):
@@ -19,6 +49,14 @@ class AuthoredLevelsAwardRequirement(BaseAwardRequirement):
             >= self.min_levels
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users,
+            Level.authors.through.objects.filter(level__is_approved=True),
+            "user",
+            self.min_levels,
+        )
+
 
 class AuthoredLevelsRatingCountRequirement(BaseAwardRequirement):
     def __init__(
@@ -32,10 +70,27 @@ class AuthoredLevelsRatingCountRequirement(BaseAwardRequirement):
         self.extrapolate_ratings = extrapolate_ratings
 
     def check_eligible(self, user: User) -> bool:
+        return self.check_positions(
+            user.authored_levels.filter(is_approved=True).values_list(
+                "rating_class__position", flat=True
+            )
+        )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        positions = defaultdict(list)
+        for user_id, rating_class_position in get_authorships(
+            users
+        ).values_list("user_id", "level__rating_class__position"):
+            positions[user_id].append(rating_class_position)
+        return {
+            user_id
+            for user_id in users.values_list("pk", flat=True)
+            if self.check_positions(positions[user_id])
+        }
+
+    def check_positions(self, rating_class_positions: Iterable[int]) -> bool:
         authored_level_rating_counts = defaultdict(int)
-        for rating_class_position in user.authored_levels.filter(
-            is_approved=True
-        ).values_list("rating_class__position", flat=True):
+        for rating_class_position in rating_class_positions:
             if rating_class_position is None:
                 rating_class_position = -1
             if self.extrapolate_ratings:
@@ -63,6 +118,15 @@ class AuthoredLevelPlayersAwardRequirement(BaseAwardRequirement):
         )
         return players >= self.min_players
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users,
+            Level.authors.through.objects.filter(level__is_approved=True),
+            "user",
+            self.min_players,
+            count=Count("level__playlist_items__user", distinct=True),
+        )
+
 
 class AuthoredLevelsTagCountRequirement(BaseAwardRequirement):
     def __init__(self, min_levels: int, min_tags: int) -> None:
@@ -80,6 +144,21 @@ class AuthoredLevelsTagCountRequirement(BaseAwardRequirement):
             >= self.min_levels
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        if self.min_levels <= 0:
+            return set(users.values_list("pk", flat=True))
+        level_counts = Counter(
+            get_authorships(users)
+            .annotate(tag_count=Count("level__tags"))
+            .filter(tag_count__gte=self.min_tags)
+            .values_list("user_id", flat=True)
+        )
+        return {
+            user_id
+            for user_id, level_count in level_counts.items()
+            if level_count >= self.min_levels
+        }
+
 
 class AuthoredLevelsSustainableQualityRequirement(BaseAwardRequirement):
     def __init__(
@@ -93,12 +172,29 @@ class AuthoredLevelsSustainableQualityRequirement(BaseAwardRequirement):
     def check_eligible(self, user: User) -> bool:
         # User has released two approved levels that are less than
         # max_time_apart and achieved min_rating_class (at any time)
-        good_level_creation_times = sorted(
+        return self.check_creation_times(
             user.authored_levels.filter(
                 is_approved=True,
                 rating_class__position__gte=self.min_rating_class,
             ).values_list("created", flat=True)
         )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        creation_times = defaultdict(list)
+        for user_id, created in (
+            get_authorships(users)
+            .filter(level__rating_class__position__gte=self.min_rating_class)
+            .values_list("user_id", "level__created")
+        ):
+            creation_times[user_id].append(created)
+        return {
+            user_id
+            for user_id, times in creation_times.items()
+            if self.check_creation_times(times)
+        }
+
+    def check_creation_times(self, creation_times: Iterable[datetime]) -> bool:
+        good_level_creation_times = sorted(creation_times)
         return any(
             time2 - time1 <= self.max_time_apart
             for time1, time2 in zip(
@@ -114,11 +210,26 @@ class AuthoredLevelsFarApartRequirement(BaseAwardRequirement):
     def check_eligible(self, user: User) -> bool:
         # User has released two approved levels that are more than
         # min_time_apart
-        good_level_creation_times = sorted(
+        return self.check_creation_times(
             user.authored_levels.filter(
                 is_approved=True,
             ).values_list("created", flat=True)
         )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        creation_times = defaultdict(list)
+        for user_id, created in get_authorships(users).values_list(
+            "user_id", "level__created"
+        ):
+            creation_times[user_id].append(created)
+        return {
+            user_id
+            for user_id, times in creation_times.items()
+            if self.check_creation_times(times)
+        }
+
+    def check_creation_times(self, creation_times: Iterable[datetime]) -> bool:
+        good_level_creation_times = sorted(creation_times)
         return any(
             time2 - time1 >= self.min_time_apart
             for time1, time2 in zip(
@@ -137,14 +248,26 @@ class AuthoredWalkthroughsAwardRequirement(BaseAwardRequirement):
         self.walkthrough_type = walkthrough_type
 
     def check_eligible(self, user: User) -> bool:
-        queryset = user.authored_walkthroughs.filter(
-            status=WalkthroughStatus.APPROVED
+        return (
+            self.filter_walkthroughs(user.authored_walkthroughs).count()
+            >= self.min_walkthroughs
         )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users,
+            self.filter_walkthroughs(Walkthrough.objects),
+            "author",
+            self.min_walkthroughs,
+        )
+
+    def filter_walkthroughs(self, queryset: QuerySet) -> QuerySet:
+        queryset = queryset.filter(status=WalkthroughStatus.APPROVED)
         if self.walkthrough_type is not None:
             queryset = queryset.filter(
                 walkthrough_type=self.walkthrough_type,
             )
-        return queryset.count() >= self.min_walkthroughs
+        return queryset
 
 
 class EarlyLevelsEditedAwardRequirement(BaseAwardRequirement):
@@ -163,6 +286,16 @@ class EarlyLevelsEditedAwardRequirement(BaseAwardRequirement):
             and not all_early_levels.filter(genres=None).exists()
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        all_early_levels = get_authorships(users).filter(
+            level__created__lte=self.max_date
+        )
+        return set(all_early_levels.values_list("user_id", flat=True)) - set(
+            all_early_levels.filter(level__genres=None).values_list(
+                "user_id", flat=True
+            )
+        )
+
 
 class JoinDateAwardRequirement(BaseAwardRequirement):
     def __init__(self, min_date: date, max_date: date) -> None:
@@ -180,6 +313,16 @@ class JoinDateAwardRequirement(BaseAwardRequirement):
             and user.date_joined.date() <= self.max_date
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return set(
+            users.filter(
+                is_active=True,
+                is_banned=False,
+                date_joined__date__gte=self.min_date,
+                date_joined__date__lte=self.max_date,
+            ).values_list("pk", flat=True)
+        )
+
 
 class AuthoredReviewsAwardRequirement(BaseAwardRequirement):
     def __init__(self, min_reviews: int) -> None:
@@ -188,6 +331,11 @@ class AuthoredReviewsAwardRequirement(BaseAwardRequirement):
     def check_eligible(self, user: User) -> bool:
         return user.reviewed_levels.count() >= self.min_reviews
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users, Review.objects, "author", self.min_reviews
+        )
+
 
 class AuthoredReviewsEarlyAgeAwardRequirement(BaseAwardRequirement):
     def __init__(
@@ -210,6 +358,11 @@ class AuthoredReviewsEarlyAgeAwardRequirement(BaseAwardRequirement):
             user
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return self.req1.get_eligible_user_ids(
+            users
+        ) & self.req2.get_eligible_user_ids(users)
+
 
 class AuthoredReviewsTimingAwardRequirement(BaseAwardRequirement):
     def __init__(self, min_levels: int, max_review_age: timedelta) -> None:
@@ -218,14 +371,23 @@ class AuthoredReviewsTimingAwardRequirement(BaseAwardRequirement):
 
     def check_eligible(self, user: User) -> bool:
         return (
-            user.reviewed_levels.annotate(
-                age=F("created") - F("level__created")
-            )
-            .filter(age__lte=self.max_review_age)
-            .count()
+            self.filter_reviews(user.reviewed_levels).count()
             >= self.min_levels
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users,
+            self.filter_reviews(Review.objects),
+            "author",
+            self.min_levels,
+        )
+
+    def filter_reviews(self, queryset: QuerySet) -> QuerySet:
+        return queryset.annotate(
+            age=F("created") - F("level__created")
+        ).filter(age__lte=self.max_review_age)
+
 
 class AuthoredReviewsPositionAwardRequirement(BaseAwardRequirement):
     def __init__(
@@ -239,12 +401,25 @@ class AuthoredReviewsPositionAwardRequirement(BaseAwardRequirement):
         self.min_reviews = min_reviews
 
     def check_eligible(self, user: User) -> bool:
-        queryset = user.reviewed_levels
+        return (
+            self.filter_reviews(user.reviewed_levels).count()
+            >= self.min_reviews
+        )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users,
+            self.filter_reviews(Review.objects),
+            "author",
+            self.min_reviews,
+        )
+
+    def filter_reviews(self, queryset: QuerySet) -> QuerySet:
         if self.min_position is not None:
             queryset = queryset.filter(position__gte=self.min_position)
         if self.max_position is not None:
             queryset = queryset.filter(position__lte=self.max_position)
-        return queryset.count() >= self.min_reviews
+        return queryset
 
 
 class AuthoredReviewsSameBuilderAwardRequirement(BaseAwardRequirement):
@@ -259,6 +434,18 @@ class AuthoredReviewsSameBuilderAwardRequirement(BaseAwardRequirement):
             .exists()
         )
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return set(
+            Review.objects.filter(
+                author__in=users, level__authors__isnull=False
+            )
+            .order_by()
+            .values("author", "level__authors")
+            .annotate(total=Count("pk"))
+            .filter(total__gte=self.min_reviews)
+            .values_list("author", flat=True)
+        )
+
 
 class PlayedLevelsAwardRequirement(BaseAwardRequirement):
     def __init__(self, min_levels: int) -> None:
@@ -267,6 +454,11 @@ class PlayedLevelsAwardRequirement(BaseAwardRequirement):
     def check_eligible(self, user: User) -> bool:
         return user.playlist_items.finished().count() >= self.min_levels
 
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users, PlaylistItem.objects.finished(), "user", self.min_levels
+        )
+
 
 class PlayedLevelsWithRatingAwardRequirement(BaseAwardRequirement):
     def __init__(
@@ -280,7 +472,21 @@ class PlayedLevelsWithRatingAwardRequirement(BaseAwardRequirement):
         self.max_rating = max_rating
 
     def check_eligible(self, user: User) -> bool:
-        queryset = user.playlist_items.played()
+        return (
+            self.filter_playlist_items(user.playlist_items).count()
+            >= self.min_levels
+        )
+
+    def get_eligible_user_ids(self, users: QuerySet) -> set[int]:
+        return get_user_ids_with_min_count(
+            users,
+            self.filter_playlist_items(PlaylistItem.objects),
+            "user",
+            self.min_levels,
+        )
+
+    def filter_playlist_items(self, queryset: QuerySet) -> QuerySet:
+        queryset = queryset.played()
         if self.max_rating is not None:
             queryset = queryset.filter(
                 level__rating_class__position__lte=self.max_rating
@@ -289,4 +495,4 @@ class PlayedLevelsWithRatingAwardRequirement(BaseAwardRequirement):
             queryset = queryset.filter(
                 level__rating_class__position__gte=self.min_rating
             )
-        return queryset.count() >= self.min_levels
+        return queryset
@@ -1,8 +1,13 @@
 from datetime import datetime
 
+from django.utils.functional import cached_property
 from rest_framework import serializers
 
-from trcustoms.awards.logic import get_award_rarity, get_award_user_percentage
+from trcustoms.awards.logic import (
+    AwardStats,
+    get_all_awards_stats,
+    get_award_stats,
+)
 from trcustoms.awards.models import UserAward
 from trcustoms.users.serializers import UserNestedSerializer
 
@@ -17,14 +22,20 @@ class AwardSpecSerializer(serializers.Serializer):
     rarity = serializers.SerializerMethodField()
     user_percentage = serializers.SerializerMethodField()
 
+    @cached_property
+    def awards_stats(self) -> dict[tuple[str, int], AwardStats]:
+        return get_all_awards_stats()
+
     def get_guide_description(self, obj):
         return obj.guide_description
 
     def get_rarity(self, obj) -> int:
-        return get_award_rarity(obj.code, obj.tier)
+        return get_award_stats(obj.code, obj.tier, self.awards_stats).rarity
 
     def get_user_percentage(self, obj) -> int:
-        return get_award_user_percentage(obj.code, obj.tier)
+        return get_award_stats(
+            obj.code, obj.tier, self.awards_stats
+        ).user_percentage
 
 
 class AwardRecipientSerializer(serializers.ModelSerializer):
@@ -0,0 +1,213 @@
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from trcustoms.awards.logic import update_awards, update_awards_batch
+from trcustoms.awards.requirements.base import BaseAwardRequirement
+from trcustoms.awards.requirements.impl import (
+    AuthoredLevelPlayersAwardRequirement,
+    AuthoredLevelsAwardRequirement,
+    AuthoredLevelsFarApartRequirement,
+    AuthoredLevelsRatingCountRequirement,
+    AuthoredLevelsSustainableQualityRequirement,
+    AuthoredLevelsTagCountRequirement,
+    AuthoredReviewsAwardRequirement,
+    AuthoredReviewsEarlyAgeAwardRequirement,
+    AuthoredReviewsPositionAwardRequirement,
+    AuthoredReviewsSameBuilderAwardRequirement,
+    AuthoredReviewsTimingAwardRequirement,
+    AuthoredWalkthroughsAwardRequirement,
+    EarlyLevelsEditedAwardRequirement,
+    JoinDateAwardRequirement,
+    PlayedLevelsAwardRequirement,
+    PlayedLevelsWithRatingAwardRequirement,
+)
+from trcustoms.awards.specs import ALL_AWARD_SPECS, AwardSpec
+from trcustoms.awards.tests.factories import UserAwardFactory
+from trcustoms.common.tests.factories import RatingClassFactory
+from trcustoms.genres.tests.factories import GenreFactory
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.playlists.consts import PlaylistStatus
+from trcustoms.playlists.tests.factories import PlaylistItemFactory
+from trcustoms.reviews.tests.factories import ReviewFactory
+from trcustoms.tags.tests.factories import TagFactory
+from trcustoms.users.models import User
+from trcustoms.users.tests.factories import UserFactory
+from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
+from trcustoms.walkthroughs.tests.factories import WalkthroughFactory
+
+REQUIREMENTS: list[BaseAwardRequirement] = [
+    AuthoredLevelsAwardRequirement(min_levels=0),
+    AuthoredLevelsAwardRequirement(min_levels=2),
+    AuthoredLevelsRatingCountRequirement(
+        min_rating=1, min_levels=1, extrapolate_ratings=True
+    ),
+    AuthoredLevelsRatingCountRequirement(
+        min_rating=-1, min_levels=0, extrapolate_ratings=False
+    ),
+    AuthoredLevelPlayersAwardRequirement(min_players=2),
+    AuthoredLevelsTagCountRequirement(min_levels=1, min_tags=2),
+    AuthoredLevelsSustainableQualityRequirement(
+        min_rating_class=1, max_time_apart=timedelta(days=30)
+    ),
+    AuthoredLevelsFarApartRequirement(min_time_apart=timedelta(days=300)),
+    AuthoredWalkthroughsAwardRequirement(min_walkthroughs=1),
+    AuthoredWalkthroughsAwardRequirement(
+        min_walkthroughs=1, walkthrough_type=WalkthroughType.LINK
+    ),
+    EarlyLevelsEditedAwardRequirement(
+        max_date=datetime(2022, 4, 2, tzinfo=timezone.utc)
+    ),
+    JoinDateAwardRequirement(
+        min_date=date(2022, 4, 1), max_date=date(2023, 4, 1)
+    ),
+    AuthoredReviewsAwardRequirement(min_reviews=2),
+    AuthoredReviewsEarlyAgeAwardRequirement(
+        min_total_reviews=2, min_early_reviews=1, max_review_position=1
+    ),
+    AuthoredReviewsTimingAwardRequirement(
+        min_levels=1, max_review_age=timedelta(days=1)
+    ),
+    AuthoredReviewsPositionAwardRequirement(min_reviews=1, min_position=2),
+    AuthoredReviewsSameBuilderAwardRequirement(min_reviews=2),
+    PlayedLevelsAwardRequirement(min_levels=1),
+    PlayedLevelsWithRatingAwardRequirement(min_levels=1, min_rating=1),
+    AuthoredReviewsAwardRequirement(min_reviews=2)
+    & ~PlayedLevelsAwardRequirement(min_levels=1),
+    AuthoredLevelsAwardRequirement(min_levels=2)
+    | AuthoredWalkthroughsAwardRequirement(min_walkthroughs=1),
+]
+
+
+def set_created(obj, created: datetime) -> None:
+    type(obj).objects.filter(pk=obj.pk).update(created=created)
+
+
+@pytest.fixture(name="users")
+def fixture_users() -> list[User]:
+    builder = UserFactory(username="builder")
+    co_builder = UserFactory(username="co_builder")
+    reviewer = UserFactory(username="reviewer")
+    player = UserFactory(username="player")
+    UserFactory(username="idle", is_active=False)
+    User.objects.filter(pk=builder.pk).update(
+        date_joined=datetime(2022, 6, 1, tzinfo=timezone.utc)
+    )
+
+    good = RatingClassFactory(position=1)
+    bad = RatingClassFactory(position=0)
+    tags = [TagFactory(), TagFactory()]
+
+    level1 = LevelFactory(authors=[builder], rating_class=good, tags=tags)
+    level2 = LevelFactory(
+        authors=[builder, co_builder],
+        rating_class=good,
+        genres=[GenreFactory()],
+    )
+    level3 = LevelFactory(authors=[co_builder], rating_class=bad)
+    LevelFactory(authors=[builder], is_approved=False)
+    set_created(level1, datetime(2022, 1, 1, tzinfo=timezone.utc))
+    set_created(level2, datetime(2022, 1, 15, tzinfo=timezone.utc))
+    set_created(level3, datetime(2023, 1, 1, tzinfo=timezone.utc))
+
+    review1 = ReviewFactory(level=level1, author=reviewer, position=1)
+    ReviewFactory(level=level2, author=reviewer, position=2)
+    ReviewFactory(level=level3, author=reviewer, position=1)
+    ReviewFactory(level=level1, author=player, position=2)
+    set_created(review1, datetime(2022, 1, 1, 12, tzinfo=timezone.utc))
+
+    WalkthroughFactory(
+        level=level1,
+        author=reviewer,
+        status=WalkthroughStatus.APPROVED,
+        walkthrough_type=WalkthroughType.TEXT,
+    )
+    WalkthroughFactory(
+        level=level3,
+        author=player,
+        status=WalkthroughStatus.DRAFT,
+        walkthrough_type=WalkthroughType.LINK,
+    )
+
+    PlaylistItemFactory(
+        level=level1, user=player, status=PlaylistStatus.FINISHED
+    )
+    PlaylistItemFactory(
+        level=level2, user=reviewer, status=PlaylistStatus.PLAYING
+    )
+    PlaylistItemFactory(
+        level=level3, user=player, status=PlaylistStatus.NOT_YET_PLAYED
+    )
+    PlaylistItemFactory(
+        level=level2, user=player, status=PlaylistStatus.DROPPED
+    )
+
+    return list(User.objects.all())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "requirement",
+    REQUIREMENTS + [spec.requirement for spec in ALL_AWARD_SPECS],
+)
+def test_requirement_batch_matches_per_user_check(
+    users: list[User], requirement: BaseAwardRequirement
+) -> None:
+    expected = {user.pk for user in users if requirement(user)}
+    assert requirement.get_eligible_user_ids(User.objects.all()) == expected
+
+
+@pytest.mark.django_db
+def test_requirement_batch_respects_user_queryset(users: list[User]) -> None:
+    requirement = AuthoredReviewsAwardRequirement(min_reviews=1)
+    queryset = User.objects.exclude(username="reviewer")
+    assert requirement.get_eligible_user_ids(queryset) == {
+        user.pk for user in queryset if requirement(user)
+    }
+
+
+@pytest.mark.django_db
+def test_same_builder_requirement_ignores_authorless_levels() -> None:
+    reviewer = UserFactory(username="reviewer")
+    for _ in range(2):
+        ReviewFactory(level=LevelFactory(), author=reviewer)
+    requirement = AuthoredReviewsSameBuilderAwardRequirement(min_reviews=2)
+
+    assert not requirement(reviewer)
+    assert requirement.get_eligible_user_ids(User.objects.all()) == set()
+
+
+@pytest.mark.django_db
+def test_update_awards_batch_matches_per_user_path(users: list[User]) -> None:
+    specs = [
+        AwardSpec(
+            code=f"award_{i}",
+            title=f"Award {i}",
+            description=f"Award {i}",
+            guide_description=f"Award {i}",
+            requirement=requirement,
+            can_be_removed=True,
+        )
+        for i, requirement in enumerate(REQUIREMENTS)
+    ]
+    stale_user = User.objects.get(username="idle")
+    UserAwardFactory(user=stale_user, code="award_1", tier=0)
+
+    with patch("trcustoms.awards.logic.ALL_AWARD_SPECS", specs):
+        assert update_awards_batch(update_rarity=False) > 0
+        batch_awards = get_user_awards()
+
+        for user in User.objects.all():
+            update_awards(user, update_rarity=False)
+        assert get_user_awards() == batch_awards
+
+        assert update_awards_batch(update_rarity=False) == 0
+
+
+def get_user_awards() -> set[tuple]:
+    return {
+        (award.user_id, award.code, award.tier, award.position)
+        for user in User.objects.all()
+        for award in user.awards.all()
+    }
@@ -2,7 +2,7 @@ from unittest.mock import patch
 
 import pytest
 
-from trcustoms.awards.logic import update_awards
+from trcustoms.awards.logic import update_awards, update_awards_batch
 from trcustoms.awards.specs import AwardSpec
 from trcustoms.awards.tests.factories import UserAwardFactory
 from trcustoms.users.tests.factories import UserFactory
@@ -23,6 +23,7 @@ class DummyAwardSpec(AwardSpec):
 
 
 @pytest.mark.django_db
+@pytest.mark.parametrize("batch", [False, True])
 @pytest.mark.parametrize(
     "all_award_specs, existing_awards, expected_awards",
     [
@@ -121,12 +122,16 @@ def test_update_awards_skips_existing_higher_tier(
     all_award_specs: list[AwardSpec],
     existing_awards: list[tuple[str, int]],
     expected_awards: list[tuple[str, int]],
+    batch: bool,
 ) -> None:
     user = UserFactory()
     for existing_award_code, existing_award_tier in existing_awards:
         UserAwardFactory(code=existing_award_code, tier=existing_award_tier)
 
     with patch("trcustoms.awards.logic.ALL_AWARD_SPECS", all_award_specs):
-        update_awards(user=user, update_rarity=False)
+        if batch:
+            update_awards_batch(update_rarity=False)
+        else:
+            update_awards(user=user, update_rarity=False)
 
     assert list(user.awards.values_list("code", "tier")) == expected_awards
@@ -0,0 +1,60 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trcustoms.awards.logic import (
+    AWARD_STATS_CACHE_KEY,
+    AwardStats,
+    get_award_stats,
+    update_all_awards_stats,
+)
+from trcustoms.awards.specs import ALL_AWARD_SPECS
+from trcustoms.awards.tests.factories import UserAwardFactory
+from trcustoms.users.serializers import UserAwardSerializer
+from trcustoms.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_update_all_awards_stats() -> None:
+    users = [UserFactory(username=f"user{i}") for i in range(4)]
+    for user in users[:2]:
+        UserAwardFactory(user=user, code="foo", tier=1)
+    UserAwardFactory(user=users[2], code="foo", tier=2)
+    UserAwardFactory(user=users[2], code="bar", tier=0)
+
+    all_stats = update_all_awards_stats()
+
+    assert all_stats[("foo", 1)] == AwardStats(rarity=75, user_percentage=50)
+    assert all_stats[("foo", 2)] == AwardStats(rarity=100, user_percentage=25)
+    assert all_stats[("bar", 0)] == AwardStats(rarity=100, user_percentage=25)
+    for spec in ALL_AWARD_SPECS:
+        assert all_stats[(spec.code, spec.tier)] == AwardStats(
+            rarity=100, user_percentage=0
+        )
+
+
+@pytest.mark.django_db
+def test_get_award_stats_falls_back_for_unknown_award() -> None:
+    user = UserFactory(username="foo")
+    UserAwardFactory(user=user, code="foo", tier=1)
+    assert get_award_stats("foo", 1, all_stats={}) == AwardStats(
+        rarity=100, user_percentage=100
+    )
+
+
+@pytest.mark.django_db
+def test_user_award_serializer_reads_stats_once() -> None:
+    user = UserFactory(username="foo")
+    specs = {spec.code: spec for spec in ALL_AWARD_SPECS}.values()
+    awards = [
+        UserAwardFactory(user=user, code=spec.code, tier=spec.tier)
+        for spec in list(specs)[:10]
+    ]
+    cache.delete(AWARD_STATS_CACHE_KEY)
+
+    with CaptureQueriesContext(connection) as ctx:
+        data = UserAwardSerializer(awards, many=True).data
+
+    assert len(data) == 10
+    assert len(ctx.captured_queries) <= 2
@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from trcustoms.awards.specs import AwardSpec
+from trcustoms.tasks import schedule_award_updates, update_pending_awards
+from trcustoms.tasks.update_awards import (
+    PENDING_USERS_KEY,
+    get_award_updates_redis,
+)
+from trcustoms.users.models import User
+from trcustoms.users.tests.factories import UserFactory
+
+AWARD_SPECS = [
+    AwardSpec(
+        code="test-award",
+        title="Test Award",
+        description="Test Award description",
+        guide_description="Test Award guide to get",
+        requirement=lambda user: True,
+    )
+]
+
+
+@pytest.fixture(name="deferred_tasks")
+def fixture_deferred_tasks(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    redis, pending_key, scheduled_key = get_award_updates_redis()
+    redis.delete(pending_key, scheduled_key)
+    with patch.object(update_pending_awards, "apply_async") as apply_async:
+        yield apply_async
+    redis.delete(pending_key, scheduled_key)
+
+
+def get_pending_user_count() -> int:
+    redis, pending_key, _scheduled_key = get_award_updates_redis()
+    return redis.scard(pending_key)
+
+
+@pytest.mark.django_db
+def test_schedule_award_updates_collapses_requests(deferred_tasks) -> None:
+    user1 = UserFactory(username="foo")
+    user2 = UserFactory(username="bar")
+
+    schedule_award_updates(user1.pk, user2.pk)
+    schedule_award_updates(user1.pk)
+    schedule_award_updates(user2.pk, user1.pk)
+
+    deferred_tasks.assert_called_once()
+    assert get_pending_user_count() == 2
+    assert not User.objects.filter(awards__isnull=False).exists()
+
+    with patch("trcustoms.awards.logic.ALL_AWARD_SPECS", AWARD_SPECS):
+        update_pending_awards()
+
+    assert get_pending_user_count() == 0
+    assert set(
+        User.objects.filter(awards__code="test-award").values_list(
+            "pk", flat=True
+        )
+    ) == {user1.pk, user2.pk}
+
+
+@pytest.mark.django_db
+def test_schedule_award_updates_reschedules_after_run(deferred_tasks) -> None:
+    user = UserFactory(username="foo")
+
+    schedule_award_updates(user.pk)
+    with patch("trcustoms.awards.logic.ALL_AWARD_SPECS", AWARD_SPECS):
+        update_pending_awards()
+    schedule_award_updates(user.pk)
+
+    assert deferred_tasks.call_count == 2
+    assert get_pending_user_count() == 1
+
+
+def test_award_update_keys_use_cache_prefix() -> None:
+    _redis, pending_key, _scheduled_key = get_award_updates_redis()
+
+    assert pending_key == cache.make_key(PENDING_USERS_KEY)
+    assert pending_key.startswith(f"{cache.key_prefix}:")
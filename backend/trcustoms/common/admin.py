@@ -14,4 +14,5 @@ class RatingClassAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
         "min_rating_count",
         "min_rating_average",
         "max_rating_average",
+        "level_count",
     ]
@@ -0,0 +1,112 @@
+import os
+from collections.abc import Callable
+from statistics import median
+from time import perf_counter
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from trcustoms.levels.logic import get_level_file_download_url
+from trcustoms.levels.models import LevelFile
+from trcustoms.uploads.storage import (
+    S3MediaStorage,
+    generate_presigned_url,
+    get_s3_client,
+)
+
+BUCKET_NAME = "benchmark"
+
+
+def get_mock_aws() -> Callable:
+    # pylint: disable=import-outside-toplevel
+    try:
+        from moto import mock_aws
+    except ImportError:
+        try:
+            # moto < 5
+            from moto import mock_s3 as mock_aws
+        except ImportError as ex:
+            raise CommandError(
+                "moto is needed to run this benchmark (pip install moto)"
+            ) from ex
+    return mock_aws
+
+
+def generate_with_new_client(storage: S3MediaStorage, name: str) -> str:
+    # what the download view used to do on every request
+    client = boto3.client(
+        "s3",
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+        config=Config(
+            s3={"addressing_style": "path"},
+            signature_version="s3v4",
+            retries=dict(max_attempts=3),
+        ),
+    )
+    return client.generate_presigned_url(
+        ClientMethod="get_object",
+        ExpiresIn=60,
+        Params={"Bucket": storage.bucket_name, "Key": name},
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time needed to build the S3 URL of a level file "
+        "download with a new client, the shared client and the URL cache. "
+        "Runs against moto instead of a real S3 endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-r", "--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        mock_aws = get_mock_aws()
+
+        level_file = (
+            LevelFile.objects.filter(file__isnull=False)
+            .exclude(file__content="")
+            .first()
+        )
+        if not level_file:
+            raise CommandError("No level files to download")
+
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+        with (
+            override_settings(
+                AWS_ACCESS_KEY_ID="benchmark",
+                AWS_SECRET_ACCESS_KEY="benchmark",
+                AWS_S3_ENDPOINT_URL=None,
+            ),
+            mock_aws(),
+        ):
+            get_s3_client.cache_clear()
+            storage = S3MediaStorage(bucket_name=BUCKET_NAME)
+            level_file.file.content.storage = storage
+            boto3.client("s3").create_bucket(Bucket=BUCKET_NAME)
+
+            name = level_file.file.content.name
+            variants = {
+                "new client": lambda: generate_with_new_client(storage, name),
+                "shared client": lambda: generate_presigned_url(
+                    storage, name, expires_in=60
+                ),
+                "shared client, cached": lambda: get_level_file_download_url(
+                    level_file, "file.zip"
+                ),
+            }
+            for variant, func in variants.items():
+                samples = []
+                for _ in range(options["repeat"]):
+                    start = perf_counter()
+                    func()
+                    samples.append(perf_counter() - start)
+                self.stdout.write(
+                    f"{variant:<25s} {median(samples) * 1000:8.3f}ms"
+                )
+            get_s3_client.cache_clear()
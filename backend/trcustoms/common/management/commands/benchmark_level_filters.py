@@ -0,0 +1,82 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, QuerySet
+
+from trcustoms.levels.filters import get_levels_with_all
+from trcustoms.levels.models import Level
+
+FIELDS = {
+    "tags": (Level.tags.through, "tag"),
+    "genres": (Level.genres.through, "genre"),
+    "authors": (Level.authors.through, "user"),
+}
+
+
+def filter_with_joins(field: str, pks: list[int]) -> QuerySet:
+    queryset = Level.objects.all()
+    for pk in pks:
+        queryset = queryset.filter(**{f"{field}__pk": pk})
+    return queryset.distinct()
+
+
+def filter_with_subquery(field: str, pks: list[int]) -> QuerySet:
+    through_model, through_field = FIELDS[field]
+    return Level.objects.filter(
+        pk__in=get_levels_with_all(through_model, through_field, pks)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare chained m2m joins against the grouped subquery used by the "
+        "AND-style level filters, on the current database contents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-f", "--field", choices=list(FIELDS), default="tags"
+        )
+        parser.add_argument("-m", "--max-ids", type=int, default=10)
+        parser.add_argument("-r", "--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        field = options["field"]
+        through_model, through_field = FIELDS[field]
+        # the most common ids keep the intermediate results large
+        pks = list(
+            through_model.objects.values_list(f"{through_field}_id", flat=True)
+            .annotate(level_count=Count("level_id"))
+            .order_by("-level_count")[: options["max_ids"]]
+        )
+        if not pks:
+            self.stderr.write(self.style.ERROR(f"No {field} to filter by"))
+            return
+
+        self.stdout.write(f"{'ids':>3s} {'joins':>10s} {'subquery':>10s}")
+        for count in range(1, len(pks) + 1):
+            results = {}
+            timings = {}
+            for name, func in [
+                ("joins", filter_with_joins),
+                ("subquery", filter_with_subquery),
+            ]:
+                samples = []
+                for _ in range(options["repeat"]):
+                    start = perf_counter()
+                    results[name] = set(
+                        func(field, pks[:count]).values_list("pk", flat=True)
+                    )
+                    samples.append(perf_counter() - start)
+                timings[name] = median(samples) * 1000
+
+            if results["joins"] != results["subquery"]:
+                self.stderr.write(
+                    self.style.ERROR(f"Results differ for {count} ids")
+                )
+            self.stdout.write(
+                f"{count:3d} "
+                f"{timings['joins']:8.2f}ms "
+                f"{timings['subquery']:8.2f}ms"
+            )
@@ -0,0 +1,69 @@
+from collections.abc import Callable
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trcustoms.levels.listing import (
+    DEFAULT_FIELDS,
+    EXPANDABLE_FIELDS,
+    get_compact_listing,
+)
+from trcustoms.levels.models import Level
+from trcustoms.levels.serializers import LevelListingSerializer
+from trcustoms.levels.views import LevelViewSet
+
+
+def serialize_full(level_ids: list[int]) -> list:
+    queryset = LevelViewSet.queryset.filter(pk__in=level_ids)
+    return LevelListingSerializer(queryset, many=True).data
+
+
+def serialize_compact(fields: list[str]) -> Callable[[list[int]], list]:
+    def func(level_ids: list[int]) -> list:
+        return get_compact_listing(level_ids, fields)
+
+    return func
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time and number of queries needed to build one page of "
+        "the level listing with the full and the compact serialization."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-p", "--page-size", type=int, default=20)
+        parser.add_argument("-r", "--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        level_ids = list(
+            Level.objects.values_list("pk", flat=True)[: options["page_size"]]
+        )
+        if not level_ids:
+            self.stderr.write(self.style.ERROR("No levels to serialize"))
+            return
+
+        variants = {
+            "full serializer": serialize_full,
+            "compact": serialize_compact(["id", "name"]),
+            "compact, default fields": serialize_compact(DEFAULT_FIELDS),
+            "compact, all expanded": serialize_compact(
+                DEFAULT_FIELDS + list(EXPANDABLE_FIELDS)
+            ),
+        }
+
+        self.stdout.write(f"{len(level_ids)} levels per page")
+        for name, func in variants.items():
+            samples = []
+            for _ in range(options["repeat"]):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = perf_counter()
+                    func(level_ids)
+                    samples.append(perf_counter() - start)
+            self.stdout.write(
+                f"{name:<25s} {median(samples) * 1000:8.2f}ms "
+                f"{len(ctx.captured_queries):3d} queries"
+            )
@@ -0,0 +1,125 @@
+import random
+from itertools import accumulate
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from trcustoms.common.management.commands.trle import (
+    TitleIndex,
+    clean_title,
+    jaccard,
+)
+
+
+def generate_title(
+    rng: random.Random, vocabulary: list[str], cum_weights: list[float]
+) -> str:
+    words = rng.choices(
+        vocabulary, cum_weights=cum_weights, k=rng.randint(1, 6)
+    )
+    return " ".join(words).title()
+
+
+def mutate_title(rng: random.Random, title: str, vocabulary: list[str]) -> str:
+    words = title.split()
+    match rng.randrange(4):
+        case 0:
+            words.append(rng.choice(vocabulary))
+        case 1 if len(words) > 1:
+            words.pop(rng.randrange(len(words)))
+        case 2:
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return " - ".join(words) if rng.random() < 0.1 else " ".join(words)
+
+
+def generate_catalogues(
+    size: int, seed: int
+) -> tuple[list[tuple[int, str]], list[tuple[int, str]]]:
+    """Return local titles and scraped titles, most of the latter being
+    slightly altered copies of the former.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(size)]
+    # skewed towards the first words, like "the", "tomb" or "raider" are
+    cum_weights = list(
+        accumulate(1 / (rank + 1) for rank in range(len(vocabulary)))
+    )
+    local = [
+        (i, generate_title(rng, vocabulary, cum_weights)) for i in range(size)
+    ]
+    scraped = [
+        (
+            i,
+            (
+                mutate_title(rng, local[rng.randrange(size)][1], vocabulary)
+                if rng.random() < 0.8
+                else generate_title(rng, vocabulary, cum_weights)
+            ),
+        )
+        for i in range(size)
+    ]
+    return local, scraped
+
+
+def match_pairwise(
+    local: list[tuple[int, str]],
+    scraped: list[tuple[int, str]],
+    distance: float,
+) -> set[int]:
+    # what the trle command used to do
+    local_cleaned = [clean_title(name) for _, name in local]
+    return {
+        lid
+        for lid, title in scraped
+        if any(
+            jaccard(clean_title(title), cleaned) <= distance
+            for cleaned in local_cleaned
+        )
+    }
+
+
+def match_indexed(
+    local: list[tuple[int, str]],
+    scraped: list[tuple[int, str]],
+    distance: float,
+) -> set[int]:
+    index = TitleIndex(local, distance)
+    return {lid for lid, title in scraped if index.match(title)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare matching TRLE titles to local level names pair by pair "
+        "against the indexed matcher, on synthetic catalogues."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-s", "--size", type=int, default=5000)
+        parser.add_argument("-d", "--distance", type=float, default=0.5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--skip-pairwise",
+            action="store_true",
+            help="Only time the indexed matcher.",
+        )
+
+    def handle(self, *args, **options):
+        local, scraped = generate_catalogues(options["size"], options["seed"])
+        distance = options["distance"]
+
+        matchers = [("indexed", match_indexed)]
+        if not options["skip_pairwise"]:
+            matchers.append(("pairwise", match_pairwise))
+
+        results = {}
+        for name, func in matchers:
+            start = perf_counter()
+            results[name] = func(local, scraped, distance)
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f"{name:<10s} {elapsed:8.3f}s "
+                f"{len(results[name])} of {len(scraped)} matched"
+            )
+
+        if len(set(map(frozenset, results.values()))) > 1:
+            self.stderr.write(self.style.ERROR("Results differ"))
@@ -0,0 +1,170 @@
+import re
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+from time import perf_counter
+
+import lxml.html
+import requests
+from django.core.management.base import BaseCommand
+
+from trcustoms.trle_scraper import (
+    get_document_from_response,
+    get_html_parser,
+    get_inner_html,
+    get_outer_html,
+    select,
+)
+
+# selectors used by TRLEScraper on every page it fetches
+SELECTORS = [
+    ".medGText a[href*='reviews']",
+    ".medGText a[href*='levelfeatures']",
+    ".navText img",
+    ".subHeader a",
+    ".bodyText:not([colspan])",
+    ".subHeader.Stil2 a[href*='authorfeatures']",
+    ".subHeader.Stil2",
+    "tr:nth-child(5) .medGText",
+    "a>img[src*='screens']",
+    "table.bodyText td.bodyText:not(:first-child):not([colspan])",
+    ".FindTable tr:not(:first-child):not(:last-child)",
+    "td[align='center']",
+    "small",
+]
+INNER_HTML_SELECTORS = ["tr:nth-child(5) .medGText", "p"]
+
+
+def get_inner_html_sequential(node) -> str:
+    # what get_inner_html used to do
+    ret = get_outer_html(node)
+    ret = ret.strip()
+    ret = re.sub(r"<br/?>\s*-", "\n-", ret, flags=re.M)
+    ret = re.sub(r"<br/?>", "\n", ret)
+    ret = re.sub(r"^<[^>]+>|<\/[^>]+>$", "", ret)
+    ret = ret.replace("\r\n", "\n")
+    ret = ret.replace("\r", "\n")
+    ret = re.sub(r" +\n", "\n", ret, flags=re.M)
+    ret = re.sub(r"\n +", "\n", ret, flags=re.M)
+    ret = re.sub(r"(?<!\n)\n(?![-\n])", " ", ret, flags=re.M)
+    ret = re.sub("  +", " ", ret)
+    ret = re.sub(r"\n\n\n+", r"\n\n", ret, flags=re.M)
+    ret = ret.strip()
+    return ret
+
+
+def make_response(
+    url: str, content: bytes, encoding: str | None
+) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.encoding = encoding
+    response._content = content
+    return response
+
+
+def load_cached_pages(path: Path, limit: int) -> list[requests.Response]:
+    connection = sqlite3.connect(path)
+    try:
+        rows = connection.execute(
+            "SELECT url, content, encoding FROM pages "
+            "WHERE url NOT LIKE '%/walk/%' ORDER BY url LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        connection.close()
+    return [make_response(*row) for row in rows]
+
+
+def load_fixture_pages() -> list[requests.Response]:
+    # pylint: disable=import-outside-toplevel
+    from trcustoms.common.tests.trle_server import (
+        AUTHORS,
+        get_author_page,
+        get_level_page,
+        get_reviews_page,
+    )
+
+    pages = [
+        get_author_page(author_id, nickname)
+        for author_id, nickname in AUTHORS.items()
+    ]
+    pages += [get_level_page(10), get_reviews_page()]
+    return [
+        make_response(f"fixture:{i}", page.encode(), "utf-8")
+        for i, page in enumerate(pages)
+    ]
+
+
+def parse_sequential(response: requests.Response) -> list:
+    # the old scraper re-encoded response.text and let lxml guess the
+    # encoding of the bytes, which garbled non-ASCII text on pages without
+    # a charset declaration; keep the round trip, but say it is UTF-8 so the
+    # results can be compared
+    doc = lxml.html.fromstring(
+        response.text.encode(), parser=get_html_parser("utf-8")
+    )
+    for expr in SELECTORS:
+        doc.cssselect(expr)
+    return [
+        get_inner_html_sequential(node)
+        for expr in INNER_HTML_SELECTORS
+        for node in doc.cssselect(expr)
+    ]
+
+
+def parse_streamlined(response: requests.Response) -> list:
+    doc = get_document_from_response(response)
+    for expr in SELECTORS:
+        select(doc, expr)
+    return [
+        get_inner_html(node)
+        for expr in INNER_HTML_SELECTORS
+        for node in select(doc, expr)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare parsing TRLE pages the old way (decoding to str, translating "
+        "selectors and cleaning up HTML in many passes) against the current "
+        "parsing path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cache",
+            type=Path,
+            help=(
+                "Page cache database written by trle_crawl; defaults to the "
+                "pages used by the tests."
+            ),
+        )
+        parser.add_argument("-l", "--limit", type=int, default=1000)
+        parser.add_argument("-r", "--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options["cache"]:
+            responses = load_cached_pages(options["cache"], options["limit"])
+        else:
+            responses = load_fixture_pages()
+
+        parsers: list[tuple[str, Callable[[requests.Response], list]]] = [
+            ("sequential", parse_sequential),
+            ("streamlined", parse_streamlined),
+        ]
+
+        results = {}
+        for name, func in parsers:
+            start = perf_counter()
+            for _ in range(options["repeat"]):
+                results[name] = [func(response) for response in responses]
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f"{name:<12s} {elapsed:8.3f}s "
+                f"{len(responses) * options['repeat']} pages"
+            )
+
+        if results["sequential"] != results["streamlined"]:
+            self.stderr.write(self.style.ERROR("Results differ"))
@@ -1,30 +1,71 @@
 import logging
 from collections import defaultdict
+from collections.abc import Callable
 
 from django.core.management.base import BaseCommand
+from django.db.models import QuerySet
 from tqdm import tqdm
 
+from trcustoms.config.logic import update_site_stats
+from trcustoms.levels.logic import update_level_denormalized_fields
 from trcustoms.levels.models import Level
+from trcustoms.ratings.logic import update_rating_scores
 from trcustoms.ratings.models import Rating
-from trcustoms.scoring import get_object_rating_class
+from trcustoms.scoring import LevelScorer, get_object_rating_class
 from trcustoms.signals import disable_signals
+from trcustoms.users.logic import update_user_denormalized_fields
 from trcustoms.users.models import User
 
+LEVEL_FIELDS = [
+    "rating_count",
+    "review_count",
+    "walkthrough_count",
+    "has_text_walkthrough",
+    "has_video_walkthrough",
+    "download_count",
+    "last_file",
+    "last_user_content_updated",
+    "trc_rating_count",
+    "rating_category_points",
+]
+
+USER_FIELDS = [
+    "authored_level_count_all",
+    "authored_level_count_approved",
+    "rated_level_count",
+    "reviewed_level_count",
+    "authored_walkthrough_count_all",
+    "authored_walkthrough_count_approved",
+    "played_level_count",
+]
+
 
 class Command(BaseCommand):
     help = "Make sure any denormalized data is correct."
+    per_row = False
 
     def add_arguments(self, parser):
         parser.add_argument("-u", "--users", action="store_true")
         parser.add_argument("-l", "--levels", action="store_true")
+        parser.add_argument("--rating-scores", action="store_true")
         parser.add_argument("--level-ratings", action="store_true")
         parser.add_argument("--rating-ratings", action="store_true")
         parser.add_argument("-a", "--all", action="store_true")
+        parser.add_argument(
+            "--per-row",
+            action="store_true",
+            help=(
+                "Recalculate levels and users one row at a time instead of "
+                "with set-based updates. Slow; useful to verify the latter."
+            ),
+        )
 
     def handle(self, *args, **options):
         logging.disable(logging.WARNING)
+        self.per_row = options["per_row"]
 
         fix_funcs = {
+            "rating_scores": self.fix_rating_scores,
             "levels": self.fix_levels,
             "users": self.fix_users,
             "level_ratings": self.fix_level_ratings,
@@ -47,43 +88,101 @@ class Command(BaseCommand):
                     func()
 
     def fix_levels(self) -> None:
-        with tqdm(desc="Levels", total=Level.objects.count()) as progress:
-            for level in Level.objects.iterator():
-                level.update_rating_count(save=False)
-                level.update_review_count(save=False)
-                level.update_walkthrough_count(save=False)
-                level.update_download_count(save=False)
-                level.update_last_file(save=False)
-                level.update_last_user_content_updated(save=False)
-                level.save()
-                progress.update()
+        if self.per_row:
+            changed = self.fix_per_row(
+                desc="Levels",
+                queryset=Level.objects.all(),
+                fields=LEVEL_FIELDS,
+                funcs=[
+                    Level.update_rating_count,
+                    Level.update_review_count,
+                    Level.update_walkthrough_count,
+                    Level.update_download_count,
+                    Level.update_last_file,
+                    Level.update_last_user_content_updated,
+                    Level.update_rating_category_points,
+                ],
+            )
+        else:
+            changed = update_level_denormalized_fields()
+        self.report("Levels", changed)
 
     def fix_users(self) -> None:
-        with tqdm(desc="Users", total=User.objects.count()) as progress:
-            for user in User.objects.iterator():
-                user.update_authored_level_count(save=False)
-                user.update_rated_level_count(save=False)
-                user.update_reviewed_level_count(save=False)
-                user.update_authored_walkthrough_count(save=False)
-                user.update_played_level_count(save=False)
-                user.save()
+        if self.per_row:
+            changed = self.fix_per_row(
+                desc="Users",
+                queryset=User.objects.all(),
+                fields=USER_FIELDS,
+                funcs=[
+                    User.update_authored_level_count,
+                    User.update_rated_level_count,
+                    User.update_reviewed_level_count,
+                    User.update_authored_walkthrough_count,
+                    User.update_played_level_count,
+                ],
+            )
+        else:
+            changed = update_user_denormalized_fields()
+        self.report("Users", changed)
+
+    def fix_per_row(
+        self,
+        desc: str,
+        queryset: QuerySet,
+        fields: list[str],
+        funcs: list[Callable[..., None]],
+    ) -> dict[str, int]:
+        changed = {field: 0 for field in fields}
+        attnames = [
+            queryset.model._meta.get_field(field).attname for field in fields
+        ]
+        with tqdm(desc=desc, total=queryset.count()) as progress:
+            for obj in queryset.iterator():
+                old_values = [getattr(obj, attname) for attname in attnames]
+                for func in funcs:
+                    func(obj, save=False)
+                changed_fields = [
+                    field
+                    for field, attname, old_value in zip(
+                        fields, attnames, old_values
+                    )
+                    if getattr(obj, attname) != old_value
+                ]
+                if changed_fields:
+                    obj.save(update_fields=changed_fields)
+                for field in changed_fields:
+                    changed[field] += 1
                 progress.update()
+        return changed
+
+    def report(self, desc: str, changed: dict[str, int]) -> None:
+        for field, count in changed.items():
+            self.stdout.write(f"{desc}: {field}: {count} rows changed")
+
+    def fix_rating_scores(self) -> None:
+        self.report("Ratings", {"score": update_rating_scores()})
 
     def fix_level_ratings(self) -> None:
         with tqdm(
             desc="Level ratings", total=Level.objects.count()
         ) as progress:
-            level_map = defaultdict(list)
-            for level in Level.objects.all().prefetch_related("reviews"):
-                rating_class = get_object_rating_class(level)
-                rating_class_id = rating_class.id if rating_class else None
-                level_map[rating_class_id].append(level.id)
+            levels = []
+            for level in Level.objects.all().prefetch_related("ratings"):
+                scores = LevelScorer.get_review_scores(level)
+                level.rating_score_sum = sum(scores)
+                level.rating_count = len(scores)
+                level.rating_class = get_object_rating_class(level)
+                levels.append(level)
                 progress.update()
 
-        for rating_class_id, level_ids in level_map.items():
-            Level.objects.filter(id__in=level_ids).update(
-                rating_class_id=rating_class_id
-            )
+        Level.objects.bulk_update(
+            levels,
+            ["rating_class", "rating_score_sum", "rating_count"],
+            batch_size=1000,
+        )
+        # the bulk update bypasses the signals that move levels between
+        # the rating class level counts
+        update_site_stats()
 
     def fix_rating_ratings(self) -> None:
         with tqdm(
@@ -1,6 +1,8 @@
 import logging
 import math
 import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable
 
 import lxml.html
 import requests
@@ -29,6 +31,89 @@ def jaccard(a: str, b: str) -> float:
     return 1.0 - (len(intersection) / len(union))
 
 
+class TitleIndex:
+    """Find the closest of many titles by the Jaccard distance of their
+    words, without comparing every pair.
+
+    With words ordered from the rarest, two titles within the distance
+    must share one of their first few words (prefix filtering), so only
+    the titles indexed under those words are compared.
+    """
+
+    def __init__(
+        self, titles: Iterable[tuple[int, str]], distance: float
+    ) -> None:
+        self.distance = distance
+        self.similarity = 1.0 - distance
+        self.entries = [
+            (title_id, frozenset(clean_title(title).split()))
+            for title_id, title in titles
+        ]
+        frequency = Counter(
+            word for _title_id, words in self.entries for word in words
+        )
+        self.rank = {
+            word: rank
+            for rank, word in enumerate(
+                sorted(frequency, key=lambda word: (frequency[word], word))
+            )
+        }
+        self.index: dict[str, list[int]] = defaultdict(list)
+        self.empty: list[int] = []
+        for pos, (_title_id, words) in enumerate(self.entries):
+            if not words:
+                self.empty.append(pos)
+            for word in self.get_prefix(words):
+                self.index[word].append(pos)
+
+    def get_prefix(self, words: frozenset[str]) -> list[str]:
+        # words unknown to the index sort first, as if they were the rarest
+        ordered = sorted(words, key=lambda word: self.rank.get(word, -1))
+        # the epsilon keeps float rounding from shortening the prefix
+        length = len(words) - math.ceil(self.similarity * len(words) - 1e-9)
+        return ordered[: length + 1]
+
+    def match(self, title: str) -> tuple[int, float] | None:
+        """Return the id of the closest title and its distance, if it is
+        within the maximum distance.
+        """
+        words = frozenset(clean_title(title).split())
+        best: tuple[float, int] | None = None
+        if not words:
+            if self.empty:
+                best = (0.0, self.empty[0])
+        else:
+            min_size = self.similarity * len(words) - 1e-9
+            max_size = (
+                len(words) / self.similarity + 1e-9
+                if self.similarity > 0
+                else math.inf
+            )
+            candidates = {
+                pos
+                for word in self.get_prefix(words)
+                for pos in self.index.get(word, ())
+            }
+            for pos in candidates:
+                other = self.entries[pos][1]
+                if not min_size <= len(other) <= max_size:
+                    continue
+                common = len(words & other)
+                distance = 1.0 - common / (len(words) + len(other) - common)
+                if distance <= self.distance and (
+                    best is None or (distance, pos) < best
+                ):
+                    best = (distance, pos)
+
+        # titles without any word in common are exactly 1.0 apart
+        if best is None and self.distance >= 1.0 and self.entries:
+            best = (1.0, 0)
+        if best is None:
+            return None
+        distance, pos = best
+        return self.entries[pos][0], distance
+
+
 class Command(BaseCommand):
     help = "Scrape TRLE levels and match titles against local database."
 
@@ -52,8 +137,10 @@ class Command(BaseCommand):
         exact: bool = options["exact"]
 
         collected = self.fetch_levels()
-        found, not_found = self.match_titles(collected, distance, exact)
-        self.report_results(found, len(collected), not_found)
+        matches, not_found = self.match_titles(collected, distance, exact)
+        self.report_results(
+            matches, len(collected), not_found, options["verbosity"]
+        )
 
     def fetch_levels(self) -> list[tuple[int, str]]:
         """Fetch all paginated TRLE levels with caching. Log progress."""
@@ -134,35 +221,53 @@ class Command(BaseCommand):
         collected: list[tuple[int, str]],
         distance: float,
         exact: bool,
-    ) -> tuple[int, list[tuple[int, str]]]:
-        """Compare scraped titles to local level names, return match stats."""
+    ) -> tuple[list[tuple[int, str, int, float]], list[tuple[int, str]]]:
+        """Find the closest local level of each scraped title.
+
+        Return (TRLE id, title, local id, distance) of the matched titles
+        and (TRLE id, title) of the others.
+        """
         local = list(Level.objects.values_list("id", "name"))
-        local_cleaned = [(lid, clean_title(name)) for lid, name in local]
+        if exact:
+            local_ids: dict[str, int] = {}
+            for local_id, name in local:
+                local_ids.setdefault(clean_title(name), local_id)
+
+            def match(title: str) -> tuple[int, float] | None:
+                if (local_id := local_ids.get(clean_title(title))) is None:
+                    return None
+                return local_id, 0.0
+
+        else:
+            match = TitleIndex(local, distance).match
 
-        found = 0
+        matches: list[tuple[int, str, int, float]] = []
         not_found: list[tuple[int, str]] = []
         for lid, title in collected:
-            cleaned = clean_title(title)
-            if exact:
-                matched = any(cn == cleaned for _, cn in local_cleaned)
-            else:
-                matched = any(
-                    jaccard(cleaned, cn) <= distance for _, cn in local_cleaned
-                )
-            if matched:
-                found += 1
+            if result := match(title):
+                matches.append((lid, title, *result))
             else:
                 not_found.append((lid, title))
-        return found, not_found
+        return matches, not_found
 
     def report_results(
         self,
-        found: int,
+        matches: list[tuple[int, str, int, float]],
         total: int,
         not_found: list[tuple[int, str]],
+        verbosity: int = 1,
     ) -> None:
         """Output summary and list of unmatched levels."""
-        self.stdout.write(f"Found {found} of {total} titles.")
+        self.stdout.write(f"Found {len(matches)} of {total} titles.")
+        if verbosity > 1:
+            self.stdout.write("Best matches:")
+            for lid, title, local_id, distance in matches:
+                url = f"https://www.trle.net/sc/levelfeatures.php?lid={lid}"
+                self.stdout.write(
+                    f"{url} {title} -> level {local_id} "
+                    f"(distance {distance:.2f})"
+                )
+
         if not not_found:
             return
 
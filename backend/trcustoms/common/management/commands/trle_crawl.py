@@ -0,0 +1,117 @@
+import json
+from dataclasses import asdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from tqdm import tqdm
+
+from trcustoms.trle_scraper import (
+    TRLE_URL,
+    CrawlCheckpoint,
+    PageCache,
+    RateLimiter,
+    TRLECrawler,
+    TRLEScraper,
+)
+
+KINDS = ["levels", "authors", "reviewers"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Crawl the TRLE catalogue into JSON lines files, several pages at "
+        "a time. Interrupted crawls resume where they stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kinds", nargs="*", choices=KINDS, default=KINDS)
+        parser.add_argument("-o", "--output", type=Path, required=True)
+        parser.add_argument("-w", "--workers", type=int, default=8)
+        parser.add_argument(
+            "-r",
+            "--rate",
+            type=float,
+            default=4,
+            help="Maximum number of requests per second to a single host.",
+        )
+        parser.add_argument("--base-url", default=TRLE_URL)
+        parser.add_argument(
+            "--cache",
+            type=Path,
+            help=(
+                "Page cache database; defaults to pages.sqlite3 in the "
+                "output directory."
+            ),
+        )
+        parser.add_argument("--no-cache", action="store_true")
+        parser.add_argument(
+            "--max-age",
+            type=float,
+            default=0,
+            help="Hours during which cached pages are used as they are.",
+        )
+
+    def handle(self, *args, **options):
+        output: Path = options["output"]
+        page_cache = None
+        if not options["no_cache"]:
+            page_cache = PageCache(
+                options["cache"] or output / "pages.sqlite3",
+                max_age=timedelta(hours=options["max_age"]),
+            )
+
+        scraper = TRLEScraper(
+            base_url=options["base_url"],
+            rate_limiter=RateLimiter(1 / options["rate"]),
+            page_cache=page_cache,
+            pool_size=options["workers"],
+        )
+        try:
+            self.crawl(scraper, output, options["kinds"], options["workers"])
+        finally:
+            if page_cache:
+                page_cache.close()
+                self.stdout.write(f"Page cache: {page_cache.stats}")
+
+    def crawl(
+        self,
+        scraper: TRLEScraper,
+        output: Path,
+        kinds: list[str],
+        workers: int,
+    ) -> None:
+        crawler = TRLECrawler(workers=workers)
+        fetchers = {
+            "levels": (scraper.fetch_all_level_ids, scraper.fetch_level),
+            "authors": (scraper.fetch_all_author_ids, scraper.fetch_author),
+            "reviewers": (
+                scraper.fetch_all_reviewer_ids,
+                scraper.fetch_reviewer,
+            ),
+        }
+
+        output.mkdir(parents=True, exist_ok=True)
+        for kind in kinds:
+            fetch_ids, fetch = fetchers[kind]
+            item_ids = list(fetch_ids())
+            checkpoint = CrawlCheckpoint(output / f"{kind}.done")
+            with (
+                (output / f"{kind}.jsonl").open("a") as handle,
+                tqdm(
+                    desc=kind.capitalize(),
+                    total=len(item_ids),
+                    initial=sum(item_id in checkpoint for item_id in item_ids),
+                ) as progress,
+            ):
+                for _item_id, item in crawler.crawl(
+                    fetch, item_ids, checkpoint
+                ):
+                    if item is not None:
+                        handle.write(
+                            json.dumps(asdict(item), cls=DjangoJSONEncoder)
+                            + "\n"
+                        )
+                        handle.flush()
+                    progress.update()
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from trcustoms.trle_importer import CHUNK_SIZE, TRLEImporter, read_crawl_output
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the TRLE levels, authors and reviewers written by trle_crawl "
+        "with bulk queries, and recalculate the affected counters once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", type=Path)
+        parser.add_argument("-c", "--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        levels, authors, reviewers = read_crawl_output(options["input"])
+        self.stdout.write(
+            f"Read {len(levels)} levels, {len(authors)} authors and "
+            f"{len(reviewers)} reviewers."
+        )
+        stats = TRLEImporter(chunk_size=options["chunk_size"]).run(
+            levels, authors, reviewers
+        )
+        self.stdout.write(f"Imported: {stats}")
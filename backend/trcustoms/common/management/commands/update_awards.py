@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
-from trcustoms.awards.logic import update_all_awards_stats
+from trcustoms.awards.logic import update_all_awards_stats, update_awards_batch
 from trcustoms.awards.models import UserAward
 from trcustoms.tasks import update_awards
 from trcustoms.users.models import User
@@ -12,14 +12,23 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("-d", "--delete", action="store_true")
+        parser.add_argument(
+            "--per-user",
+            action="store_true",
+            help="Evaluate the awards separately for every user (slow).",
+        )
 
     def handle(self, *args, **options):
         if options["delete"]:
             UserAward.objects.all().delete()
 
-        with tqdm(desc="Users", total=User.objects.count()) as progress:
-            for user in User.objects.iterator():
-                update_awards(user.pk, update_rarity=False)
-                progress.update()
+        if options["per_user"]:
+            with tqdm(desc="Users", total=User.objects.count()) as progress:
+                for user in User.objects.iterator():
+                    update_awards(user.pk, update_rarity=False)
+                    progress.update()
+        else:
+            changed = update_awards_batch(update_rarity=False)
+            self.stdout.write(f"Awards: {changed} rows changed")
 
         update_all_awards_stats()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("common", "0005_rename_country_code_and_add_iso_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ratingclass",
+            name="level_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
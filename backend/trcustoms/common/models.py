@@ -63,6 +63,9 @@ class RatingClass(models.Model):
         decimal_places=3, max_digits=5, null=True, blank=True
     )
 
+    # denormalized fields for faster db lookups
+    level_count = models.PositiveIntegerField(default=0)
+
     def __str__(self) -> str:
         return self.name
 
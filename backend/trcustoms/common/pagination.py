@@ -1,5 +1,37 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, OrderBy, Q, QuerySet
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Return the planner's row estimate for a queryset without COUNT(*)."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # keep the microseconds that DjangoJSONEncoder would truncate
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
 
 
 class CustomPagination(pagination.PageNumberPagination):
@@ -45,3 +77,213 @@ class CustomPagination(pagination.PageNumberPagination):
             return 10000
 
         return self.page_size
+
+
+class KeysetPagination(CustomPagination):
+    """Page number pagination with an opt-in keyset (cursor) mode.
+
+    Passing the cursor query parameter (empty for the first page) switches
+    to pages that continue after the sort key and pk of the previous page's
+    last row instead of using OFFSET. The total count is then only
+    calculated when asked for with count=exact or count=estimate.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    request = None
+    use_cursor = False
+    cursor_page_size = None
+    has_next = False
+    has_previous = False
+    next_position = None
+    previous_position = None
+    total_count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        self.cursor_page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        self.total_count = self.get_total_count(queryset, request)
+
+        ordering = self.get_ordering(queryset)
+        keys = [f"cursor_{i}" for i in range(len(ordering))]
+        queryset = queryset.annotate(
+            **{
+                key: order.expression
+                for key, order in zip(keys, ordering, strict=True)
+            }
+        )
+        if reverse:
+            ordering = [self.reverse_order(order) for order in ordering]
+        queryset = queryset.order_by(
+            *[
+                self.copy_order(order, F(key))
+                for key, order in zip(keys, ordering, strict=True)
+            ]
+        )
+        if position is not None:
+            if len(position) != len(keys):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                queryset = queryset.filter(
+                    self.get_position_filter(keys, ordering, position)
+                )
+            except (ValidationError, ValueError, TypeError) as ex:
+                raise NotFound(self.invalid_cursor_message) from ex
+
+        results = list(queryset[: self.cursor_page_size + 1])
+        has_more = len(results) > self.cursor_page_size
+        results = results[: self.cursor_page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if results:
+            self.previous_position = [getattr(results[0], key) for key in keys]
+            self.next_position = [getattr(results[-1], key) for key in keys]
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "current_page": None,
+                "last_page": None,
+                "total_count": self.total_count,
+                "items_on_page": self.cursor_page_size,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+                "disable_paging": self.disable_paging,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_total_count(self, queryset, request) -> int | None:
+        match request.query_params.get(self.count_query_param):
+            case "exact":
+                return queryset.count()
+            case "estimate":
+                return estimate_count(queryset)
+        return None
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        payload = json.dumps({"p": position, "r": reverse}, cls=CursorEncoder)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request) -> tuple[list | None, bool]:
+        if not (cursor := request.query_params.get(self.cursor_query_param)):
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position = payload["p"]
+            reverse = bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError) as ex:
+            raise NotFound(self.invalid_cursor_message) from ex
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_ordering(self, queryset: QuerySet) -> list[OrderBy]:
+        ordering = list(queryset.query.order_by)
+        if not ordering and queryset.query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+
+        result = []
+        for item in ordering:
+            if isinstance(item, str):
+                item = (
+                    F(item[1:]).desc()
+                    if item.startswith("-")
+                    else F(item).asc()
+                )
+            elif not isinstance(item, OrderBy):
+                item = item.asc()
+            result.append(item)
+
+        # the pk makes the sort key unique
+        if not any(
+            isinstance(order.expression, F)
+            and order.expression.name in {"pk", "id"}
+            for order in result
+        ):
+            descending = result[-1].descending if result else False
+            result.append(OrderBy(F("pk"), descending=descending))
+        return result
+
+    @staticmethod
+    def has_nulls_last(order: OrderBy) -> bool:
+        # PostgreSQL sorts nulls as if larger than any other value
+        if order.nulls_last:
+            return True
+        if order.nulls_first:
+            return False
+        return not order.descending
+
+    @classmethod
+    def reverse_order(cls, order: OrderBy) -> OrderBy:
+        nulls_last = cls.has_nulls_last(order)
+        return OrderBy(
+            order.expression,
+            descending=not order.descending,
+            nulls_first=True if nulls_last else None,
+            nulls_last=None if nulls_last else True,
+        )
+
+    @staticmethod
+    def copy_order(order: OrderBy, expression) -> OrderBy:
+        return OrderBy(
+            expression,
+            descending=order.descending,
+            nulls_first=order.nulls_first or None,
+            nulls_last=order.nulls_last or None,
+        )
+
+    @classmethod
+    def get_position_filter(
+        cls, keys: list[str], ordering: list[OrderBy], position: list
+    ) -> Q:
+        """Match the rows sorted after the given sort key values."""
+        conditions = []
+        same = Q()
+        for key, order, value in zip(keys, ordering, position, strict=True):
+            nulls_last = cls.has_nulls_last(order)
+            if value is None:
+                if not nulls_last:
+                    conditions.append(same & Q(**{f"{key}__isnull": False}))
+                same &= Q(**{f"{key}__isnull": True})
+            else:
+                lookup = "lt" if order.descending else "gt"
+                after = Q(**{f"{key}__{lookup}": value})
+                if nulls_last:
+                    after |= Q(**{f"{key}__isnull": True})
+                conditions.append(same & after)
+                same &= Q(**{key: value})
+        return reduce(or_, conditions, Q(pk__in=[]))
@@ -0,0 +1,11 @@
+from collections.abc import Iterable
+
+import pytest
+
+from trcustoms.common.tests.trle_server import TRLEServer, serve_trle_pages
+
+
+@pytest.fixture(name="trle_server")
+def fixture_trle_server() -> Iterable[TRLEServer]:
+    with serve_trle_pages() as server:
+        yield server
@@ -0,0 +1,185 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from trcustoms.common.consts import RatingClassSubject
+from trcustoms.common.models import RatingClass
+from trcustoms.common.tests.factories import RatingClassFactory
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.playlists.consts import PlaylistStatus
+from trcustoms.playlists.tests.factories import PlaylistItemFactory
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.tests.factories import (
+    RatingFactory,
+    RatingTemplateAnswerFactory,
+    RatingTemplateQuestionFactory,
+)
+from trcustoms.reviews.tests.factories import ReviewFactory
+from trcustoms.users.models import User
+from trcustoms.users.tests.factories import UserFactory
+from trcustoms.walkthroughs.consts import WalkthroughStatus
+from trcustoms.walkthroughs.tests.factories import WalkthroughFactory
+
+
+def fix_denormalized_data(*args: str) -> str:
+    out = StringIO()
+    call_command("fix_denormalized_data", *args, stdout=out, stderr=out)
+    return out.getvalue()
+
+
+@pytest.fixture(name="levels")
+def fixture_levels() -> list[Level]:
+    user1 = UserFactory(username="foo")
+    user2 = UserFactory(username="bar")
+    level1 = LevelFactory(authors=[user1])
+    level2 = LevelFactory(authors=[user1, user2], is_approved=False)
+    level3 = LevelFactory()
+
+    RatingFactory(level=level1, author=user2)
+    RatingFactory(
+        level=level3, author=user1, rating_type=RatingType.TRC
+    ).answers.set(
+        [
+            RatingTemplateAnswerFactory(
+                question=RatingTemplateQuestionFactory(category="Gameplay"),
+                points=3,
+            )
+        ]
+    )
+    ReviewFactory(level=level1, author=user2)
+    ReviewFactory(level=level2, author=user1)
+    WalkthroughFactory(
+        level=level1, author=user2, status=WalkthroughStatus.APPROVED
+    )
+    WalkthroughFactory(
+        level=level3, author=user1, status=WalkthroughStatus.DRAFT
+    )
+    PlaylistItemFactory(
+        level=level1, user=user2, status=PlaylistStatus.FINISHED
+    )
+    LevelFileFactory(level=level1, download_count=3)
+    LevelFileFactory(level=level1, download_count=4)
+    LevelFileFactory(level=level3, download_count=5, is_active=False)
+    return [level1, level2, level3]
+
+
+def get_denormalized_values() -> list[tuple]:
+    return list(
+        Level.objects.order_by("pk").values_list(
+            "rating_count",
+            "review_count",
+            "walkthrough_count",
+            "has_text_walkthrough",
+            "has_video_walkthrough",
+            "download_count",
+            "last_file",
+            "last_user_content_updated",
+            "trc_rating_count",
+            "rating_category_points",
+        )
+    ) + list(
+        User.objects.order_by("pk").values_list(
+            "authored_level_count_all",
+            "authored_level_count_approved",
+            "rated_level_count",
+            "reviewed_level_count",
+            "authored_walkthrough_count_all",
+            "authored_walkthrough_count_approved",
+            "played_level_count",
+        )
+    )
+
+
+def break_denormalized_values() -> None:
+    Level.objects.update(
+        rating_count=9,
+        review_count=9,
+        walkthrough_count=9,
+        has_text_walkthrough=True,
+        has_video_walkthrough=True,
+        download_count=9,
+        last_file=None,
+        last_user_content_updated=None,
+        trc_rating_count=9,
+        rating_category_points={"Broken": 9},
+    )
+    User.objects.update(
+        authored_level_count_all=9,
+        authored_level_count_approved=9,
+        rated_level_count=9,
+        reviewed_level_count=9,
+        authored_walkthrough_count_all=9,
+        authored_walkthrough_count_approved=9,
+        played_level_count=9,
+    )
+
+
+@pytest.mark.django_db
+def test_fix_denormalized_data_restores_values(levels: list[Level]) -> None:
+    expected = get_denormalized_values()
+    break_denormalized_values()
+
+    output = fix_denormalized_data("--levels", "--users")
+
+    assert get_denormalized_values() == expected
+    assert "Levels: rating_count: 3 rows changed" in output
+    assert "Levels: last_file: 1 rows changed" in output
+    assert "Users: played_level_count: 2 rows changed" in output
+
+
+@pytest.mark.django_db
+def test_fix_denormalized_data_matches_per_row_path(
+    levels: list[Level],
+) -> None:
+    break_denormalized_values()
+    fix_denormalized_data("--levels", "--users")
+    set_based_values = get_denormalized_values()
+
+    break_denormalized_values()
+    fix_denormalized_data("--levels", "--users", "--per-row")
+    per_row_values = get_denormalized_values()
+
+    assert set_based_values == per_row_values
+
+
+@pytest.mark.django_db
+def test_fix_denormalized_data_reports_no_changes_when_in_sync(
+    levels: list[Level],
+) -> None:
+    fix_denormalized_data("--levels", "--users")
+
+    for args in [[], ["--per-row"]]:
+        output = fix_denormalized_data("--levels", "--users", *args)
+        assert output
+        assert all(
+            line.endswith(": 0 rows changed")
+            for line in output.splitlines()
+            if "rows changed" in line
+        )
+
+
+@pytest.mark.django_db
+def test_fix_denormalized_data_updates_rating_class_level_counts() -> None:
+    rating_class = RatingClassFactory(
+        target=RatingClassSubject.LEVEL,
+        position=1,
+        min_rating_count=1,
+        min_rating_average=None,
+        max_rating_average=None,
+    )
+    level = LevelFactory()
+    RatingFactory(
+        level=level,
+        author=UserFactory(username="foo"),
+        rating_type=RatingType.TRLE,
+        trle_score_gameplay=5,
+    )
+    Level.objects.update(rating_class=None)
+    RatingClass.objects.update(level_count=0)
+
+    fix_denormalized_data("--level-ratings")
+
+    assert Level.objects.get(pk=level.pk).rating_class_id == rating_class.pk
+    assert RatingClass.objects.get(pk=rating_class.pk).level_count == 1
@@ -0,0 +1,137 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from trcustoms.engines.tests.factories import EngineFactory
+from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.reviews.tests.factories import ReviewFactory
+from trcustoms.uploads.tests.factories import UploadedFileFactory
+from trcustoms.users.tests.factories import UserFactory
+
+
+def get_pages(
+    api_client: APIClient, url: str, params: dict
+) -> tuple[list[list[int]], str | None]:
+    pages = []
+    response = api_client.get(url, {"cursor": "", "page_size": 2, **params})
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        pages.append([result["id"] for result in data["results"]])
+        if not data["next"]:
+            return pages, data["previous"]
+        response = api_client.get(data["next"])
+
+
+def get_pages_backwards(
+    api_client: APIClient, previous_url: str | None
+) -> list[list[int]]:
+    pages = []
+    while previous_url:
+        data = api_client.get(previous_url).json()
+        pages.insert(0, [result["id"] for result in data["results"]])
+        previous_url = data["previous"]
+    return pages
+
+
+@pytest.fixture(name="levels", autouse=True)
+def fixture_levels() -> None:
+    engines = [EngineFactory(name="TR1"), EngineFactory(name="TR2")]
+    for i in range(7):
+        level = LevelFactory(engine=engines[i % 2])
+        if i % 3:
+            LevelFileFactory(
+                level=level, file=UploadedFileFactory(size=i % 2 * 100)
+            )
+    for i in range(5):
+        ReviewFactory(
+            level=level, author=UserFactory(username=f"reviewer{i % 2}{i}")
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url, params",
+    [
+        ("/api/levels/", {}),
+        ("/api/levels/", {"sort": "engine"}),
+        ("/api/levels/", {"sort": "-engine"}),
+        ("/api/levels/", {"sort": "size"}),
+        ("/api/levels/", {"sort": "-size"}),
+        ("/api/levels/", {"sort": "rating"}),
+        ("/api/reviews/", {}),
+        ("/api/reviews/", {"sort": "author__username"}),
+        ("/api/reviews/", {"sort": "-author__username"}),
+        ("/api/ratings/", {}),
+        ("/api/walkthroughs/", {}),
+    ],
+)
+def test_cursor_pagination_visits_every_row_once(
+    api_client: APIClient, url: str, params: dict
+) -> None:
+    expected = [
+        result["id"]
+        for result in api_client.get(
+            url, {"cursor": "", "page_size": 100, **params}
+        ).json()["results"]
+    ]
+
+    pages, previous_url = get_pages(api_client, url, params)
+
+    assert [pk for page in pages for pk in page] == expected
+    assert all(len(page) == 2 for page in pages[:-1])
+    assert get_pages_backwards(api_client, previous_url) == pages[:-1]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_skips_count_unless_requested(
+    api_client: APIClient,
+) -> None:
+    data = api_client.get("/api/levels/", {"cursor": ""}).json()
+    assert data["total_count"] is None
+    assert data["current_page"] is None
+    assert data["previous"] is None
+
+    data = api_client.get("/api/levels/", {"cursor": "", "count": "exact"})
+    assert data.json()["total_count"] == 7
+
+    data = api_client.get("/api/levels/", {"cursor": "", "count": "estimate"})
+    assert isinstance(data.json()["total_count"], int)
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_rejects_invalid_cursor(
+    api_client: APIClient,
+) -> None:
+    for cursor in ["garbage", "eyJwIjogWyJ4Il0sICJyIjogZmFsc2V9"]:
+        response = api_client.get("/api/levels/", {"cursor": cursor})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_page_number_pagination_is_the_default(api_client: APIClient) -> None:
+    data = api_client.get("/api/levels/", {"page_size": 2}).json()
+    assert data["current_page"] == 1
+    assert data["last_page"] == 4
+    assert data["total_count"] == 7
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_pages_through_tied_search_results(
+    api_client: APIClient,
+) -> None:
+    levels = [LevelFactory(name="Zanzibar") for _ in range(4)]
+
+    pks = []
+    response = api_client.get(
+        "/api/levels/", {"cursor": "", "page_size": 1, "search": "zanzibar"}
+    )
+    for _ in range(len(levels)):
+        data = response.json()
+        pks.extend(result["id"] for result in data["results"])
+        if not data["next"]:
+            break
+        response = api_client.get(data["next"])
+
+    assert pks == [level.id for level in reversed(levels)]
+    assert not data["next"]
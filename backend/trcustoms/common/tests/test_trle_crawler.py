@@ -0,0 +1,152 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from trcustoms.common.tests.trle_server import AUTHORS, TRLEServer
+from trcustoms.trle_scraper import (
+    CrawlCheckpoint,
+    RateLimiter,
+    TRLEAuthor,
+    TRLECrawler,
+    TRLEScraper,
+)
+
+
+@pytest.fixture(name="scraper")
+def fixture_scraper(trle_server: TRLEServer) -> TRLEScraper:
+    return TRLEScraper(base_url=trle_server.url, backoff_factor=0)
+
+
+def get_author_requests(trle_server: TRLEServer) -> list[str]:
+    return [path for path in trle_server.requests if "aid=" in path]
+
+
+def test_crawl_fetches_all_items(scraper: TRLEScraper, tmp_path: Path) -> None:
+    checkpoint = CrawlCheckpoint(tmp_path / "authors.done")
+
+    results = dict(
+        TRLECrawler(workers=4).crawl(
+            scraper.fetch_author, scraper.fetch_all_author_ids(), checkpoint
+        )
+    )
+
+    assert {
+        author_id: author.nickname for author_id, author in results.items()
+    } == AUTHORS
+    assert isinstance(results[1], TRLEAuthor)
+    assert results[1].full_name == "Alice Smith"
+    assert results[1].country == "Poland"
+    assert results[1].level_ids == [10]
+    assert CrawlCheckpoint(tmp_path / "authors.done").done == set(AUTHORS)
+
+
+def test_crawl_resumes_from_checkpoint(
+    trle_server: TRLEServer, scraper: TRLEScraper, tmp_path: Path
+) -> None:
+    checkpoint = CrawlCheckpoint(tmp_path / "authors.done")
+    crawl = TRLECrawler(workers=1).crawl(
+        scraper.fetch_author, AUTHORS, checkpoint
+    )
+    processed = next(crawl)[0]
+    interrupted = next(crawl)[0]
+    crawl.close()
+
+    # the item being processed when the crawl stopped is fetched again
+    checkpoint = CrawlCheckpoint(tmp_path / "authors.done")
+    assert checkpoint.done == {processed}
+
+    trle_server.requests.clear()
+    resumed = dict(
+        TRLECrawler(workers=4).crawl(scraper.fetch_author, AUTHORS, checkpoint)
+    )
+
+    assert interrupted in resumed
+    assert set(resumed) == set(AUTHORS) - {processed}
+    assert len(get_author_requests(trle_server)) == len(resumed)
+    assert checkpoint.done == set(AUTHORS)
+
+
+def test_scraper_retries_failed_requests(
+    trle_server: TRLEServer, scraper: TRLEScraper
+) -> None:
+    trle_server.failures["/sc/authorfeatures.php?aid=1"] = 2
+
+    author = scraper.fetch_author(1)
+
+    assert author.nickname == "Alice"
+    assert len(get_author_requests(trle_server)) == 3
+
+
+def test_crawl_skips_failed_items(
+    trle_server: TRLEServer, tmp_path: Path
+) -> None:
+    scraper = TRLEScraper(base_url=trle_server.url, max_retries=0)
+    trle_server.failures["/sc/authorfeatures.php?aid=2"] = 1
+    checkpoint = CrawlCheckpoint(tmp_path / "authors.done")
+
+    results = dict(
+        TRLECrawler(workers=2).crawl(scraper.fetch_author, AUTHORS, checkpoint)
+    )
+
+    assert set(results) == set(AUTHORS) - {2}
+    assert 2 not in checkpoint
+
+    results = dict(
+        TRLECrawler(workers=2).crawl(scraper.fetch_author, AUTHORS, checkpoint)
+    )
+    assert set(results) == {2}
+
+
+def test_rate_limiter_spaces_requests_per_host() -> None:
+    rate_limiter = RateLimiter(0.05)
+
+    start = time.monotonic()
+    threads = [
+        threading.Thread(
+            target=rate_limiter.wait, args=("http://trle.net/page",)
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    same_host = time.monotonic() - start
+
+    start = time.monotonic()
+    rate_limiter.wait("http://other.net/page")
+    other_host = time.monotonic() - start
+
+    assert same_host >= 0.15
+    assert other_host < 0.05
+
+
+def test_trle_crawl_command(trle_server: TRLEServer, tmp_path: Path) -> None:
+    call_command(
+        "trle_crawl",
+        "authors",
+        "--output",
+        str(tmp_path),
+        "--base-url",
+        trle_server.url,
+        "--rate",
+        "1000",
+    )
+
+    lines = (tmp_path / "authors.jsonl").read_text().splitlines()
+    assert len(lines) == len(AUTHORS)
+
+    trle_server.requests.clear()
+    call_command(
+        "trle_crawl",
+        "authors",
+        "--output",
+        str(tmp_path),
+        "--base-url",
+        trle_server.url,
+    )
+    assert not get_author_requests(trle_server)
+    assert (tmp_path / "authors.jsonl").read_text().splitlines() == lines
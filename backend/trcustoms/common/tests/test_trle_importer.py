@@ -0,0 +1,285 @@
+import json
+from dataclasses import asdict
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from trcustoms.engines.tests.factories import EngineFactory
+from trcustoms.levels.models import Level, LevelFile
+from trcustoms.levels.tests.factories import (
+    DifficultyFactory,
+    DurationFactory,
+    LevelFactory,
+    LevelFileFactory,
+)
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.models import Rating
+from trcustoms.ratings.tests.factories import RatingFactory
+from trcustoms.reviews.consts import ReviewType
+from trcustoms.reviews.models import Review
+from trcustoms.reviews.tests.factories import ReviewFactory
+from trcustoms.trle_importer import TRLEImporter, read_crawl_output
+from trcustoms.trle_scraper import (
+    TRLEAuthor,
+    TRLELevel,
+    TRLELevelReview,
+    TRLEReviewer,
+)
+from trcustoms.users.models import User
+from trcustoms.users.tests.factories import UserFactory
+
+USER_DEFAULTS = dict(
+    full_name="",
+    image_url="",
+    country=None,
+    city=None,
+    birthday=None,
+    occupation=None,
+    hobbies=None,
+    homepage=None,
+    email=None,
+    level_ids=[],
+)
+
+
+def make_author(author_id: int, nickname: str) -> TRLEAuthor:
+    return TRLEAuthor(author_id=author_id, nickname=nickname, **USER_DEFAULTS)
+
+
+def make_reviewer(reviewer_id: int, nickname: str) -> TRLEReviewer:
+    return TRLEReviewer(
+        reviewer_id=reviewer_id, nickname=nickname, **USER_DEFAULTS
+    )
+
+
+def make_review(
+    reviewer_id: int, ratings: list[int], text: str | None = None
+) -> TRLELevelReview:
+    return TRLELevelReview(
+        level_id=10,
+        reviewer_id=reviewer_id,
+        rating_gameplay=ratings[0],
+        rating_enemies=ratings[1],
+        rating_atmosphere=ratings[2],
+        rating_lighting=ratings[3],
+        publication_date=date(2021, 3, reviewer_id),
+        text=text,
+    )
+
+
+def make_level(**kwargs) -> TRLELevel:
+    return TRLELevel(
+        **{
+            "level_id": 10,
+            "title": "The Lost Artefact",
+            "synopsis": "Lara returns.",
+            "release_date": date(2021, 2, 14),
+            "downloads": 1234,
+            "difficulty": "medium",
+            "duration": "long",
+            "average_rating": Decimal("8.25"),
+            "walkthrough": None,
+            "reviews": [
+                make_review(7, [8, 7, 9, 10], "A great level."),
+                make_review(8, [5, 5, 6, 4]),
+                make_review(9, [1, 1, 1, 1], "Unknown reviewer."),
+            ],
+            "file_type": "TR4",
+            "category": "Egypt",
+            "download_url": "https://www.trle.net/scadm/trle_dl.php?lid=10",
+            "main_image_url": "https://www.trle.net/screens/big/10.jpg",
+            "screenshot_urls": [],
+            "author_ids": [1, 2],
+            "website_url": None,
+            "showcase_urls": ["https://www.youtube.com/watch?v=abc123"],
+            **kwargs,
+        }
+    )
+
+
+AUTHORS = [make_author(1, "Alice"), make_author(2, "Bob")]
+REVIEWERS = [make_reviewer(7, "Zoe"), make_reviewer(8, "Alice")]
+
+
+@pytest.fixture(name="lookups", autouse=True)
+def fixture_lookups() -> None:
+    EngineFactory(name="TR4")
+    DifficultyFactory(name="Medium")
+    DurationFactory(name="Long (3+ hours)")
+
+
+@pytest.mark.django_db
+def test_trle_importer_creates_levels_and_counters(
+    rating_rating_classes: QuerySet,
+) -> None:
+    stats = TRLEImporter(chunk_size=2).run([make_level()], AUTHORS, REVIEWERS)
+
+    assert stats.levels_created == 1
+    assert stats.reviews_skipped == 1
+    level = Level.objects.get(trle_id=10)
+    assert level.name == "The Lost Artefact"
+    assert level.engine.name == "TR4"
+    assert level.difficulty.name == "Medium"
+    assert level.duration.name == "Long (3+ hours)"
+    assert level.created.date() == date(2021, 2, 14)
+    assert level.is_approved
+    assert sorted(level.authors.values_list("username", flat=True)) == [
+        "Alice",
+        "Bob",
+    ]
+    assert list(level.tags.values_list("name", flat=True)) == ["Egypt"]
+    assert list(level.external_links.values_list("url", flat=True)) == [
+        "https://www.youtube.com/watch?v=abc123"
+    ]
+    assert level.download_count == 1234
+    assert level.last_file == LevelFile.objects.get(level=level)
+    assert level.rating_count == 2
+    assert level.rating_score_sum == pytest.approx(0.85 + 0.5)
+    assert level.review_count == 1
+
+    alice = User.objects.get(username="Alice")
+    assert (alice.trle_author_id, alice.trle_reviewer_id) == (1, 8)
+    assert alice.source == "trle"
+    assert alice.is_placeholder
+    assert alice.authored_level_count_all == 1
+    assert alice.rated_level_count == 1
+    assert alice.reviewed_level_count == 0
+
+    rating = Rating.objects.get(author__username="Zoe")
+    assert rating.score == pytest.approx(0.85)
+    assert rating.rating_class.name == "Positive"
+    assert rating.created.date() == date(2021, 3, 7)
+    review = Review.objects.get(author__username="Zoe")
+    assert review.text == "A great level."
+    assert review.created.date() == date(2021, 3, 7)
+
+
+@pytest.mark.django_db
+def test_trle_importer_updates_previous_imports() -> None:
+    TRLEImporter().run([make_level()], AUTHORS, REVIEWERS)
+    level = make_level(
+        title="The Lost Artefact (remake)",
+        downloads=2000,
+        reviews=[make_review(7, [10, 10, 10, 10], "Even better.")],
+    )
+
+    stats = TRLEImporter().run([level], AUTHORS, REVIEWERS)
+
+    assert stats.levels_updated == 1
+    level = Level.objects.get()
+    assert level.name == "The Lost Artefact (remake)"
+    assert level.download_count == 2000
+    assert LevelFile.objects.count() == 1
+    assert User.objects.count() == 3
+    assert Review.objects.get().text == "Even better."
+    assert Rating.objects.get(author__username="Zoe").score == 1.0
+    assert level.rating_count == 2
+
+
+@pytest.mark.django_db
+def test_trle_importer_links_existing_accounts() -> None:
+    user = UserFactory(username="alice")
+
+    TRLEImporter().run([make_level()], AUTHORS, REVIEWERS)
+
+    user.refresh_from_db()
+    assert (user.trle_author_id, user.trle_reviewer_id) == (1, 8)
+    assert user.source == "trcustoms"
+    assert user.is_active
+    assert not User.objects.filter(username="Alice").exists()
+    assert Level.objects.get().authors.filter(pk=user.pk).exists()
+
+
+@pytest.mark.django_db
+def test_trle_importer_keeps_trcustoms_data() -> None:
+    user = UserFactory(username="Zoe")
+    level = LevelFactory(trle_id=10)
+    level_file = LevelFileFactory(level=level, version=1, download_count=50)
+    rating = RatingFactory(
+        level=level, author=user, rating_type=RatingType.TRC
+    )
+    review = ReviewFactory(
+        level=level, author=user, review_type=ReviewType.TRC, text="Mine."
+    )
+
+    stats = TRLEImporter().run([make_level()], AUTHORS, REVIEWERS)
+
+    assert stats.levels_updated == 1
+    assert stats.ratings == 1
+    assert stats.reviews == 0
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 50
+    rating.refresh_from_db()
+    assert rating.rating_type == RatingType.TRC
+    assert rating.trle_score_gameplay is None
+    assert rating.created.date() != date(2021, 3, 7)
+    review.refresh_from_db()
+    assert review.review_type == ReviewType.TRC
+    assert review.text == "Mine."
+    assert review.created.date() != date(2021, 3, 7)
+
+
+@pytest.mark.django_db
+def test_trle_importer_numbers_trle_and_trcustoms_rows_by_date() -> None:
+    user = UserFactory(username="Carol")
+    level = LevelFactory(trle_id=10)
+    created = datetime(2021, 3, 7, 12, tzinfo=dt_timezone.utc)
+    for obj in [
+        RatingFactory(level=level, author=user, rating_type=RatingType.TRC),
+        ReviewFactory(level=level, author=user, review_type=ReviewType.TRC),
+    ]:
+        type(obj).objects.filter(pk=obj.pk).update(created=created, position=1)
+
+    TRLEImporter().run([make_level()], AUTHORS, REVIEWERS)
+
+    assert list(
+        Rating.objects.filter(level=level)
+        .order_by("position")
+        .values_list("author__username", "position")
+    ) == [("Zoe", 1), ("Carol", 2), ("Alice", 3)]
+    assert list(
+        Review.objects.filter(level=level)
+        .order_by("position")
+        .values_list("author__username", "position")
+    ) == [("Zoe", 1), ("Carol", 2)]
+
+
+@pytest.mark.django_db
+def test_trle_importer_skips_levels_of_unknown_engines() -> None:
+    stats = TRLEImporter().run(
+        [make_level(file_type="TR9")], AUTHORS, REVIEWERS
+    )
+
+    assert stats.levels_skipped == 1
+    assert not Level.objects.exists()
+
+
+@pytest.mark.django_db
+def test_trle_import_reads_crawl_output(tmp_path: Path) -> None:
+    for name, items in [
+        ("levels", [make_level(), make_level(downloads=5)]),
+        ("authors", AUTHORS),
+        ("reviewers", REVIEWERS),
+    ]:
+        (tmp_path / f"{name}.jsonl").write_text(
+            "".join(
+                json.dumps(asdict(item), cls=DjangoJSONEncoder) + "\n"
+                for item in items
+            )
+        )
+
+    levels, authors, reviewers = read_crawl_output(tmp_path)
+    out = StringIO()
+    call_command("trle_import", str(tmp_path), stdout=out)
+
+    assert levels == [make_level(downloads=5)]
+    assert authors == AUTHORS
+    assert reviewers == REVIEWERS
+    assert "Read 1 levels, 2 authors and 2 reviewers." in out.getvalue()
+    assert Level.objects.get().download_count == 5
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from trcustoms.common.tests.trle_server import AUTHORS, TRLEServer
+from trcustoms.trle_scraper import PageCache, PageCacheStats, TRLEScraper
+
+AUTHOR_PATH = "/sc/authorfeatures.php?aid=1"
+
+
+@pytest.fixture(name="page_cache")
+def fixture_page_cache(tmp_path: Path) -> PageCache:
+    page_cache = PageCache(tmp_path / "pages.sqlite3")
+    yield page_cache
+    page_cache.close()
+
+
+def get_scraper(trle_server: TRLEServer, page_cache: PageCache) -> TRLEScraper:
+    return TRLEScraper(base_url=trle_server.url, page_cache=page_cache)
+
+
+def test_page_cache_revalidates_pages_with_etags(
+    trle_server: TRLEServer, page_cache: PageCache
+) -> None:
+    trle_server.etags = True
+    scraper = get_scraper(trle_server, page_cache)
+
+    first = scraper.fetch_author(1)
+    second = scraper.fetch_author(1)
+
+    assert first == second
+    assert page_cache.stats == PageCacheStats(new=1, revalidated=1)
+
+
+def test_page_cache_hashes_pages_without_validators(
+    trle_server: TRLEServer, page_cache: PageCache
+) -> None:
+    scraper = get_scraper(trle_server, page_cache)
+
+    scraper.fetch_author(1)
+    scraper.fetch_author(1)
+    trle_server.pages[AUTHOR_PATH] = trle_server.pages[AUTHOR_PATH].replace(
+        "Alice", "Alicia"
+    )
+    author = scraper.fetch_author(1)
+
+    assert author.nickname == "Alicia"
+    assert page_cache.stats == PageCacheStats(new=1, unchanged=1, changed=1)
+
+
+def test_page_cache_serves_fresh_pages_without_requests(
+    trle_server: TRLEServer, tmp_path: Path
+) -> None:
+    page_cache = PageCache(
+        tmp_path / "pages.sqlite3", max_age=timedelta(hours=1)
+    )
+    scraper = get_scraper(trle_server, page_cache)
+
+    first = scraper.fetch_author(1)
+    trle_server.requests.clear()
+    second = scraper.fetch_author(1)
+
+    assert first == second
+    assert not trle_server.requests
+    assert page_cache.stats.hits == 1
+    page_cache.close()
+
+
+def test_page_cache_persists_between_runs(
+    trle_server: TRLEServer, tmp_path: Path
+) -> None:
+    trle_server.etags = True
+    page_cache = PageCache(tmp_path / "pages.sqlite3")
+    get_scraper(trle_server, page_cache).fetch_author(1)
+    page_cache.close()
+
+    page_cache = PageCache(tmp_path / "pages.sqlite3")
+    get_scraper(trle_server, page_cache).fetch_author(1)
+    page_cache.close()
+
+    assert page_cache.stats == PageCacheStats(revalidated=1)
+
+
+def test_page_cache_does_not_store_errors(
+    trle_server: TRLEServer, page_cache: PageCache
+) -> None:
+    scraper = TRLEScraper(
+        base_url=trle_server.url, page_cache=page_cache, max_retries=0
+    )
+    trle_server.failures[AUTHOR_PATH] = 1
+
+    with pytest.raises(IndexError):
+        scraper.fetch_author(1)
+    scraper.fetch_author(1)
+
+    assert page_cache.stats == PageCacheStats(new=1)
+
+
+def test_trle_crawl_command_reports_page_cache_stats(
+    trle_server: TRLEServer, tmp_path: Path
+) -> None:
+    trle_server.etags = True
+    for _ in range(2):
+        out = StringIO()
+        call_command(
+            "trle_crawl",
+            "authors",
+            "--output",
+            str(tmp_path / "output"),
+            "--cache",
+            str(tmp_path / "pages.sqlite3"),
+            "--base-url",
+            trle_server.url,
+            "--rate",
+            "1000",
+            stdout=out,
+        )
+
+    # listing pages are revalidated, author pages are already crawled
+    listing_count = 3
+    assert f"Page cache: {listing_count} hits, 0 misses" in out.getvalue()
+    assert len(AUTHORS) + 2 * listing_count == len(trle_server.requests)
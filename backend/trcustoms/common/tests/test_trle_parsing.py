@@ -0,0 +1,151 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import lxml.html
+import pytest
+import requests
+from django.core.management import call_command
+
+from trcustoms.common.management.commands.benchmark_trle_parsing import (
+    get_inner_html_sequential,
+    make_response,
+)
+from trcustoms.common.tests.trle_server import TRLEServer
+from trcustoms.trle_scraper import (
+    TRLEScraper,
+    get_document_from_response,
+    get_inner_html,
+)
+
+
+@pytest.fixture(name="scraper")
+def fixture_scraper(trle_server: TRLEServer) -> TRLEScraper:
+    return TRLEScraper(base_url=trle_server.url, backoff_factor=0)
+
+
+@pytest.mark.parametrize(
+    "fragment",
+    [
+        "<div>plain text</div>",
+        "<div>  padded  \n  text  </div>",
+        "<div>one<br>two<br/>three</div>",
+        "<div>list:<br>- one<br>  - two<br>\n- three</div>",
+        "<div>first\r\nsecond\rthird\r<br>fourth</div>",
+        "<div>para<br><br><br><br><br>graph</div>",
+        "<div>lines\n\n\n\nand   spaces  <b>bold</b>  </div>",
+        "<div>tail<br>\n-</div>",
+        "<p><a name='x'></a>\"quoted<br>\r\n<br>text\" - <b>x</b></p>",
+    ],
+)
+def test_get_inner_html_matches_sequential_cleanup(fragment: str) -> None:
+    node = lxml.html.fragment_fromstring(fragment)
+    assert get_inner_html(node) == get_inner_html_sequential(node)
+
+
+def test_get_document_from_response_uses_response_encoding() -> None:
+    content = "<html><body><p>café</p></body></html>"
+
+    utf8_doc = get_document_from_response(
+        make_response("url", content.encode(), "utf-8")
+    )
+    latin1_doc = get_document_from_response(
+        make_response("url", content.encode("latin-1"), "ISO-8859-1")
+    )
+
+    assert utf8_doc.findtext(".//p") == "café"
+    assert latin1_doc.findtext(".//p") == "café"
+
+
+def test_get_document_from_response_reads_meta_charset() -> None:
+    content = (
+        '<html><head><meta charset="utf-8"></head>'
+        "<body><p>café</p></body></html>"
+    )
+    response = make_response("url", content.encode(), None)
+    response.headers["Content-Type"] = "text/html"
+    response.encoding = requests.utils.get_encoding_from_headers(
+        response.headers
+    )
+
+    assert response.encoding == "ISO-8859-1"
+    assert get_document_from_response(response).findtext(".//p") == "café"
+
+
+def test_fetch_level_parses_level_page(
+    scraper: TRLEScraper, trle_server: TRLEServer
+) -> None:
+    level = scraper.fetch_level(10)
+
+    assert level is not None
+    assert level.title == "The Lost Artefact"
+    assert level.author_ids == [1, 2]
+    assert level.file_type == "TR4"
+    assert level.category == "Egypt"
+    assert level.release_date == date(2021, 2, 14)
+    assert level.difficulty == "medium"
+    assert level.duration == "long"
+    assert level.downloads == 1234
+    assert level.average_rating == Decimal("8.25")
+    assert level.main_image_url == trle_server.url + "screens/big/10.jpg"
+    assert level.screenshot_urls == [
+        trle_server.url + "screens/10-1.jpg",
+        trle_server.url + "screens/10-2.jpg",
+    ]
+    assert level.website_url == "https://example.com/lost-artefact/"
+    assert level.showcase_urls == ["https://www.youtube.com/watch?v=abc123"]
+    assert level.synopsis
+    assert "café" in level.synopsis
+    assert "youtube" not in level.synopsis
+    assert level.walkthrough
+    assert level.walkthrough.content == "<html><body>Go left.</body></html>"
+
+
+def test_fetch_level_decodes_non_ascii_text(scraper: TRLEScraper) -> None:
+    level = scraper.fetch_level(10)
+    reviews = list(scraper.fetch_level_reviews(10))
+
+    assert level is not None
+    assert level.synopsis
+    assert level.synopsis.startswith(
+        "Lara returns to the café **beneath** the pyramids."
+    )
+    assert "Ã" not in level.synopsis
+    assert reviews[0].text
+    assert reviews[0].text.endswith("Recommended!")
+    assert "Zoë" not in reviews[0].text
+
+
+def test_fetch_level_reviews_parses_reviews_page(
+    scraper: TRLEScraper,
+) -> None:
+    reviews = list(scraper.fetch_level_reviews(10))
+
+    assert [review.reviewer_id for review in reviews] == [7, 8]
+    first, second = reviews
+    assert (
+        first.rating_gameplay,
+        first.rating_enemies,
+        first.rating_atmosphere,
+        first.rating_lighting,
+    ) == (8, 7, 9, 10)
+    assert first.publication_date == date(2021, 3, 1)
+    assert first.text
+    assert first.text.startswith("A great level.")
+    assert first.text.endswith("Recommended!")
+    assert "puzzles" in first.text
+    assert second.publication_date is None
+    assert second.text is None
+
+
+def test_benchmark_trle_parsing_gives_the_same_results() -> None:
+    stdout = StringIO()
+    stderr = StringIO()
+
+    call_command(
+        "benchmark_trle_parsing", repeat=1, stdout=stdout, stderr=stderr
+    )
+
+    assert "sequential" in stdout.getvalue()
+    assert "streamlined" in stdout.getvalue()
+    assert not stderr.getvalue()
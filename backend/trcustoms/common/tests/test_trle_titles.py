@@ -0,0 +1,87 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from trcustoms.common.management.commands.benchmark_title_matching import (
+    generate_catalogues,
+    match_pairwise,
+)
+from trcustoms.common.management.commands.trle import (
+    Command,
+    TitleIndex,
+    clean_title,
+    jaccard,
+)
+from trcustoms.levels.tests.factories import LevelFactory
+
+
+@pytest.mark.parametrize("distance", [0.0, 0.2, 0.34, 0.5, 0.7, 1.0])
+def test_title_index_matches_pairwise_comparison(distance: float) -> None:
+    local, scraped = generate_catalogues(300, seed=1)
+    index = TitleIndex(local, distance)
+
+    for _lid, title in scraped:
+        match = index.match(title)
+        distances = [
+            jaccard(clean_title(title), clean_title(name)) for _, name in local
+        ]
+        if min(distances) > distance:
+            assert match is None
+        else:
+            assert match is not None
+            local_id, match_distance = match
+            assert match_distance == pytest.approx(min(distances))
+            assert match_distance == pytest.approx(distances[local_id])
+
+
+def test_title_index_reports_best_match() -> None:
+    index = TitleIndex(
+        [
+            (1, "Tomb Raider"),
+            (2, "The Lost Tomb of the Raider"),
+            (3, "Return to the Tomb"),
+        ],
+        distance=0.7,
+    )
+
+    assert index.match("TOMB RAIDER!") == (1, 0.0)
+    assert index.match("Lost Tomb") == (2, pytest.approx(1 - 2 / 5))
+    assert index.match("Croft Manor") is None
+
+
+def test_title_index_empty_titles() -> None:
+    assert TitleIndex([(1, "Level"), (2, "???")], 0.5).match("") == (2, 0.0)
+    assert TitleIndex([(1, "Level")], 0.5).match("") is None
+    assert TitleIndex([(1, "Level")], 1.0).match("Other") == (1, 1.0)
+
+
+def test_benchmark_title_matching_agrees() -> None:
+    local, scraped = generate_catalogues(200, seed=2)
+    index = TitleIndex(local, 0.5)
+
+    assert {lid for lid, title in scraped if index.match(title)} == (
+        match_pairwise(local, scraped, 0.5)
+    )
+
+
+@pytest.mark.django_db
+def test_trle_command_reports_best_matches() -> None:
+    level = LevelFactory(name="The Lost Artifact")
+    LevelFactory(name="Lost Artifacts")
+    out = StringIO()
+
+    with patch.object(
+        Command,
+        "fetch_levels",
+        return_value=[(10, "Lost Artifact"), (11, "Croft Manor")],
+    ):
+        call_command("trle", verbosity=2, stdout=out)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Found 1 of 2 titles."
+    assert lines[2].endswith(
+        f"lid=10 Lost Artifact -> level {level.pk} (distance 0.33)"
+    )
+    assert lines[-1].endswith("lid=11 Croft Manor")
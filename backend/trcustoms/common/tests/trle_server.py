@@ -0,0 +1,188 @@
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from hashlib import md5
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+AUTHORS = {1: "Alice", 2: "Bob", 3: "Carol", 4: "Dave", 5: "Eve"}
+
+
+def get_author_page(author_id: int, nickname: str) -> str:
+    attrs = {
+        "name": f"{nickname} Smith",
+        "country/city": "Poland/Warsaw",
+        "birthday": "",
+        "occupation": "",
+        "hobbies": "",
+        "homepage": "",
+        "email": "",
+    }
+    rows = "".join(
+        f"<tr><td class='bodyText'>{key}:</td>"
+        f"<td class='bodyText'>{value}</td></tr>"
+        for key, value in attrs.items()
+    )
+    return (
+        "<html><body><table>"
+        f"<tr><td class='navText'><img src='/img/{author_id}.jpg'></td></tr>"
+        f"<tr><td class='subHeader'><a href='#'>{nickname}</a></td></tr>"
+        f"{rows}"
+        "<tr><td class='medGText'>"
+        f"<a href='levelfeatures.php?lid={author_id * 10}'>Level</a>"
+        "</td></tr>"
+        "</table></body></html>"
+    )
+
+
+def get_level_page(level_id: int) -> str:
+    attrs = {
+        "file type": "TR4",
+        "class": "Egypt",
+        "release date": "14-Feb-2021",
+        "difficulty": "medium",
+        "duration": "long",
+        "# of downloads": "1234",
+        "average rating": "8.25",
+    }
+    rows = "".join(
+        f"<tr><td>&nbsp;</td><td class='bodyText'>{key}:</td>"
+        f"<td class='bodyText'>{value}</td></tr>"
+        for key, value in attrs.items()
+    )
+    return (
+        "<html><head><title>TRLE</title></head><body><table>"
+        f"<tr><td class='navText'><img src='screens/big/{level_id}.jpg'>"
+        "</td></tr>"
+        "<tr><td class='subHeader Stil2'>The Lost Artefact<br>\n"
+        "by <a href='authorfeatures.php?aid=1'>Alice</a> &amp; "
+        "<a href='authorfeatures.php?aid=2'>Bob</a></td></tr>"
+        "<tr><td>&nbsp;</td></tr>"
+        f"<tr><td><table class='bodyText'>{rows}</table></td></tr>"
+        "<tr><td class='medGText'>Lara  returns to\r\nthe caf\u00e9 "
+        "<b>beneath</b> the   pyramids.<br>\r\n- find the gems<br>"
+        "- escape  <br><br><br><br><i>Enjoy</i> &amp; have fun!<br>\n"
+        "Trailer: https://www.youtube.com/watch?v=abc123 \n</td></tr>"
+        "</table>"
+        f"<a href='screens/{level_id}-1.jpg'>"
+        f"<img src='screens/small/{level_id}-1.jpg'></a>"
+        f"<a href='screens/{level_id}-2.jpg'>"
+        f"<img src='screens/small/{level_id}-2.jpg'></a>"
+        "</body></html>"
+    )
+
+
+def get_reviews_page() -> str:
+    return (
+        "<html><body><table class='FindTable'>"
+        "<tr><th>Reviewer</th></tr>"
+        "<tr><td class='medGText'><a href='reviewerfeatures.php?rid=7'>"
+        "Zo\u00eb</a></td>"
+        + "".join(f"<td align='center'>{i}</td>" for i in [8, 7, 9, 10])
+        + "</tr>"
+        "<tr><td class='medGText'><a href='reviewerfeatures.php?rid=8'>"
+        "Quiet</a></td>"
+        + "".join(f"<td align='center'>{i}</td>" for i in [5, 5, 6, 4])
+        + "</tr>"
+        "<tr><td>&nbsp;</td></tr>"
+        "</table>"
+        "<p><a name='Zo\u00eb'></a>\"A great level.<br>\r\n"
+        'Loved the <b>puzzles</b>.<br><br>  Recommended!" - <b>Zo\u00eb</b> '
+        "<small>(01-Mar-2021)</small></p>"
+        "</body></html>"
+    )
+
+
+@dataclass
+class TRLEServer:
+    url: str
+    pages: dict[str, str] = field(default_factory=dict)
+    redirects: dict[str, str] = field(default_factory=dict)
+    failures: Counter = field(default_factory=Counter)
+    requests: list[str] = field(default_factory=list)
+    etags: bool = False
+
+
+@contextmanager
+def serve_trle_pages() -> Iterator[TRLEServer]:
+    """Serve fixture TRLE pages from a local HTTP server."""
+    pages = {
+        "/sc/bGalleryWorld.php": (
+            "<a href='bGalleryCountry.php?c=pl'>Poland</a>"
+            "<a href='bGalleryCountry.php?c=uk'>UK</a>"
+        ),
+        "/bGalleryCountry.php?c=pl": (
+            "<a href='sc/authorfeatures.php?aid=1'>1</a>"
+            "<a href='sc/authorfeatures.php?aid=2'>2</a>"
+            "<a href='sc/authorfeatures.php?aid=3'>3</a>"
+        ),
+        "/bGalleryCountry.php?c=uk": (
+            "<a href='sc/authorfeatures.php?aid=4'>4</a>"
+            "<a href='sc/authorfeatures.php?aid=5'>5</a>"
+        ),
+    }
+    for author_id, nickname in AUTHORS.items():
+        pages[f"/sc/authorfeatures.php?aid={author_id}"] = get_author_page(
+            author_id, nickname
+        )
+    pages["/sc/levelfeatures.php?lid=10"] = get_level_page(10)
+    pages["/sc/reviews.php?lid=10"] = get_reviews_page()
+    pages["/walk/10.htm"] = "<html><body>Go left.</body></html>"
+    redirects = {
+        "/scadm/trle_dl.php?lid=10": "https://example.com/lost-artefact/",
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            server.requests.append(self.path)
+            if server.failures[self.path] > 0:
+                server.failures[self.path] -= 1
+                self.send_error(503)
+                return
+            if (page := server.pages.get(self.path)) is None:
+                self.send_error(404)
+                return
+            body = page.encode()
+            etag = f'"{md5(body).hexdigest()}"'
+            if server.etags and self.headers["If-None-Match"] == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            if server.etags:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self) -> None:
+            server.requests.append(self.path)
+            if location := server.redirects.get(self.path):
+                self.send_response(302)
+                self.send_header("Location", location)
+            elif self.path in server.pages:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+            else:
+                self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server = TRLEServer(
+        url=f"http://127.0.0.1:{httpd.server_port}/",
+        pages=pages,
+        redirects=redirects,
+    )
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
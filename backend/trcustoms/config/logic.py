@@ -0,0 +1,234 @@
+import hashlib
+import json
+from collections import Counter
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Sum
+
+from trcustoms.common.consts import RatingClassSubject
+from trcustoms.common.models import RatingClass
+from trcustoms.config.models import SiteStats
+from trcustoms.levels.models import Level
+from trcustoms.ratings.models import Rating
+from trcustoms.reviews.models import Review
+from trcustoms.utils import aggregate_subquery, update_denormalized_field
+from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
+from trcustoms.walkthroughs.models import Walkthrough
+
+CONFIG_VERSION_CACHE_KEY = "config_data_version"
+CONFIG_CACHE_TIMEOUT = 5 * 60
+
+# keyed by (has approved video walkthrough, has approved text walkthrough)
+WALKTHROUGH_STATS_FIELDS = {
+    (True, True): "levels_with_video_and_text_walkthroughs",
+    (True, False): "levels_with_video_walkthroughs",
+    (False, True): "levels_with_text_walkthroughs",
+    (False, False): "levels_without_walkthroughs",
+}
+
+
+def get_config_etag(data: Any) -> str:
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"' + hashlib.md5(payload.encode()).hexdigest() + '"'
+
+
+def get_cached_config_data(factory: Callable[[], Any]) -> tuple[str, Any]:
+    """Return the config payload along with its ETag.
+
+    The payload is cached under the current config version, so bumping the
+    version makes any payload computed before that point unreachable.
+    """
+    version = cache.get_or_set(CONFIG_VERSION_CACHE_KEY, 0, timeout=None)
+    cache_key = f"config_data__{version}"
+    cached = cache.get(cache_key)
+    if cached is None:
+        data = factory()
+        cached = (get_config_etag(data), data)
+        cache.set(cache_key, cached, timeout=CONFIG_CACHE_TIMEOUT)
+    return cached
+
+
+def invalidate_config_cache() -> None:
+    cache.add(CONFIG_VERSION_CACHE_KEY, 0, timeout=None)
+    cache.incr(CONFIG_VERSION_CACHE_KEY)
+
+
+def calculate_site_stats() -> dict[str, int]:
+    """Count the site statistics from scratch."""
+    qs = Level.objects.filter(is_approved=True)
+    return dict(
+        total_levels=qs.count(),
+        total_ratings=Rating.objects.count(),
+        total_reviews=Review.objects.count(),
+        total_walkthroughs=Walkthrough.objects.filter(
+            status=WalkthroughStatus.APPROVED,
+            level__is_approved=True,
+        ).count(),
+        total_downloads=(
+            Level.objects.aggregate(total=Sum("download_count"))["total"] or 0
+        ),
+        levels_with_video_and_text_walkthroughs=(
+            qs.with_both_walkthroughs().count()
+        ),
+        levels_with_video_walkthroughs=(
+            qs.with_video_only_walkthroughs().count()
+        ),
+        levels_with_text_walkthroughs=(
+            qs.with_text_only_walkthroughs().count()
+        ),
+        levels_without_walkthroughs=(qs.with_no_walkthroughs().count()),
+    )
+
+
+def update_site_stats() -> SiteStats:
+    """Correct any drift in the incrementally maintained statistics."""
+    site_stats = SiteStats.objects.first() or SiteStats()
+    for key, value in calculate_site_stats().items():
+        setattr(site_stats, key, value)
+    site_stats.save()
+
+    update_denormalized_field(
+        RatingClass.objects.filter(target=RatingClassSubject.LEVEL),
+        "level_count",
+        aggregate_subquery(
+            Level.objects.all(), "rating_class", Count("pk"), 0
+        ),
+    )
+    return site_stats
+
+
+def get_site_stats() -> SiteStats:
+    return SiteStats.objects.first() or update_site_stats()
+
+
+def apply_site_stats_delta(delta: Counter) -> None:
+    if changes := {
+        key: F(key) + value for key, value in delta.items() if value
+    }:
+        SiteStats.objects.update(**changes)
+
+
+def get_level_walkthroughs(
+    level_id: int, exclude_id: int | None = None
+) -> list[tuple[str, str]]:
+    return list(
+        Walkthrough.objects.filter(level_id=level_id)
+        .exclude(pk=exclude_id)
+        .values_list("status", "walkthrough_type")
+    )
+
+
+def get_level_site_stats(
+    is_approved: bool,
+    download_count: int,
+    walkthroughs: Iterable[tuple[str, str]],
+) -> Counter:
+    """Return what a single level contributes to the site statistics.
+
+    Walkthroughs are given as (status, walkthrough_type) pairs.
+    """
+    stats = Counter(total_downloads=download_count)
+    if is_approved:
+        walkthrough_types = [
+            walkthrough_type
+            for status, walkthrough_type in walkthroughs
+            if status == WalkthroughStatus.APPROVED
+        ]
+        stats["total_levels"] += 1
+        stats["total_walkthroughs"] += len(walkthrough_types)
+        stats[
+            WALKTHROUGH_STATS_FIELDS[
+                WalkthroughType.LINK in walkthrough_types,
+                WalkthroughType.TEXT in walkthrough_types,
+            ]
+        ] += 1
+    return stats
+
+
+def update_site_stats_for_level(
+    level_id: int,
+    old_values: tuple[bool, int] | None,
+    new_values: tuple[bool, int] | None,
+) -> None:
+    """Apply a change of a level approval status or download count.
+
+    The values are (is_approved, download_count) pairs, None standing for
+    a level that did not exist before or does not exist anymore.
+    """
+    if old_values == new_values:
+        return
+    walkthroughs = get_level_walkthroughs(level_id)
+    delta = Counter()
+    if new_values:
+        delta.update(get_level_site_stats(*new_values, walkthroughs))
+    if old_values:
+        delta.subtract(get_level_site_stats(*old_values, walkthroughs))
+    apply_site_stats_delta(delta)
+
+
+def update_site_stats_for_walkthrough(
+    walkthrough_id: int,
+    old_values: tuple[int, str, str] | None,
+    new_values: tuple[int, str, str] | None,
+) -> None:
+    """Apply the creation or a change of a single walkthrough.
+
+    The values are (level_id, status, walkthrough_type) triples, None
+    standing for a walkthrough that did not exist before. The other
+    walkthroughs of the affected levels are read from the database, so
+    deletions, which can remove several walkthroughs of one level before
+    any signal runs, go through update_site_stats_for_level_walkthroughs.
+    """
+    if old_values == new_values:
+        return
+    delta = Counter()
+    for level_id in {
+        values[0] for values in [old_values, new_values] if values
+    }:
+        is_approved = (
+            Level.objects.filter(pk=level_id)
+            .values_list("is_approved", flat=True)
+            .first()
+        )
+        if not is_approved:
+            continue
+        walkthroughs = get_level_walkthroughs(
+            level_id, exclude_id=walkthrough_id
+        )
+        for values, sign in [(new_values, 1), (old_values, -1)]:
+            level_walkthroughs = list(walkthroughs)
+            if values and values[0] == level_id:
+                level_walkthroughs.append(values[1:])
+            for key, value in get_level_site_stats(
+                True, 0, level_walkthroughs
+            ).items():
+                delta[key] += sign * value
+    apply_site_stats_delta(delta)
+
+
+def update_site_stats_for_level_walkthroughs(
+    level_id: int,
+    old_walkthroughs: list[tuple[str, str]],
+    new_walkthroughs: list[tuple[str, str]],
+) -> None:
+    """Apply a change of all walkthroughs of a single level at once.
+
+    Walkthroughs are given as (status, walkthrough_type) pairs.
+    """
+    is_approved = (
+        Level.objects.filter(pk=level_id)
+        .values_list("is_approved", flat=True)
+        .first()
+    )
+    if not is_approved:
+        return
+    delta = Counter(get_level_site_stats(True, 0, new_walkthroughs))
+    delta.subtract(get_level_site_stats(True, 0, old_walkthroughs))
+    apply_site_stats_delta(delta)
+
+
+def update_site_stats_count(key: str, delta: int) -> None:
+    apply_site_stats_delta(Counter({key: delta}))
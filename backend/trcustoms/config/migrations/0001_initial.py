@@ -0,0 +1,51 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SiteStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_levels", models.IntegerField(default=0)),
+                ("total_ratings", models.IntegerField(default=0)),
+                ("total_reviews", models.IntegerField(default=0)),
+                ("total_walkthroughs", models.IntegerField(default=0)),
+                ("total_downloads", models.IntegerField(default=0)),
+                (
+                    "levels_with_video_and_text_walkthroughs",
+                    models.IntegerField(default=0),
+                ),
+                (
+                    "levels_with_video_walkthroughs",
+                    models.IntegerField(default=0),
+                ),
+                (
+                    "levels_with_text_walkthroughs",
+                    models.IntegerField(default=0),
+                ),
+                (
+                    "levels_without_walkthroughs",
+                    models.IntegerField(default=0),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Site stats",
+                "default_permissions": [],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitestats",
+            name="download_flush_token",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class SiteStats(models.Model):
+    """Site-wide totals shown in the config stats block.
+
+    There is a single row, kept up to date by signals and periodically
+    reconciled against the actual data.
+    """
+
+    total_levels = models.IntegerField(default=0)
+    total_ratings = models.IntegerField(default=0)
+    total_reviews = models.IntegerField(default=0)
+    total_walkthroughs = models.IntegerField(default=0)
+    total_downloads = models.IntegerField(default=0)
+    levels_with_video_and_text_walkthroughs = models.IntegerField(default=0)
+    levels_with_video_walkthroughs = models.IntegerField(default=0)
+    levels_with_text_walkthroughs = models.IntegerField(default=0)
+    levels_without_walkthroughs = models.IntegerField(default=0)
+    # token of the last buffered download flush applied to the totals, so
+    # that a flush retried after its Redis cleanup failed is not counted
+    # twice
+    download_flush_token = models.CharField(max_length=32, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Site stats"
+        default_permissions = []
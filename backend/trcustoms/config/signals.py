@@ -0,0 +1,224 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from trcustoms.common.models import Country, RatingClass
+from trcustoms.config.logic import (
+    invalidate_config_cache,
+    update_site_stats_count,
+    update_site_stats_for_level,
+    update_site_stats_for_level_walkthroughs,
+    update_site_stats_for_walkthrough,
+)
+from trcustoms.engines.models import Engine
+from trcustoms.genres.models import Genre
+from trcustoms.levels.models import Level, LevelDifficulty, LevelDuration
+from trcustoms.news.models import GlobalMessage
+from trcustoms.ratings.models import Rating, RatingTemplateQuestion
+from trcustoms.reviews.models import Review
+from trcustoms.scoring import move_level_rating_class
+from trcustoms.tags.models import Tag
+from trcustoms.walkthroughs.models import Walkthrough
+
+CONFIG_MODELS = [
+    Country,
+    Engine,
+    Genre,
+    GlobalMessage,
+    Level,
+    LevelDifficulty,
+    LevelDuration,
+    Rating,
+    RatingClass,
+    RatingTemplateQuestion,
+    Review,
+    Tag,
+    Walkthrough,
+]
+
+# saves that only touch these fields do not invalidate the config; the
+# download total catches up when the cached payload expires
+IGNORED_LEVEL_FIELDS = {"download_count"}
+
+
+def handle_config_model_change(sender, instance, **kwargs):
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    update_fields = kwargs.get("update_fields")
+    if (
+        sender is Level
+        and update_fields
+        and set(update_fields) <= IGNORED_LEVEL_FIELDS
+    ):
+        return
+    transaction.on_commit(invalidate_config_cache)
+
+
+for model in CONFIG_MODELS:
+    post_save.connect(handle_config_model_change, sender=model)
+    post_delete.connect(handle_config_model_change, sender=model)
+
+m2m_changed.connect(handle_config_model_change, sender=Level.tags.through)
+m2m_changed.connect(handle_config_model_change, sender=Level.genres.through)
+
+
+LEVEL_STATS_FIELDS = ["is_approved", "download_count"]
+WALKTHROUGH_STATS_FIELDS = ["level_id", "status", "walkthrough_type"]
+
+
+def get_level_stats_values(level: Level) -> tuple[bool, int]:
+    return tuple(getattr(level, field) for field in LEVEL_STATS_FIELDS)
+
+
+@receiver(pre_save, sender=Level)
+def remember_level_stats_values(sender, instance, update_fields, **kwargs):
+    if not instance.pk or (
+        update_fields and not set(update_fields) & set(LEVEL_STATS_FIELDS)
+    ):
+        return
+    instance._old_stats_values = (
+        Level.objects.filter(pk=instance.pk)
+        .values_list(*LEVEL_STATS_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Level)
+def update_site_stats_on_level_save(
+    sender, instance, created, update_fields, **kwargs
+):
+    if created:
+        update_site_stats_for_level(
+            instance.pk, None, get_level_stats_values(instance)
+        )
+        move_level_rating_class(None, instance.rating_class_id)
+        return
+
+    old_values = getattr(instance, "_old_stats_values", None)
+    if old_values is None:
+        return
+    del instance._old_stats_values
+    new_values = tuple(
+        (
+            getattr(instance, field)
+            if not update_fields or field in update_fields
+            else old_value
+        )
+        for field, old_value in zip(LEVEL_STATS_FIELDS, old_values)
+    )
+    update_site_stats_for_level(instance.pk, old_values, new_values)
+
+
+@receiver(pre_delete, sender=Level)
+def remember_level_ratings(sender, instance, **kwargs):
+    instance._had_ratings = instance.ratings.exists()
+
+
+@receiver(post_delete, sender=Level)
+def update_site_stats_on_level_delete(sender, instance, **kwargs):
+    # walkthroughs of the level are deleted before it and have already
+    # been accounted for
+    update_site_stats_for_level(
+        instance.pk, get_level_stats_values(instance), None
+    )
+    # so have its ratings, which already moved the level out of its rating
+    # class; instance.rating_class_id still holds the class from before
+    if not getattr(instance, "_had_ratings", False):
+        move_level_rating_class(instance.rating_class_id, None)
+
+
+@receiver(pre_save, sender=Walkthrough)
+def remember_walkthrough_stats_values(sender, instance, **kwargs):
+    if instance.pk:
+        instance._old_stats_values = (
+            Walkthrough.objects.filter(pk=instance.pk)
+            .values_list(*WALKTHROUGH_STATS_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Walkthrough)
+def update_site_stats_on_walkthrough_save(sender, instance, **kwargs):
+    update_site_stats_for_walkthrough(
+        instance.pk,
+        getattr(instance, "_old_stats_values", None),
+        tuple(getattr(instance, field) for field in WALKTHROUGH_STATS_FIELDS),
+    )
+
+
+# Deleting several walkthroughs at once (a queryset delete, or a cascade
+# from their level) sends every pre_delete before the rows are gone and
+# every post_delete after, so the walkthroughs of each affected level are
+# remembered up front and the level is accounted for once, when the last
+# of its deleted walkthroughs is gone.
+walkthrough_deletes = threading.local()
+
+
+def get_pending_walkthrough_deletes() -> dict[int, tuple]:
+    if not hasattr(walkthrough_deletes, "levels"):
+        walkthrough_deletes.levels = {}
+    return walkthrough_deletes.levels
+
+
+@receiver(pre_delete, sender=Walkthrough)
+def remember_level_walkthroughs(sender, instance, **kwargs):
+    pending = get_pending_walkthrough_deletes()
+    if instance.level_id not in pending:
+        walkthroughs = {
+            pk: (status, walkthrough_type)
+            for pk, status, walkthrough_type in Walkthrough.objects.filter(
+                level_id=instance.level_id
+            ).values_list("pk", "status", "walkthrough_type")
+        }
+        pending[instance.level_id] = (
+            list(walkthroughs.values()),
+            walkthroughs,
+            set(),
+        )
+    pending[instance.level_id][2].add(instance.pk)
+
+
+@receiver(post_delete, sender=Walkthrough)
+def update_site_stats_on_walkthrough_delete(sender, instance, **kwargs):
+    pending = get_pending_walkthrough_deletes()
+    if instance.level_id not in pending:
+        return
+    old_walkthroughs, walkthroughs, pks = pending[instance.level_id]
+    walkthroughs.pop(instance.pk, None)
+    pks.discard(instance.pk)
+    if pks:
+        return
+    del pending[instance.level_id]
+    update_site_stats_for_level_walkthroughs(
+        instance.level_id, old_walkthroughs, list(walkthroughs.values())
+    )
+
+
+@receiver(post_save, sender=Rating)
+def update_site_stats_on_rating_save(sender, instance, created, **kwargs):
+    if created:
+        update_site_stats_count("total_ratings", 1)
+
+
+@receiver(post_delete, sender=Rating)
+def update_site_stats_on_rating_delete(sender, instance, **kwargs):
+    update_site_stats_count("total_ratings", -1)
+
+
+@receiver(post_save, sender=Review)
+def update_site_stats_on_review_save(sender, instance, created, **kwargs):
+    if created:
+        update_site_stats_count("total_reviews", 1)
+
+
+@receiver(post_delete, sender=Review)
+def update_site_stats_on_review_delete(sender, instance, **kwargs):
+    update_site_stats_count("total_reviews", -1)
@@ -0,0 +1,67 @@
+import pytest
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from trcustoms.config.logic import CONFIG_VERSION_CACHE_KEY
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.tags.tests.factories import TagFactory
+
+
+@pytest.fixture(autouse=True)
+def fixture_clear_config_cache() -> None:
+    cache.delete(CONFIG_VERSION_CACHE_KEY)
+
+
+@pytest.mark.django_db
+def test_config_returns_etag(api_client: APIClient) -> None:
+    response = api_client.get("/api/config/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"]
+    assert "stats" in response.json()
+
+
+@pytest.mark.django_db
+def test_config_returns_not_modified_for_matching_etag(
+    api_client: APIClient,
+) -> None:
+    etag = api_client.get("/api/config/")["ETag"]
+
+    response = api_client.get("/api/config/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_config_is_invalidated_by_model_changes(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    etag = api_client.get("/api/config/")["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tag = TagFactory(name="new tag")
+
+    response = api_client.get("/api/config/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+    assert tag.name in [item["name"] for item in response.json()["tags"]]
+
+
+@pytest.mark.django_db
+def test_config_ignores_download_count_changes(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    level = Level.objects.get(pk=LevelFactory().pk)
+    etag = api_client.get("/api/config/")["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        level.download_count += 1
+        level.save(update_fields=["download_count"])
+
+    assert not callbacks
+    response = api_client.get("/api/config/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,220 @@
+from itertools import count
+
+import pytest
+
+from trcustoms.common.consts import RatingClassSubject
+from trcustoms.common.models import RatingClass
+from trcustoms.common.tests.factories import RatingClassFactory
+from trcustoms.config.logic import (
+    calculate_site_stats,
+    get_site_stats,
+    update_site_stats,
+)
+from trcustoms.config.models import SiteStats
+from trcustoms.levels.models import Level, LevelFile
+from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.tests.factories import RatingFactory
+from trcustoms.reviews.tests.factories import ReviewFactory
+from trcustoms.users.tests.factories import UserFactory
+from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
+from trcustoms.walkthroughs.models import Walkthrough
+from trcustoms.walkthroughs.tests.factories import WalkthroughFactory
+
+user_counter = count()
+
+
+def create_user():
+    return UserFactory(username=f"user{next(user_counter)}")
+
+
+def create_walkthrough(level: Level, walkthrough_type: str, **kwargs):
+    return WalkthroughFactory(
+        level=level,
+        author=create_user(),
+        walkthrough_type=walkthrough_type,
+        status=WalkthroughStatus.APPROVED,
+        **kwargs,
+    )
+
+
+def assert_site_stats_in_sync() -> None:
+    site_stats = SiteStats.objects.get()
+    assert {
+        key: getattr(site_stats, key) for key in calculate_site_stats()
+    } == calculate_site_stats()
+    for rating_class in RatingClass.objects.filter(
+        target=RatingClassSubject.LEVEL
+    ):
+        assert (
+            rating_class.level_count
+            == Level.objects.filter(rating_class=rating_class).count()
+        )
+
+
+@pytest.fixture(name="site_stats", autouse=True)
+def fixture_site_stats() -> SiteStats:
+    return update_site_stats()
+
+
+@pytest.mark.django_db
+def test_site_stats_follow_level_changes() -> None:
+    level1 = LevelFactory(is_approved=False)
+    level2 = LevelFactory()
+    assert_site_stats_in_sync()
+
+    level1.is_approved = True
+    level1.save()
+    assert_site_stats_in_sync()
+
+    LevelFileFactory(level=level2, download_count=3)
+    file = LevelFile.objects.get(
+        pk=LevelFileFactory(level=level1, download_count=2).pk
+    )
+    file.download_count += 1
+    file.save(update_fields=["download_count"])
+    assert_site_stats_in_sync()
+    assert get_site_stats().total_downloads == 6
+
+    level2.is_approved = False
+    level2.save(update_fields=["is_approved"])
+    assert_site_stats_in_sync()
+    assert get_site_stats().total_levels == 1
+
+    Level.objects.get(pk=level1.pk).delete()
+    assert_site_stats_in_sync()
+
+
+@pytest.mark.django_db
+def test_site_stats_follow_walkthrough_changes() -> None:
+    level1 = LevelFactory()
+    level2 = LevelFactory()
+    level3 = LevelFactory(is_approved=False)
+
+    video = create_walkthrough(level1, WalkthroughType.LINK)
+    assert_site_stats_in_sync()
+    text = create_walkthrough(level1, WalkthroughType.TEXT)
+    create_walkthrough(level1, WalkthroughType.TEXT)
+    create_walkthrough(level3, WalkthroughType.TEXT)
+    assert_site_stats_in_sync()
+    assert get_site_stats().levels_with_video_and_text_walkthroughs == 1
+
+    video.status = WalkthroughStatus.REJECTED
+    video.save()
+    assert_site_stats_in_sync()
+
+    text.level = level2
+    text.walkthrough_type = WalkthroughType.LINK
+    text.save()
+    assert_site_stats_in_sync()
+
+    text.delete()
+    assert_site_stats_in_sync()
+
+    level3.is_approved = True
+    level3.save()
+    assert_site_stats_in_sync()
+
+    level1.delete()
+    assert_site_stats_in_sync()
+    assert get_site_stats().total_walkthroughs == 1
+
+
+@pytest.mark.django_db
+def test_site_stats_follow_batch_walkthrough_deletes() -> None:
+    level1 = LevelFactory()
+    level2 = LevelFactory()
+    create_walkthrough(level1, WalkthroughType.LINK)
+    create_walkthrough(level1, WalkthroughType.TEXT)
+    create_walkthrough(level2, WalkthroughType.LINK)
+    create_walkthrough(level2, WalkthroughType.LINK)
+    before = get_site_stats()
+
+    Walkthrough.objects.filter(level=level1).delete()
+    after = get_site_stats()
+
+    assert_site_stats_in_sync()
+    assert (
+        after.levels_with_video_and_text_walkthroughs
+        == before.levels_with_video_and_text_walkthroughs - 1
+    )
+    assert (
+        after.levels_without_walkthroughs
+        == before.levels_without_walkthroughs + 1
+    )
+    assert after.total_walkthroughs == before.total_walkthroughs - 2
+
+    level2.delete()
+    assert_site_stats_in_sync()
+
+
+@pytest.mark.django_db
+def test_site_stats_follow_rating_and_review_changes() -> None:
+    RatingClassFactory(
+        target=RatingClassSubject.LEVEL,
+        position=1,
+        min_rating_count=1,
+        min_rating_average=None,
+        max_rating_average=None,
+    )
+    level = LevelFactory()
+    rating = RatingFactory(
+        level=level,
+        author=create_user(),
+        rating_type=RatingType.TRLE,
+        trle_score_gameplay=5,
+    )
+    review = ReviewFactory(level=level, author=create_user())
+    assert_site_stats_in_sync()
+    assert get_site_stats().total_ratings == 1
+
+    rating.delete()
+    review.delete()
+    assert_site_stats_in_sync()
+
+    LevelFactory(
+        rating_class=RatingClassFactory(
+            target=RatingClassSubject.LEVEL, position=1
+        )
+    )
+    assert_site_stats_in_sync()
+
+
+@pytest.mark.django_db
+def test_site_stats_follow_rated_level_deletes() -> None:
+    rating_class = RatingClassFactory(
+        target=RatingClassSubject.LEVEL,
+        position=1,
+        min_rating_count=1,
+        min_rating_average=None,
+        max_rating_average=None,
+    )
+    level1 = LevelFactory()
+    level2 = LevelFactory()
+    for level in [level1, level2]:
+        RatingFactory(
+            level=level,
+            author=create_user(),
+            rating_type=RatingType.TRLE,
+            trle_score_gameplay=5,
+        )
+    rating_class.refresh_from_db()
+    assert rating_class.level_count == 2
+
+    Level.objects.get(pk=level1.pk).delete()
+
+    rating_class.refresh_from_db()
+    assert rating_class.level_count == 1
+    assert_site_stats_in_sync()
+
+
+@pytest.mark.django_db
+def test_update_site_stats_corrects_drift() -> None:
+    LevelFactory()
+    create_walkthrough(LevelFactory(), WalkthroughType.TEXT)
+    SiteStats.objects.update(total_levels=100, levels_without_walkthroughs=0)
+    RatingClass.objects.update(level_count=5)
+
+    update_site_stats()
+
+    assert_site_stats_in_sync()
@@ -1,66 +1,48 @@
 from typing import Any
 
 from django.conf import settings
-from django.db.models import Count, Sum
+from django.utils.cache import get_conditional_response
 from rest_framework import generics, status, viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from trcustoms.common.models import Country
+from trcustoms.common.consts import RatingClassSubject
+from trcustoms.common.models import Country, RatingClass
+from trcustoms.config.logic import get_cached_config_data, get_site_stats
 from trcustoms.config.serializers import ConfigSerializer
 from trcustoms.engines.models import Engine
 from trcustoms.genres.models import Genre
 from trcustoms.levels.consts import FeatureType
-from trcustoms.levels.models import Level, LevelDifficulty, LevelDuration
+from trcustoms.levels.models import LevelDifficulty, LevelDuration
 from trcustoms.levels.serializers import FeaturedLevelsSerializer
 from trcustoms.news.models import GlobalMessage
-from trcustoms.ratings.models import Rating, RatingTemplateQuestion
-from trcustoms.reviews.models import Review
+from trcustoms.ratings.models import RatingTemplateQuestion
 from trcustoms.tags.models import Tag
 from trcustoms.tasks.update_featured_levels import get_featured_level
-from trcustoms.walkthroughs.consts import WalkthroughStatus
-from trcustoms.walkthroughs.models import Walkthrough
-
-
-def get_walkthrough_stats() -> dict[str, int]:
-    qs = Level.objects.filter(is_approved=True)
-    return dict(
-        video_and_text=qs.with_both_walkthroughs().distinct().count(),
-        video=qs.with_video_only_walkthroughs().distinct().count(),
-        text=qs.with_text_only_walkthroughs().distinct().count(),
-        none=qs.with_no_walkthroughs().distinct().count(),
-    )
 
 
 def get_rating_stats() -> list[dict[str, Any]]:
-    qs = (
-        Level.objects.all()
-        .exclude(rating_class=None)
-        .values(
-            "rating_class__id",
-            "rating_class__position",
-            "rating_class__name",
-        )
-        .annotate(level_count=Count("rating_class"))
-        .order_by("level_count")
-    )
+    qs = RatingClass.objects.filter(
+        target=RatingClassSubject.LEVEL, level_count__gt=0
+    ).order_by("level_count", "position")
 
     return [
         dict(
             rating_class=dict(
-                id=item["rating_class__id"],
-                position=item["rating_class__position"],
-                name=item["rating_class__name"],
+                id=rating_class.id,
+                position=rating_class.position,
+                name=rating_class.name,
             ),
-            level_count=item["level_count"],
+            level_count=rating_class.level_count,
         )
-        for item in qs
+        for rating_class in qs
     ]
 
 
 def get_config_data():
     message_obj = GlobalMessage.objects.first()
     global_message = message_obj.message if message_obj else None
+    site_stats = get_site_stats()
     context = dict(
         countries=Country.objects.order_by("name"),
         tags=Tag.objects.with_counts(),
@@ -83,19 +65,19 @@ def get_config_data():
             max_tag_length=settings.MAX_TAG_LENGTH,
         ),
         stats=dict(
-            total_levels=Level.objects.filter(is_approved=True).count(),
-            total_ratings=Rating.objects.all().count(),
-            total_reviews=Review.objects.all().count(),
-            total_walkthroughs=Walkthrough.objects.filter(
-                status=WalkthroughStatus.APPROVED,
-                level__is_approved=True,
-            ).count(),
-            total_downloads=(
-                Level.objects.all()
-                .aggregate(total_download_count=Sum("download_count"))
-                .get("total_download_count")
+            total_levels=site_stats.total_levels,
+            total_ratings=site_stats.total_ratings,
+            total_reviews=site_stats.total_reviews,
+            total_walkthroughs=site_stats.total_walkthroughs,
+            total_downloads=site_stats.total_downloads,
+            walkthroughs=dict(
+                video_and_text=(
+                    site_stats.levels_with_video_and_text_walkthroughs
+                ),
+                video=site_stats.levels_with_video_walkthroughs,
+                text=site_stats.levels_with_text_walkthroughs,
+                none=site_stats.levels_without_walkthroughs,
             ),
-            walkthroughs=get_walkthrough_stats(),
             ratings=get_rating_stats(),
         ),
         global_message=global_message,
@@ -108,10 +90,9 @@ class ConfigViewSet(viewsets.ViewSet):
     serializer_class = ConfigSerializer
 
     def list(self, request) -> Response:
-        return Response(
-            get_config_data(),
-            status.HTTP_200_OK,
-        )
+        etag, data = get_cached_config_data(get_config_data)
+        response = Response(data, status.HTTP_200_OK, headers={"ETag": etag})
+        return get_conditional_response(request, etag=etag, response=response)
 
 
 class FeaturedLevelsView(generics.RetrieveAPIView):
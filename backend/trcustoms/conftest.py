@@ -5,6 +5,7 @@ from typing import Any
 
 import dateutil.parser
 import pytest
+from django.core.cache import cache
 from django.db.models import QuerySet
 from django.test import override_settings
 from mimesis import Generic
@@ -14,7 +15,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from trcustoms.common.consts import RatingClassSubject
 from trcustoms.common.models import RatingClass
 from trcustoms.common.tests.factories import RatingClassFactory
-from trcustoms.ratings.logic import get_max_rating_score
+from trcustoms.ratings.logic import invalidate_rating_template_cache
 from trcustoms.scoring import get_rating_class, get_rating_classes
 from trcustoms.users.models import User
 from trcustoms.users.tests.factories import UserFactory
@@ -129,7 +130,13 @@ def fixture_rating_rating_classes() -> QuerySet:
 
 @pytest.fixture(name="clear_caches", autouse=True)
 def fixture_clear_caches() -> None:
-    get_max_rating_score.cache_clear()
+    # the test cache is prefixed per process, so only drop the keys of this
+    # process rather than flushing those of the other test workers
+    pattern = cache.make_key("*")
+    client = cache._cache.get_client(pattern, write=True)
+    if keys := list(client.scan_iter(pattern)):
+        client.delete(*keys)
+    invalidate_rating_template_cache()
     get_rating_classes.cache_clear()
     get_rating_class.cache_clear()
 
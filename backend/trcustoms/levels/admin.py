@@ -92,6 +92,7 @@ class LevelAdmin(AuditLogAdminMixin, admin.ModelAdmin):
     ]
     readonly_fields = [
         "download_count",
+        "rating_score_sum",
         "created",
         "last_updated",
         "last_file",
@@ -1,8 +1,13 @@
-from django.db.models import F, QuerySet
+import re
+from collections.abc import Iterable
 
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, DecimalField, F, Model, QuerySet
+from django.db.models.functions import Cast
+
+from trcustoms.levels.logic import LEVEL_SEARCH_CONFIG
 from trcustoms.levels.models import Level
 from trcustoms.utils import parse_bool, parse_date_range, parse_int, parse_ints
-from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
 
 
 class LevelFilter:
@@ -55,17 +60,37 @@ class SortLevelFilter(LevelFilter):
         return qs
 
 
+def get_levels_with_all(
+    through_model: type[Model], field: str, pks: Iterable[int]
+) -> QuerySet:
+    """Return ids of levels related to every one of the given objects.
+
+    The intersection is computed with a single grouped subquery on the m2m
+    table rather than by joining the table once for each id.
+    """
+    pks = set(pks)
+    return (
+        through_model.objects.filter(**{f"{field}__in": pks})
+        .order_by()
+        .values("level_id")
+        .annotate(matches=Count(field, distinct=True))
+        .filter(matches=len(pks))
+        .values("level_id")
+    )
+
+
 class AdditiveLevelFilter(LevelFilter):
     def run(self, qs: QuerySet[Level]) -> QuerySet[Level]:
         and_map = {
-            "authors": "authors__pk",
-            "tags": "tags__pk",
-            "genres": "genres__pk",
+            "authors": (Level.authors.through, "user"),
+            "tags": (Level.tags.through, "tag"),
+            "genres": (Level.genres.through, "genre"),
         }
-        for query_param, qs_key in and_map.items():
+        for query_param, (through_model, field) in and_map.items():
             if pks := parse_ints(self.qp.get(query_param)):
-                for pk in pks:
-                    qs = qs.filter(**{qs_key: pk})
+                qs = qs.filter(
+                    pk__in=get_levels_with_all(through_model, field, pks)
+                )
         return qs
 
 
@@ -104,30 +129,12 @@ class ApprovalLevelFilter(LevelFilter):
 class WalkthroughsLevelFilter(LevelFilter):
     def run(self, qs: QuerySet[Level]) -> QuerySet[Level]:
         if (value := parse_bool(self.qp.get("text_walkthroughs"))) is not None:
-            if value:
-                qs = qs.filter(
-                    walkthroughs__walkthrough_type=WalkthroughType.TEXT,
-                    walkthroughs__status=WalkthroughStatus.APPROVED,
-                )
-            else:
-                qs = qs.exclude(
-                    walkthroughs__walkthrough_type=WalkthroughType.TEXT,
-                    walkthroughs__status=WalkthroughStatus.APPROVED,
-                )
+            qs = qs.filter(has_text_walkthrough=value)
 
         if (
             value := parse_bool(self.qp.get("video_walkthroughs"))
         ) is not None:
-            if value:
-                qs = qs.filter(
-                    walkthroughs__walkthrough_type=WalkthroughType.LINK,
-                    walkthroughs__status=WalkthroughStatus.APPROVED,
-                )
-            else:
-                qs = qs.exclude(
-                    walkthroughs__walkthrough_type=WalkthroughType.LINK,
-                    walkthroughs__status=WalkthroughStatus.APPROVED,
-                )
+            qs = qs.filter(has_video_walkthrough=value)
 
         return qs
 
@@ -139,6 +146,34 @@ class ReviewsLevelFilter(LevelFilter):
         return qs
 
 
+class SearchLevelFilter(LevelFilter):
+    def run(self, qs: QuerySet[Level]) -> QuerySet[Level]:
+        if not (value := self.qp.get("search")):
+            return qs
+
+        if not (terms := re.findall(r"\w+", value)):
+            return qs.filter(name__icontains=value.strip())
+
+        # every word must prefix-match a word of the level name, authors,
+        # tags, genres or engine
+        query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=LEVEL_SEARCH_CONFIG,
+        )
+        qs = qs.filter(search_vector=query)
+        if not self.qp.get("sort"):
+            # the float4 rank does not survive the round trip through a
+            # pagination cursor, so compare it as a fixed precision number
+            qs = qs.annotate(
+                search_rank=Cast(
+                    SearchRank(F("search_vector"), query),
+                    output_field=DecimalField(max_digits=12, decimal_places=6),
+                )
+            ).order_by("-search_rank", "-created")
+        return qs
+
+
 def filter_levels_queryset(
     qs: QuerySet[Level], query_params
 ) -> QuerySet[Level]:
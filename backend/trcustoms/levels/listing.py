@@ -0,0 +1,283 @@
+"""Compact level listing built from .values() projections.
+
+LevelViewSet.list uses this instead of LevelListingSerializer when the
+client passes fields= and/or expand=. Only the requested columns are
+selected, the multi-valued relations are loaded with one query each when
+expanded, and no model instances or nested serializers are created.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from trcustoms.levels.models import Level, LevelExternalLink, LevelScreenshot
+from trcustoms.uploads.models import UploadedFile
+from trcustoms.utils import parse_list
+
+FIELDS_QUERY_PARAM = "fields"
+EXPAND_QUERY_PARAM = "expand"
+
+Row = dict[str, Any]
+Builder = Callable[[Row, str], Row | None]
+
+FILE_FIELDS = ["id", "content", "size", "md5sum"]
+USER_FIELDS = ["id", "username", "first_name", "last_name"] + [
+    f"picture__{field}" for field in FILE_FIELDS
+]
+
+
+# render dates like the serializers do, in the active time zone
+DATETIME_FIELD = serializers.DateTimeField()
+
+
+def format_datetime(value: datetime | None) -> str | None:
+    return DATETIME_FIELD.to_representation(value)
+
+
+def get_file_url(name: str | None) -> str | None:
+    if not name:
+        return None
+    return UploadedFile._meta.get_field("content").storage.url(name)
+
+
+def build_object(*fields: str) -> Builder:
+    def builder(row: Row, prefix: str) -> Row | None:
+        if row[f"{prefix}id"] is None:
+            return None
+        return {field: row[f"{prefix}{field}"] for field in fields}
+
+    return builder
+
+
+def build_file(row: Row, prefix: str) -> Row | None:
+    if row[f"{prefix}id"] is None:
+        return None
+    content = row[f"{prefix}content"]
+    return {
+        "id": row[f"{prefix}id"],
+        "url": get_file_url(content),
+        "size": row[f"{prefix}size"],
+        "md5sum": row[f"{prefix}md5sum"] if content else None,
+    }
+
+
+def build_user(row: Row, prefix: str) -> Row | None:
+    if row[f"{prefix}id"] is None:
+        return None
+    return {
+        "id": row[f"{prefix}id"],
+        "username": row[f"{prefix}username"],
+        "first_name": row[f"{prefix}first_name"],
+        "last_name": row[f"{prefix}last_name"],
+        "picture": build_file(row, f"{prefix}picture__"),
+    }
+
+
+def build_last_file(row: Row, prefix: str) -> Row | None:
+    if (file_id := row[f"{prefix}id"]) is None:
+        return None
+    return {
+        "id": file_id,
+        "version": row[f"{prefix}version"],
+        "size": row[f"{prefix}file__size"],
+        "created": format_datetime(row[f"{prefix}created"]),
+        "url": (
+            settings.HOST_SITE + f"/api/level_files/{file_id}/download"
+            if row[f"{prefix}file__content"]
+            else None
+        ),
+    }
+
+
+SCALAR_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "created",
+    "last_updated",
+    "last_user_content_updated",
+    "download_count",
+    "rating_count",
+    "review_count",
+    "walkthrough_count",
+    "is_approved",
+    "rejection_reason",
+]
+DATETIME_FIELDS = {"created", "last_updated", "last_user_content_updated"}
+
+# single-valued relations: the related fields to select and how to nest
+# them in the output
+RELATED_FIELDS: dict[str, tuple[list[str], Builder]] = {
+    "engine": (["id", "name"], build_object("id", "name")),
+    "duration": (["id", "name"], build_object("id", "name")),
+    "difficulty": (["id", "name"], build_object("id", "name")),
+    "rating_class": (
+        ["id", "name", "position"],
+        build_object("id", "name", "position"),
+    ),
+    "cover": (FILE_FIELDS, build_file),
+    "uploader": (USER_FIELDS, build_user),
+    "last_file": (
+        ["id", "version", "created", "file__size", "file__content"],
+        build_last_file,
+    ),
+}
+
+
+def get_authors(level_ids: Iterable[int]) -> dict[int, list[Row]]:
+    result = defaultdict(list)
+    for row in (
+        Level.authors.through.objects.filter(level_id__in=level_ids)
+        .order_by("pk")
+        .values("level_id", *[f"user__{field}" for field in USER_FIELDS])
+    ):
+        result[row["level_id"]].append(build_user(row, "user__"))
+    return result
+
+
+def get_named_objects(
+    through_model, field: str, level_ids: Iterable[int]
+) -> dict[int, list[Row]]:
+    result = defaultdict(list)
+    for row in (
+        through_model.objects.filter(level_id__in=level_ids)
+        .order_by(f"{field}__name")
+        .values("level_id", f"{field}__id", f"{field}__name")
+    ):
+        result[row["level_id"]].append(
+            {"id": row[f"{field}__id"], "name": row[f"{field}__name"]}
+        )
+    return result
+
+
+def get_screenshots(level_ids: Iterable[int]) -> dict[int, list[Row]]:
+    result = defaultdict(list)
+    for row in (
+        LevelScreenshot.objects.filter(level_id__in=level_ids)
+        .order_by("position")
+        .values(
+            "level_id",
+            "id",
+            "position",
+            *[f"file__{field}" for field in FILE_FIELDS],
+        )
+    ):
+        result[row["level_id"]].append(
+            {
+                "id": row["id"],
+                "position": row["position"],
+                "file": build_file(row, "file__"),
+            }
+        )
+    return result
+
+
+def get_external_links(level_ids: Iterable[int]) -> dict[int, list[Row]]:
+    result = defaultdict(list)
+    for row in (
+        LevelExternalLink.objects.filter(level_id__in=level_ids)
+        .order_by("position")
+        .values("level_id", "id", "position", "url", "link_type")
+    ):
+        result[row.pop("level_id")].append(row)
+    return result
+
+
+# multi-valued relations, only loaded when expanded
+EXPANDABLE_FIELDS: dict[str, Callable[[list[int]], dict[int, list[Row]]]] = {
+    "authors": get_authors,
+    "genres": lambda level_ids: get_named_objects(
+        Level.genres.through, "genre", level_ids
+    ),
+    "tags": lambda level_ids: get_named_objects(
+        Level.tags.through, "tag", level_ids
+    ),
+    "screenshots": get_screenshots,
+    "external_links": get_external_links,
+}
+
+DEFAULT_FIELDS = SCALAR_FIELDS + list(RELATED_FIELDS)
+
+
+def is_compact_listing_requested(query_params) -> bool:
+    return (
+        FIELDS_QUERY_PARAM in query_params
+        or EXPAND_QUERY_PARAM in query_params
+    )
+
+
+def get_compact_listing_fields(query_params) -> list[str]:
+    """Return the level fields requested through fields= and expand=.
+
+    fields= narrows the default scalar and single-valued fields and may
+    also name expandable ones; expand= adds multi-valued relations.
+    """
+    fields = parse_list(query_params.get(FIELDS_QUERY_PARAM)) or list(
+        DEFAULT_FIELDS
+    )
+    expand = parse_list(query_params.get(EXPAND_QUERY_PARAM))
+
+    errors = {}
+    if unknown := [
+        field
+        for field in fields
+        if field not in DEFAULT_FIELDS and field not in EXPANDABLE_FIELDS
+    ]:
+        errors[FIELDS_QUERY_PARAM] = [
+            f"Unknown field: {field}" for field in unknown
+        ]
+    if unknown := [
+        field for field in expand if field not in EXPANDABLE_FIELDS
+    ]:
+        errors[EXPAND_QUERY_PARAM] = [
+            f"Unknown relation: {field}" for field in unknown
+        ]
+    if errors:
+        raise ValidationError(errors)
+
+    return list(dict.fromkeys(["id", *fields, *expand]))
+
+
+def get_compact_listing(level_ids: list[int], fields: list[str]) -> list[Row]:
+    """Return the listing rows of the given levels, in the given order."""
+    paths = []
+    for field in fields:
+        if field in SCALAR_FIELDS:
+            paths.append(field)
+        elif field in RELATED_FIELDS:
+            related_fields, _builder = RELATED_FIELDS[field]
+            paths.extend(f"{field}__{path}" for path in related_fields)
+
+    rows = {
+        row["id"]: row
+        for row in Level.objects.filter(pk__in=level_ids)
+        .order_by()
+        .values(*paths)
+    }
+    expanded = {
+        field: EXPANDABLE_FIELDS[field](level_ids)
+        for field in fields
+        if field in EXPANDABLE_FIELDS
+    }
+
+    result = []
+    for level_id in level_ids:
+        row = rows[level_id]
+        item = {}
+        for field in fields:
+            if field in DATETIME_FIELDS:
+                item[field] = format_datetime(row[field])
+            elif field in SCALAR_FIELDS:
+                item[field] = row[field]
+            elif field in RELATED_FIELDS:
+                _related_fields, builder = RELATED_FIELDS[field]
+                item[field] = builder(row, f"{field}__")
+            else:
+                item[field] = expanded[field].get(level_id, [])
+        result.append(item)
+    return result
@@ -1,10 +1,27 @@
 import hashlib
-from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
 from urllib.parse import urljoin
 
 from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
 from django.core.cache import cache
-from django.db.models import F, Max, Min, Sum, Value
+from django.db.models import (
+    Count,
+    Exists,
+    Expression,
+    F,
+    Func,
+    JSONField,
+    Max,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Concat, JSONObject, NullIf
 from rest_framework.request import Request
 
 from trcustoms.audit_logs.utils import (
@@ -12,11 +29,54 @@ from trcustoms.audit_logs.utils import (
     track_model_update,
 )
 from trcustoms.common.utils.discord import send_discord_webhook
+from trcustoms.engines.models import Engine
 from trcustoms.levels.models import Level, LevelFile
 from trcustoms.mails import send_level_approved_mail, send_level_rejected_mail
 from trcustoms.ratings.consts import RatingType
-from trcustoms.ratings.models import RatingTemplateQuestion
-from trcustoms.tasks import update_awards
+from trcustoms.ratings.logic import get_rating_template_points
+from trcustoms.ratings.models import Rating
+from trcustoms.reviews.models import Review
+from trcustoms.tasks import buffer_download, schedule_award_updates
+from trcustoms.uploads.storage import generate_presigned_url
+from trcustoms.utils import aggregate_subquery, update_denormalized_field
+from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
+from trcustoms.walkthroughs.models import Walkthrough
+
+LEVEL_CACHE_TIMEOUT = 60 * 60
+
+
+def get_level_version_cache_key(level_id: int) -> str:
+    return f"level_version__{level_id}"
+
+
+def get_cached_level_data(
+    level_id: int, variant: str, factory: Callable[[], Any]
+) -> Any:
+    """Return the serialized level, computing it with factory when needed.
+
+    The payload is cached under the current version of the level, so
+    bumping the version makes any payload computed before that point
+    unreachable. The variant tells apart payloads that depend on the
+    request, such as absolute URLs.
+    """
+    version = cache.get_or_set(
+        get_level_version_cache_key(level_id), 0, timeout=None
+    )
+    cache_key = f"level_data__{level_id}__{version}__{variant}"
+    data = cache.get(cache_key)
+    if data is None:
+        data = factory()
+        cache.set(cache_key, data, timeout=LEVEL_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_level_cache(*level_ids: int) -> None:
+    for level_id in set(level_ids):
+        if level_id is None:
+            continue
+        cache_key = get_level_version_cache_key(level_id)
+        cache.add(cache_key, 0, timeout=None)
+        cache.incr(cache_key)
 
 
 def send_level_submission_discord_notification(level: Level) -> None:
@@ -56,8 +116,7 @@ def approve_level(level: Level, request: Request | None) -> None:
 
         level.rejection_reason = None
         level.save()
-        for author in level.authors.iterator():
-            update_awards.delay(author.pk)
+        schedule_award_updates(*level.authors.values_list("pk", flat=True))
     clear_audit_log_action_flags(obj=level)
 
 
@@ -78,71 +137,275 @@ def reject_level(level: Level, request: Request | None, reason: str) -> None:
         level.save()
 
 
-def get_category_ratings(level: Level) -> None:
-    category_to_min_points = defaultdict(int)
-    category_to_max_points = defaultdict(int)
-    for question in (
-        RatingTemplateQuestion.objects.annotate(
-            min_points=Min(F("answers__points") * F("weight")),
-            max_points=Max(F("answers__points") * F("weight")),
-        )
-        .order_by("position")
-        .values_list(
-            "category", "min_points", "max_points", "weight", named=True
-        )
-    ):
-        category_to_min_points[question.category] += question.min_points
-        category_to_max_points[question.category] += question.max_points
-
-    category_to_total_points = {
-        entry.category: entry.category_sum
-        for entry in (
-            level.ratings.filter(rating_type=RatingType.TRC)
-            .annotate(category=F("answers__question__category"))
-            .values("category")
-            .annotate(
-                category_sum=Sum(
-                    F("answers__points") * F("answers__question__weight")
-                )
-                / Value(
-                    level.ratings.filter(rating_type=RatingType.TRC).count()
-                )
-            )
-            .values_list("category", "category_sum", named=True)
-        )
-    }
-
-    categories = category_to_max_points.keys()
-
-    data = [
+def get_category_ratings(level: Level) -> list[dict[str, Any]]:
+    """Return the average TRC rating points of the level per category,
+    along with the points range allowed by the rating template.
+    """
+    rating_count = level.trc_rating_count
+    return [
         {
             "category": category,
-            "total_points": category_to_total_points.get(category, 0),
-            "min_points": category_to_min_points[category],
-            "max_points": category_to_max_points[category],
+            # truncate like the integer division this used to run in SQL
+            "total_points": (
+                int(
+                    level.rating_category_points.get(category, 0)
+                    / rating_count
+                )
+                if rating_count
+                else 0
+            ),
+            "min_points": points["min_points"],
+            "max_points": points["max_points"],
         }
-        for category in categories
+        for category, points in get_rating_template_points().items()
     ]
 
-    return data
-
 
 def increment_download_counter(file: LevelFile, request: Request) -> None:
-    """Increment download count only once per fingerprint within expiration."""
+    """Increment download count only once per fingerprint within expiration.
+
+    The increment is buffered in Redis and written to the database in
+    batches by the flush_download_counters task.
+    """
     ip: str = request.META.get("REMOTE_ADDR", "")
     agent: str = request.META.get("HTTP_USER_AGENT", "")
     level_id: int = file.level_id
     raw_fp: str = f"{ip}:{agent}:{level_id}"
-    print(raw_fp)
     fp_key: str = hashlib.sha256(raw_fp.encode("utf-8")).hexdigest()
-    if cache.get(fp_key):
-        return
-
-    file.download_count += 1
-    file.save(update_fields=["download_count"])
-    print("what")
-    cache.set(
+    if not cache.add(
         fp_key,
         True,
         timeout=int(settings.DOWNLOAD_FINGERPRINT_EXPIRATION.total_seconds()),
+    ):
+        return
+
+    buffer_download(file.pk)
+
+
+# serve a cached download URL for this fraction of its validity at most,
+# so that every redirect leaves the client enough time to use it
+DOWNLOAD_URL_CACHE_FRACTION = 0.2
+
+
+def get_level_file_download_url(file: LevelFile, filename: str) -> str:
+    """Return a presigned S3 URL downloading the level file as filename.
+
+    URLs are cached per file and filename, so that popular files are not
+    signed again on every download.
+    """
+    file_field = file.file.content
+    filename_hash = hashlib.md5(filename.encode()).hexdigest()
+    cache_key = f"level_file_download_url__{file.pk}__{filename_hash}"
+    if url := cache.get(cache_key):
+        return url
+
+    expires_in = int(settings.DOWNLOAD_URL_EXPIRATION.total_seconds())
+    url = generate_presigned_url(
+        file_field.storage,
+        file_field.name,
+        expires_in=expires_in,
+        ResponseContentDisposition=f"attachment; filename={filename}",
+    )
+    cache.set(
+        cache_key, url, timeout=int(expires_in * DOWNLOAD_URL_CACHE_FRACTION)
     )
+    return url
+
+
+LEVEL_SEARCH_CONFIG = "simple"
+
+
+def get_level_search_vector() -> SearchVector:
+    """Build the expression indexed by Level.search_vector.
+
+    Level names weigh the most, followed by the author names, the tags and
+    genres, and finally the engine.
+    """
+    authors = aggregate_subquery(
+        Level.authors.through.objects.all(),
+        "level",
+        StringAgg(
+            Concat(
+                "user__username",
+                Value(" "),
+                "user__first_name",
+                Value(" "),
+                "user__last_name",
+            ),
+            delimiter=" ",
+            ordering="user__username",
+        ),
+    )
+    tags = aggregate_subquery(
+        Level.tags.through.objects.all(),
+        "level",
+        StringAgg("tag__name", delimiter=" ", ordering="tag__name"),
+    )
+    genres = aggregate_subquery(
+        Level.genres.through.objects.all(),
+        "level",
+        StringAgg("genre__name", delimiter=" ", ordering="genre__name"),
+    )
+    engine = Subquery(
+        Engine.objects.filter(pk=OuterRef("engine_id")).values("name")
+    )
+    return (
+        SearchVector("name", weight="A", config=LEVEL_SEARCH_CONFIG)
+        + SearchVector(authors, weight="B", config=LEVEL_SEARCH_CONFIG)
+        + SearchVector(tags, genres, weight="C", config=LEVEL_SEARCH_CONFIG)
+        + SearchVector(engine, weight="D", config=LEVEL_SEARCH_CONFIG)
+    )
+
+
+def update_level_search_vectors(queryset: QuerySet | None = None) -> int:
+    """Recalculate the full-text search data of the given levels."""
+    if queryset is None:
+        queryset = Level.objects.all()
+    return update_denormalized_field(
+        queryset, "search_vector", get_level_search_vector()
+    )
+
+
+def get_level_file_fields() -> dict[str, Expression]:
+    """Build the expressions of the Level fields derived from its files."""
+    return {
+        "download_count": aggregate_subquery(
+            LevelFile.objects.all(), "level", Sum("download_count"), 0
+        ),
+        "last_file": Subquery(
+            LevelFile.objects.active()
+            .filter(level=OuterRef("pk"))
+            .order_by("-version")
+            .values("pk")[:1]
+        ),
+        "last_user_content_updated": Subquery(
+            LevelFile.objects.filter(level=OuterRef("pk"))
+            .order_by()
+            .values("level")
+            .annotate(file_count=Count("*"), value=Max("created"))
+            .filter(file_count__gt=1)
+            .values("value")
+        ),
+    }
+
+
+def update_level_file_fields(level: Level) -> None:
+    """Recalculate the Level fields derived from its files.
+
+    Reads the stored and the recalculated values with one query, and saves
+    only the fields that changed.
+    """
+    fields = get_level_file_fields()
+    attnames = {
+        field: Level._meta.get_field(field).attname for field in fields
+    }
+    row = (
+        Level.objects.filter(pk=level.pk)
+        .values(
+            *attnames.values(),
+            **{f"new_{field}": value for field, value in fields.items()},
+        )
+        .first()
+    )
+    if not row:
+        return
+    if changed_fields := [
+        field
+        for field, attname in attnames.items()
+        if row[f"new_{field}"] != row[attname]
+    ]:
+        for field in changed_fields:
+            setattr(level, attnames[field], row[f"new_{field}"])
+        level.save(update_fields=changed_fields)
+
+
+def get_level_rating_category_points() -> Func:
+    """Build the Level.rating_category_points expression.
+
+    Categories without any points are left out, like in the incremental
+    updates done as ratings change.
+    """
+    answers = Rating.answers.through.objects.filter(
+        rating__rating_type=RatingType.TRC
+    )
+    return Func(
+        JSONObject(
+            **{
+                category: NullIf(
+                    aggregate_subquery(
+                        answers.filter(
+                            ratingtemplateanswer__question__category=category
+                        ),
+                        "rating__level",
+                        Sum(
+                            F("ratingtemplateanswer__points")
+                            * F("ratingtemplateanswer__question__weight")
+                        ),
+                        0,
+                    ),
+                    Value(0),
+                )
+                for category in get_rating_template_points()
+            }
+        ),
+        function="JSONB_STRIP_NULLS",
+        output_field=JSONField(),
+    )
+
+
+def update_level_denormalized_fields(
+    queryset: QuerySet | None = None,
+) -> dict[str, int]:
+    """Set-based counterpart of the Level.update_* methods.
+
+    Recalculates each field for all levels in the queryset with a single
+    UPDATE. Returns the number of changed levels for each field.
+    """
+    if queryset is None:
+        queryset = Level.objects.all()
+
+    values = {
+        "rating_count": aggregate_subquery(
+            Rating.objects.all(), "level", Count("*"), 0
+        ),
+        "rating_score_sum": aggregate_subquery(
+            Rating.objects.all(), "level", Sum("score"), 0.0
+        ),
+        "review_count": aggregate_subquery(
+            Review.objects.all(), "level", Count("*"), 0
+        ),
+        "walkthrough_count": aggregate_subquery(
+            Walkthrough.objects.filter(status=WalkthroughStatus.APPROVED),
+            "level",
+            Count("*"),
+            0,
+        ),
+        "has_text_walkthrough": Exists(
+            Walkthrough.objects.filter(
+                level=OuterRef("pk"),
+                status=WalkthroughStatus.APPROVED,
+                walkthrough_type=WalkthroughType.TEXT,
+            )
+        ),
+        "has_video_walkthrough": Exists(
+            Walkthrough.objects.filter(
+                level=OuterRef("pk"),
+                status=WalkthroughStatus.APPROVED,
+                walkthrough_type=WalkthroughType.LINK,
+            )
+        ),
+        **get_level_file_fields(),
+        "search_vector": get_level_search_vector(),
+        "trc_rating_count": aggregate_subquery(
+            Rating.objects.filter(rating_type=RatingType.TRC),
+            "level",
+            Count("*"),
+            0,
+        ),
+        "rating_category_points": get_level_rating_category_points(),
+    }
+
+    return {
+        field: update_denormalized_field(queryset, field, value)
+        for field, value in values.items()
+    }
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:12
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, Max, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def forward_func(apps, schema_editor):
+    Level = apps.get_model("levels", "Level")
+    Rating = apps.get_model("ratings", "Rating")
+    RatingTemplateQuestion = apps.get_model(
+        "ratings", "RatingTemplateQuestion"
+    )
+
+    max_score = RatingTemplateQuestion.objects.annotate(
+        value=Max(F("answers__points")) * F("weight")
+    ).aggregate(Sum("value"))["value__sum"]
+
+    level_scores = {}
+
+    for level_id, total in (
+        Rating.objects.filter(rating_type="le")
+        .values("level_id")
+        .annotate(
+            total=Sum(
+                Coalesce(F("trle_score_gameplay"), Value(0))
+                + Coalesce(F("trle_score_enemies"), Value(0))
+                + Coalesce(F("trle_score_atmosphere"), Value(0))
+                + Coalesce(F("trle_score_lighting"), Value(0))
+            )
+        )
+        .values_list("level_id", "total")
+    ):
+        level_scores[level_id] = (total or 0) / 40.0
+
+    if max_score:
+        for level_id, total in (
+            Rating.objects.filter(rating_type="mo")
+            .values("level_id")
+            .annotate(
+                total=Sum(
+                    F("answers__points") * F("answers__question__weight"),
+                    output_field=FloatField(),
+                )
+            )
+            .values_list("level_id", "total")
+        ):
+            level_scores[level_id] = (
+                level_scores.get(level_id, 0) + (total or 0) / max_score
+            )
+
+    Level.objects.bulk_update(
+        [
+            Level(id=level_id, rating_score_sum=score_sum)
+            for level_id, score_sum in level_scores.items()
+        ],
+        ["rating_score_sum"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("levels", "0021_level_walkthrough_count"),
+        ("ratings", "0006_alter_rating_last_user_content_updated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="level",
+            name="rating_score_sum",
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(forward_func, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:49
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def forward_func(apps, schema_editor):
+    Level = apps.get_model("levels", "Level")
+    RatingClass = apps.get_model("common", "RatingClass")
+
+    for rating_class_id, level_count in (
+        Level.objects.exclude(rating_class=None)
+        .values("rating_class_id")
+        .annotate(level_count=Count("pk"))
+        .values_list("rating_class_id", "level_count")
+    ):
+        RatingClass.objects.filter(pk=rating_class_id).update(
+            level_count=level_count
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("common", "0006_ratingclass_level_count"),
+        ("levels", "0022_level_rating_score_sum"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_func, migrations.RunPython.noop),
+    ]
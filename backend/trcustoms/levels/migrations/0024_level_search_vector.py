@@ -0,0 +1,79 @@
+# Generated by Django 4.2.3 on 2026-10-18 14:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+
+def forward_func(apps, schema_editor):
+    Level = apps.get_model("levels", "Level")
+    Engine = apps.get_model("engines", "Engine")
+
+    def aggregate_names(through_model, expression, ordering):
+        return Subquery(
+            through_model.objects.filter(level=OuterRef("pk"))
+            .order_by()
+            .values("level")
+            .annotate(
+                value=StringAgg(expression, delimiter=" ", ordering=ordering)
+            )
+            .values("value")
+        )
+
+    authors = aggregate_names(
+        Level.authors.through,
+        Concat(
+            "user__username",
+            Value(" "),
+            "user__first_name",
+            Value(" "),
+            "user__last_name",
+        ),
+        "user__username",
+    )
+    tags = aggregate_names(Level.tags.through, "tag__name", "tag__name")
+    genres = aggregate_names(
+        Level.genres.through, "genre__name", "genre__name"
+    )
+    engine = Subquery(
+        Engine.objects.filter(pk=OuterRef("engine_id")).values("name")
+    )
+
+    Level.objects.update(
+        search_vector=(
+            SearchVector("name", weight="A", config="simple")
+            + SearchVector(authors, weight="B", config="simple")
+            + SearchVector(tags, genres, weight="C", config="simple")
+            + SearchVector(engine, weight="D", config="simple")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("engines", "0002_alter_engine_options_engine_position"),
+        ("genres", "0002_rename_levelgenre_genre_alter_genre_options"),
+        ("tags", "0002_rename_leveltag_tag"),
+        ("levels", "0023_backfill_rating_class_level_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="level",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="level",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="level_search_vector_idx"
+            ),
+        ),
+        migrations.RunPython(forward_func, migrations.RunPython.noop),
+    ]
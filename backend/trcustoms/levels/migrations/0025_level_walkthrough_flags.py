@@ -0,0 +1,44 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:20
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def forward_func(apps, schema_editor):
+    Level = apps.get_model("levels", "Level")
+    Walkthrough = apps.get_model("walkthroughs", "Walkthrough")
+
+    def has_walkthrough(walkthrough_type):
+        return Exists(
+            Walkthrough.objects.filter(
+                level=OuterRef("pk"),
+                status="app",
+                walkthrough_type=walkthrough_type,
+            )
+        )
+
+    Level.objects.update(
+        has_text_walkthrough=has_walkthrough("t"),
+        has_video_walkthrough=has_walkthrough("l"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("levels", "0024_level_search_vector"),
+        ("walkthroughs", "0009_alter_walkthrough_last_user_content_updated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="level",
+            name="has_text_walkthrough",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name="level",
+            name="has_video_walkthrough",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(forward_func, migrations.RunPython.noop),
+    ]
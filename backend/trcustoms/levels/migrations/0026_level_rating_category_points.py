@@ -0,0 +1,73 @@
+# Generated by Django 4.2.3 on 2026-10-18 16:40
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def forward_func(apps, schema_editor):
+    Level = apps.get_model("levels", "Level")
+    Rating = apps.get_model("ratings", "Rating")
+
+    Level.objects.update(
+        trc_rating_count=Coalesce(
+            Subquery(
+                Rating.objects.filter(level=OuterRef("pk"), rating_type="mo")
+                .order_by()
+                .values("level")
+                .annotate(value=Count("*"))
+                .values("value")
+            ),
+            Value(0),
+        )
+    )
+
+    level_to_points = defaultdict(dict)
+    for row in (
+        Rating.answers.through.objects.filter(
+            rating__rating_type="mo",
+            ratingtemplateanswer__question__category__isnull=False,
+        )
+        .order_by()
+        .values("rating__level", "ratingtemplateanswer__question__category")
+        .annotate(
+            points=Sum(
+                F("ratingtemplateanswer__points")
+                * F("ratingtemplateanswer__question__weight")
+            )
+        )
+    ):
+        if row["points"]:
+            level_to_points[row["rating__level"]][
+                row["ratingtemplateanswer__question__category"]
+            ] = row["points"]
+
+    levels = list(Level.objects.filter(pk__in=level_to_points).only("pk"))
+    for level in levels:
+        level.rating_category_points = level_to_points[level.pk]
+    Level.objects.bulk_update(
+        levels, ["rating_category_points"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("levels", "0025_level_walkthrough_flags"),
+        ("ratings", "0007_rating_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="level",
+            name="rating_category_points",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="level",
+            name="trc_rating_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(forward_func, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.db.models import F, UniqueConstraint, Value
+from django.db.models import Count, F, Q, Sum, UniqueConstraint, Value
 from django.db.models.functions import Coalesce, Lower
 
 from trcustoms.audit_logs import registry
@@ -11,6 +13,7 @@ from trcustoms.common.models import (
 from trcustoms.engines.models import Engine
 from trcustoms.genres.models import Genre
 from trcustoms.levels.consts import FeatureType, LevelLinkType
+from trcustoms.ratings.consts import RatingType
 from trcustoms.tags.models import Tag
 from trcustoms.uploads.models import UploadedFile
 from trcustoms.users.models import User
@@ -65,37 +68,23 @@ class LevelQuerySet(models.QuerySet):
 
     def with_video_only_walkthroughs(self) -> models.QuerySet:
         return self.filter(
-            walkthroughs__walkthrough_type=WalkthroughType.LINK,
-            walkthroughs__status=WalkthroughStatus.APPROVED,
-        ).exclude(
-            id__in=Level.objects.filter(
-                walkthroughs__walkthrough_type=WalkthroughType.TEXT,
-                walkthroughs__status=WalkthroughStatus.APPROVED,
-            )
+            has_video_walkthrough=True, has_text_walkthrough=False
         )
 
     def with_text_only_walkthroughs(self) -> models.QuerySet:
         return self.filter(
-            walkthroughs__walkthrough_type=WalkthroughType.TEXT,
-            walkthroughs__status=WalkthroughStatus.APPROVED,
-        ).exclude(
-            id__in=Level.objects.filter(
-                walkthroughs__walkthrough_type=WalkthroughType.LINK,
-                walkthroughs__status=WalkthroughStatus.APPROVED,
-            )
+            has_video_walkthrough=False, has_text_walkthrough=True
         )
 
     def with_both_walkthroughs(self) -> models.QuerySet:
         return self.filter(
-            walkthroughs__walkthrough_type=WalkthroughType.TEXT,
-            walkthroughs__status=WalkthroughStatus.APPROVED,
-        ).filter(
-            walkthroughs__walkthrough_type=WalkthroughType.LINK,
-            walkthroughs__status=WalkthroughStatus.APPROVED,
+            has_video_walkthrough=True, has_text_walkthrough=True
         )
 
     def with_no_walkthroughs(self) -> models.QuerySet:
-        return self.exclude(walkthroughs__status=WalkthroughStatus.APPROVED)
+        return self.filter(
+            has_video_walkthrough=False, has_text_walkthrough=False
+        )
 
 
 @registry.register_model(name_getter=lambda instance: instance.name)
@@ -137,8 +126,14 @@ class Level(UserContentDatesInfo, DatesInfo):
 
     # denormalized fields for faster db lookups
     rating_count = models.PositiveIntegerField(default=0)
+    rating_score_sum = models.FloatField(default=0)
+    trc_rating_count = models.PositiveIntegerField(default=0)
+    # TRC rating points summed per template question category, weighted
+    rating_category_points = models.JSONField(default=dict, blank=True)
     review_count = models.PositiveIntegerField(default=0)
     walkthrough_count = models.PositiveIntegerField(default=0)
+    has_text_walkthrough = models.BooleanField(default=False, db_index=True)
+    has_video_walkthrough = models.BooleanField(default=False, db_index=True)
     download_count = models.IntegerField(default=0)
     last_file = models.OneToOneField(
         "LevelFile",
@@ -147,10 +142,14 @@ class Level(UserContentDatesInfo, DatesInfo):
         null=True,
         related_name="+",
     )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-created"]
         default_permissions = []
+        indexes = [
+            GinIndex(fields=["search_vector"], name="level_search_vector_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} (id={self.pk})"
@@ -162,6 +161,35 @@ class Level(UserContentDatesInfo, DatesInfo):
             if save:
                 self.save(update_fields=["rating_count"])
 
+    def update_rating_category_points(self, save: bool = True) -> None:
+        ratings = self.ratings.filter(rating_type=RatingType.TRC)
+        values = {
+            "trc_rating_count": ratings.count(),
+            "rating_category_points": {
+                category: points
+                for category, points in ratings.filter(
+                    answers__question__category__isnull=False
+                )
+                .order_by()
+                .values_list("answers__question__category")
+                .annotate(
+                    points=Sum(
+                        F("answers__points") * F("answers__question__weight")
+                    )
+                )
+                if points
+            },
+        }
+        if changed_fields := [
+            field
+            for field, value in values.items()
+            if value != getattr(self, field)
+        ]:
+            for field in changed_fields:
+                setattr(self, field, values[field])
+            if save:
+                self.save(update_fields=changed_fields)
+
     def update_review_count(self, save: bool = True) -> None:
         review_count = self.reviews.count()
         if review_count != self.review_count:
@@ -170,13 +198,31 @@ class Level(UserContentDatesInfo, DatesInfo):
                 self.save(update_fields=["review_count"])
 
     def update_walkthrough_count(self, save: bool = True) -> None:
-        walkthrough_count = self.walkthroughs.filter(
+        stats = self.walkthroughs.filter(
             status=WalkthroughStatus.APPROVED
-        ).count()
-        if walkthrough_count != self.walkthrough_count:
-            self.walkthrough_count = walkthrough_count
+        ).aggregate(
+            walkthrough_count=Count("pk"),
+            text_walkthrough_count=Count(
+                "pk", filter=Q(walkthrough_type=WalkthroughType.TEXT)
+            ),
+            video_walkthrough_count=Count(
+                "pk", filter=Q(walkthrough_type=WalkthroughType.LINK)
+            ),
+        )
+        values = {
+            "walkthrough_count": stats["walkthrough_count"],
+            "has_text_walkthrough": stats["text_walkthrough_count"] > 0,
+            "has_video_walkthrough": stats["video_walkthrough_count"] > 0,
+        }
+        if changed_fields := [
+            field
+            for field, value in values.items()
+            if value != getattr(self, field)
+        ]:
+            for field in changed_fields:
+                setattr(self, field, values[field])
             if save:
-                self.save(update_fields=["walkthrough_count"])
+                self.save(update_fields=changed_fields)
 
     def update_download_count(self, save: bool = True) -> None:
         download_count = sum(
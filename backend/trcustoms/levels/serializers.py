@@ -22,7 +22,7 @@ from trcustoms.levels.models import (
 from trcustoms.mails import send_level_submitted_mail
 from trcustoms.tags.models import Tag
 from trcustoms.tags.serializers import TagNestedSerializer
-from trcustoms.tasks import update_awards
+from trcustoms.tasks import schedule_award_updates
 from trcustoms.uploads.consts import UploadType
 from trcustoms.uploads.models import UploadedFile
 from trcustoms.uploads.serializers import UploadedFileNestedSerializer
@@ -376,8 +376,7 @@ class LevelDetailsSerializer(LevelListingSerializer):
 
         level = self.handle_m2m(level_factory, validated_data)
         send_level_submitted_mail(level)
-        for author in level.authors.iterator():
-            update_awards.delay(author.pk)
+        schedule_award_updates(*level.authors.values_list("pk", flat=True))
         return level
 
     def update(self, instance, validated_data):
@@ -392,8 +391,9 @@ class LevelDetailsSerializer(LevelListingSerializer):
         level = self.handle_m2m(level_factory, validated_data)
         current_authors = list(level.authors.all())
 
-        for author in [*prev_authors, *current_authors]:
-            update_awards.delay(author.pk)
+        schedule_award_updates(
+            *(author.pk for author in [*prev_authors, *current_authors])
+        )
         return level
 
     class Meta:
@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import Q, QuerySet
 from django.db.models.signals import (
     m2m_changed,
     post_delete,
@@ -7,8 +9,36 @@ from django.db.models.signals import (
 )
 from django.dispatch import receiver
 
-from trcustoms.levels.models import Level, LevelFile
+from trcustoms.common.models import RatingClass
+from trcustoms.engines.models import Engine
+from trcustoms.genres.models import Genre
+from trcustoms.levels.logic import (
+    invalidate_level_cache,
+    update_level_file_fields,
+    update_level_search_vectors,
+)
+from trcustoms.levels.models import (
+    Level,
+    LevelDifficulty,
+    LevelDuration,
+    LevelExternalLink,
+    LevelFile,
+    LevelScreenshot,
+)
+from trcustoms.ratings.models import Rating
+from trcustoms.reviews.models import Review
+from trcustoms.tags.models import Tag
 from trcustoms.users.models import User
+from trcustoms.walkthroughs.models import Walkthrough
+
+# related models contributing to Level.search_vector: level field pointing
+# to the model, and the model fields that end up in the search data
+SEARCH_VECTOR_SOURCES = {
+    User: ("authors", {"username", "first_name", "last_name"}),
+    Tag: ("tags", {"name"}),
+    Genre: ("genres", {"name"}),
+    Engine: ("engine", {"name"}),
+}
 
 
 @receiver(pre_save, sender=LevelFile)
@@ -25,27 +55,29 @@ def update_level_version(sender, instance, **kwargs):
 
 
 @receiver(post_save, sender=LevelFile)
-def update_level_download_count(sender, instance, **kwargs):
-    instance.level.update_download_count()
-
-
-@receiver(post_save, sender=LevelFile)
-def update_level_last_file(sender, instance, **kwargs):
-    instance.level.update_last_file()
+@receiver(post_delete, sender=LevelFile)
+def update_level_on_files_change(sender, instance, **kwargs):
+    # nothing to update when the files go away along with their level
+    origin = kwargs.get("origin")
+    if isinstance(origin, Level) or (
+        isinstance(origin, QuerySet) and origin.model is Level
+    ):
+        return
+    update_level_file_fields(instance.level)
 
 
 @receiver(post_save, sender=Level)
-def update_level_author_info_on_level_change(sender, instance, **kwargs):
+def update_level_author_info_on_level_change(
+    sender, instance, update_fields, **kwargs
+):
+    # authored level counts only depend on the approval status; author
+    # changes are handled by the m2m receiver below
+    if update_fields is not None and "is_approved" not in update_fields:
+        return
     for author in instance.authors.iterator():
         author.update_authored_level_count()
 
 
-@receiver(post_save, sender=LevelFile)
-@receiver(post_delete, sender=LevelFile)
-def update_level_update_date_on_files_change(sender, instance, **kwargs):
-    instance.level.update_last_user_content_updated()
-
-
 @receiver(m2m_changed, sender=Level.authors.through)
 def update_level_author_info_on_authors_change(
     sender, instance, pk_set, **kwargs
@@ -68,3 +100,213 @@ def update_level_author_info_on_delete(sender, instance, **kwargs):
         author.update_authored_level_count()
     for review in instance._old_reviews:
         review.author.update_reviewed_level_count()
+
+
+@receiver(post_save, sender=Level)
+def update_level_search_vector_on_level_change(
+    sender, instance, update_fields, **kwargs
+):
+    if update_fields is None or {"name", "engine", "engine_id"} & set(
+        update_fields
+    ):
+        update_level_search_vectors(Level.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Level.authors.through)
+@receiver(m2m_changed, sender=Level.tags.through)
+@receiver(m2m_changed, sender=Level.genres.through)
+def update_level_search_vector_on_m2m_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action.startswith("post_"):
+            update_level_search_vectors(Level.objects.filter(pk=instance.pk))
+        return
+
+    level_field, _fields = SEARCH_VECTOR_SOURCES[type(instance)]
+    if action == "pre_clear":
+        instance._search_level_ids = list(
+            Level.objects.filter(**{level_field: instance}).values_list(
+                "pk", flat=True
+            )
+        )
+    elif action == "post_clear":
+        update_level_search_vectors(
+            Level.objects.filter(pk__in=instance._search_level_ids)
+        )
+    elif action in {"post_add", "post_remove"} and pk_set:
+        update_level_search_vectors(Level.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Engine)
+def update_level_search_vector_on_source_change(
+    sender, instance, created, update_fields, **kwargs
+):
+    level_field, fields = SEARCH_VECTOR_SOURCES[sender]
+    if created or (update_fields is not None and not fields & update_fields):
+        return
+    update_level_search_vectors(
+        Level.objects.filter(**{level_field: instance})
+    )
+
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Genre)
+def remember_level_search_vector_sources(sender, instance, **kwargs):
+    level_field, _fields = SEARCH_VECTOR_SOURCES[sender]
+    instance._search_level_ids = list(
+        Level.objects.filter(**{level_field: instance}).values_list(
+            "pk", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Genre)
+def update_level_search_vector_on_source_delete(sender, instance, **kwargs):
+    update_level_search_vectors(
+        Level.objects.filter(pk__in=instance._search_level_ids)
+    )
+
+
+# fields read fresh on every level retrieval rather than from the cache
+UNCACHED_LEVEL_FIELDS = {"download_count"}
+
+# lookup models shown in the cached level details, and the level field
+# pointing to each of them
+LEVEL_CACHE_SOURCES = {
+    Tag: "tags",
+    Genre: "genres",
+    Engine: "engine",
+    LevelDifficulty: "difficulty",
+    LevelDuration: "duration",
+    RatingClass: "rating_class",
+}
+
+
+def schedule_level_cache_invalidation(*level_ids: int) -> None:
+    transaction.on_commit(lambda: invalidate_level_cache(*level_ids))
+
+
+def is_uncached_update(update_fields) -> bool:
+    return update_fields is not None and set(update_fields).issubset(
+        UNCACHED_LEVEL_FIELDS
+    )
+
+
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+def invalidate_level_cache_on_level_change(sender, instance, **kwargs):
+    if is_uncached_update(kwargs.get("update_fields")):
+        return
+    schedule_level_cache_invalidation(instance.pk)
+
+
+@receiver(m2m_changed, sender=Level.authors.through)
+@receiver(m2m_changed, sender=Level.tags.through)
+@receiver(m2m_changed, sender=Level.genres.through)
+def invalidate_level_cache_on_m2m_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action.startswith("post_"):
+            schedule_level_cache_invalidation(instance.pk)
+    elif action == "pre_clear":
+        level_field, _fields = SEARCH_VECTOR_SOURCES[type(instance)]
+        schedule_level_cache_invalidation(
+            *Level.objects.filter(**{level_field: instance}).values_list(
+                "pk", flat=True
+            )
+        )
+    elif action in {"post_add", "post_remove"} and pk_set:
+        schedule_level_cache_invalidation(*pk_set)
+
+
+@receiver(post_save, sender=LevelFile)
+@receiver(post_delete, sender=LevelFile)
+@receiver(post_save, sender=LevelScreenshot)
+@receiver(post_delete, sender=LevelScreenshot)
+@receiver(post_save, sender=LevelExternalLink)
+@receiver(post_delete, sender=LevelExternalLink)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Walkthrough)
+@receiver(post_delete, sender=Walkthrough)
+def invalidate_level_cache_on_level_content_change(sender, instance, **kwargs):
+    if is_uncached_update(kwargs.get("update_fields")):
+        return
+    old_level = getattr(instance, "_old_level", None)
+    schedule_level_cache_invalidation(
+        instance.level_id, old_level.pk if old_level else None
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_level_cache_on_user_change(
+    sender, instance, created, update_fields, **kwargs
+):
+    if created or (
+        update_fields is not None
+        and not {"username", "first_name", "last_name", "picture"}
+        & set(update_fields)
+    ):
+        return
+    schedule_level_cache_invalidation(
+        *Level.objects.filter(
+            Q(authors=instance) | Q(uploader=instance)
+        ).values_list("pk", flat=True)
+    )
+
+
+def get_level_cache_source_level_ids(instance) -> list[int]:
+    level_field = LEVEL_CACHE_SOURCES[type(instance)]
+    return list(
+        Level.objects.filter(**{level_field: instance}).values_list(
+            "pk", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Engine)
+@receiver(post_save, sender=LevelDifficulty)
+@receiver(post_save, sender=LevelDuration)
+@receiver(post_save, sender=RatingClass)
+def invalidate_level_cache_on_source_change(
+    sender, instance, created, **kwargs
+):
+    if created:
+        return
+    schedule_level_cache_invalidation(
+        *get_level_cache_source_level_ids(instance)
+    )
+
+
+# deleting these clears the level fields and m2m rows with queryset
+# updates and deletes, which send no level signals
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Engine)
+@receiver(pre_delete, sender=LevelDifficulty)
+@receiver(pre_delete, sender=LevelDuration)
+@receiver(pre_delete, sender=RatingClass)
+def remember_level_cache_sources(sender, instance, **kwargs):
+    instance._cached_level_ids = get_level_cache_source_level_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Engine)
+@receiver(post_delete, sender=LevelDifficulty)
+@receiver(post_delete, sender=LevelDuration)
+@receiver(post_delete, sender=RatingClass)
+def invalidate_level_cache_on_source_delete(sender, instance, **kwargs):
+    schedule_level_cache_invalidation(*instance._cached_level_ids)
@@ -0,0 +1,148 @@
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from trcustoms.config.logic import get_site_stats, update_site_stats
+from trcustoms.config.models import SiteStats
+from trcustoms.levels.logic import increment_download_counter
+from trcustoms.levels.models import Level, LevelFile
+from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.tasks.flush_download_counters import (
+    flush_buffered_downloads,
+    flush_download_counters,
+    get_download_counts_redis,
+    increment_download_counts,
+)
+
+
+def download(level_file: LevelFile, agent: str) -> None:
+    request = APIRequestFactory().get("/", HTTP_USER_AGENT=agent)
+    increment_download_counter(level_file, request)
+
+
+@pytest.fixture(name="empty_buffer", autouse=True)
+def fixture_empty_buffer() -> None:
+    redis, key = get_download_counts_redis()
+    redis.delete(key, f"{key}:flushing", f"{key}:token", f"{key}:lock")
+
+
+@pytest.mark.django_db
+def test_downloads_are_buffered_until_flushed() -> None:
+    level_file = LevelFileFactory(level=LevelFactory())
+
+    with CaptureQueriesContext(connection) as ctx:
+        download(level_file, "agent1")
+        download(level_file, "agent2")
+
+    assert not ctx.captured_queries
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 0
+
+    assert flush_buffered_downloads() == 2
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 2
+    assert Level.objects.get(pk=level_file.level_id).download_count == 2
+    assert flush_buffered_downloads() == 0
+
+
+@pytest.mark.django_db
+def test_flush_download_counters_updates_in_batches() -> None:
+    level1 = LevelFactory()
+    level2 = LevelFactory()
+    level1_files = [
+        LevelFileFactory(level=level1, download_count=5),
+        LevelFileFactory(level=level1),
+    ]
+    level2_file = LevelFileFactory(level=level2)
+    level1.update_download_count()
+    update_site_stats()
+
+    for i, level_file in enumerate(level1_files + [level2_file]):
+        for agent in range(i + 1):
+            download(level_file, f"agent{i}.{agent}")
+
+    with CaptureQueriesContext(connection) as ctx:
+        flush_download_counters()
+
+    updates = [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"].startswith("UPDATE")
+    ]
+    assert len(updates) == 3
+    assert list(
+        LevelFile.objects.order_by("pk").values_list(
+            "download_count", flat=True
+        )
+    ) == [6, 2, 3]
+    assert Level.objects.get(pk=level1.pk).download_count == 8
+    assert Level.objects.get(pk=level2.pk).download_count == 3
+    assert get_site_stats().total_downloads == 11
+
+
+@pytest.mark.django_db
+def test_flush_download_counters_resumes_failed_flush() -> None:
+    level_file = LevelFileFactory(level=LevelFactory())
+    redis, key = get_download_counts_redis()
+    redis.hset(f"{key}:flushing", level_file.pk, 2)
+    download(level_file, "agent")
+
+    assert flush_buffered_downloads() == 2
+    assert flush_buffered_downloads() == 1
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 3
+
+
+@pytest.mark.django_db
+def test_flush_download_counters_skips_deleted_files() -> None:
+    level_file = LevelFileFactory(level=LevelFactory())
+    download(level_file, "agent")
+    level_file.delete()
+    update_site_stats()
+
+    flush_buffered_downloads()
+
+    assert get_site_stats().total_downloads == 0
+
+    redis, key = get_download_counts_redis()
+    assert not redis.exists(key, f"{key}:flushing")
+
+
+@pytest.mark.django_db
+def test_flush_download_counters_skips_while_another_flush_runs() -> None:
+    level_file = LevelFileFactory(level=LevelFactory())
+    download(level_file, "agent1")
+    update_site_stats()
+    nested_counts = []
+
+    def download_and_flush_again(*args) -> None:
+        download(level_file, "agent2")
+        nested_counts.append(flush_buffered_downloads())
+        increment_download_counts(*args)
+
+    with patch(
+        "trcustoms.tasks.flush_download_counters.increment_download_counts",
+        download_and_flush_again,
+    ):
+        assert flush_buffered_downloads() == 1
+
+    assert nested_counts == [0, 0]
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 1
+    assert flush_buffered_downloads() == 1
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 2
+    assert get_site_stats().total_downloads == 2
+
+
+@pytest.mark.django_db
+def test_flush_download_counters_does_not_apply_a_buffer_twice() -> None:
+    level_file = LevelFileFactory(level=LevelFactory())
+    update_site_stats()
+    redis, key = get_download_counts_redis()
+    redis.hset(f"{key}:flushing", level_file.pk, 2)
+    redis.set(f"{key}:token", "applied")
+    SiteStats.objects.update(download_flush_token="applied")
+
+    assert flush_buffered_downloads() == 0
+    assert LevelFile.objects.get(pk=level_file.pk).download_count == 0
+    assert get_site_stats().total_downloads == 0
+    assert not redis.exists(f"{key}:flushing", f"{key}:token")
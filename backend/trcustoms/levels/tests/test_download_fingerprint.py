@@ -9,6 +9,7 @@ from django.test import override_settings
 from rest_framework.test import APIClient
 
 from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.tasks.flush_download_counters import flush_buffered_downloads
 from trcustoms.uploads.tests.factories import UploadedFileFactory
 
 
@@ -36,18 +37,21 @@ def test_download_fingerprint_prevents_multiple_increments(
     # First download should increment count
     response = api_client.get(url, HTTP_USER_AGENT="agent1")
     assert response.status_code == 200
+    flush_buffered_downloads()
     level_file.refresh_from_db()
     assert level_file.download_count == initial_count + 1
 
     # Same fingerprint should not increment again
     response = api_client.get(url, HTTP_USER_AGENT="agent1")
     assert response.status_code == 200
+    flush_buffered_downloads()
     level_file.refresh_from_db()
     assert level_file.download_count == initial_count + 1
 
     # Different agent should increment count again
     response = api_client.get(url, HTTP_USER_AGENT="agent2")
     assert response.status_code == 200
+    flush_buffered_downloads()
     level_file.refresh_from_db()
     assert level_file.download_count == initial_count + 2
 
@@ -0,0 +1,86 @@
+from io import StringIO
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from trcustoms.levels.logic import get_level_file_download_url
+from trcustoms.levels.models import LevelFile
+from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.uploads import storage
+from trcustoms.uploads.models import UploadedFile
+from trcustoms.uploads.storage import S3MediaStorage, get_s3_client
+
+
+@pytest.fixture(name="s3_client", autouse=True)
+def fixture_s3_client() -> None:
+    with override_settings(
+        AWS_ACCESS_KEY_ID="key",
+        AWS_SECRET_ACCESS_KEY="secret",
+        AWS_S3_ENDPOINT_URL="http://s3.example.com",
+    ):
+        get_s3_client.cache_clear()
+        yield
+    get_s3_client.cache_clear()
+
+
+@pytest.fixture(name="level_file")
+def fixture_level_file() -> LevelFile:
+    level_file = LevelFileFactory(level=LevelFactory())
+    UploadedFile.objects.filter(pk=level_file.file.pk).update(
+        content="levels/file.zip"
+    )
+    level_file.file.refresh_from_db()
+    level_file.file.content.storage = S3MediaStorage(bucket_name="bucket")
+    return level_file
+
+
+@pytest.mark.django_db
+def test_level_file_download_url(level_file: LevelFile) -> None:
+    url = urlparse(get_level_file_download_url(level_file, "1-Level.zip"))
+
+    assert url.netloc == "s3.example.com"
+    assert url.path == "/bucket/media/levels/file.zip"
+    assert parse_qs(url.query)["response-content-disposition"] == [
+        "attachment; filename=1-Level.zip"
+    ]
+
+
+@pytest.mark.django_db
+def test_level_file_download_url_reuses_client(
+    level_file: LevelFile,
+) -> None:
+    with patch.object(
+        storage.boto3.session, "Session", wraps=storage.boto3.session.Session
+    ) as session:
+        get_level_file_download_url(level_file, "1-Level.zip")
+        get_level_file_download_url(level_file, "1-Level-V2.zip")
+
+    assert session.call_count == 1
+
+
+@pytest.mark.django_db
+def test_level_file_download_url_is_cached_per_filename(
+    level_file: LevelFile,
+) -> None:
+    with patch(
+        "trcustoms.levels.logic.generate_presigned_url",
+        wraps=storage.generate_presigned_url,
+    ) as generate:
+        url1 = get_level_file_download_url(level_file, "1-Level.zip")
+        url2 = get_level_file_download_url(level_file, "1-Level.zip")
+        url3 = get_level_file_download_url(level_file, "1-Renamed.zip")
+
+    assert url1 == url2
+    assert url3 != url1
+    assert generate.call_count == 2
+
+
+@pytest.mark.django_db
+def test_benchmark_download_urls_runs(level_file: LevelFile) -> None:
+    pytest.importorskip("moto")
+    out = StringIO()
+    call_command("benchmark_download_urls", "--repeat", "1", stdout=out)
+    assert "shared client, cached" in out.getvalue()
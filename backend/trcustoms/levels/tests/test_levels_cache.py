@@ -0,0 +1,154 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.ratings.tests.factories import RatingFactory
+from trcustoms.tags.tests.factories import TagFactory
+from trcustoms.users.tests.factories import UserFactory
+
+
+def retrieve(api_client: APIClient, level: Level) -> dict:
+    response = api_client.get(f"/api/levels/{level.pk}/")
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_level_retrieve_is_cached(api_client: APIClient) -> None:
+    level = LevelFactory(authors=[UserFactory(username="author")])
+
+    with CaptureQueriesContext(connection) as ctx:
+        first = retrieve(api_client, level)
+    first_query_count = len(ctx.captured_queries)
+    with CaptureQueriesContext(connection) as ctx:
+        second = retrieve(api_client, level)
+
+    assert second == first
+    assert len(ctx.captured_queries) < first_query_count
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_is_invalidated_on_level_change(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    level = LevelFactory(name="Old name")
+    retrieve(api_client, level)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        level.name = "New name"
+        level.save()
+
+    assert retrieve(api_client, level)["name"] == "New name"
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_is_invalidated_on_author_rename(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    user = UserFactory(username="old")
+    level = LevelFactory(authors=[user])
+    retrieve(api_client, level)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.username = "new"
+        user.save()
+
+    assert [
+        author["username"] for author in retrieve(api_client, level)["authors"]
+    ] == ["new"]
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_is_invalidated_on_lookup_change(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    level = LevelFactory()
+    retrieve(api_client, level)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        level.engine.name = "New engine"
+        level.engine.save()
+        level.difficulty.name = "New difficulty"
+        level.difficulty.save()
+
+    data = retrieve(api_client, level)
+    assert data["engine"]["name"] == "New engine"
+    assert data["difficulty"]["name"] == "New difficulty"
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_is_invalidated_on_lookup_delete(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    tag = TagFactory(name="tag")
+    level = LevelFactory(tags=[tag])
+    assert [item["name"] for item in retrieve(api_client, level)["tags"]] == [
+        "tag"
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tag.delete()
+        level.duration.delete()
+
+    data = retrieve(api_client, level)
+    assert data["tags"] == []
+    assert data["duration"] is None
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_is_invalidated_on_file_upload(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    level = LevelFactory()
+    assert retrieve(api_client, level)["files"] == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        level_file = LevelFileFactory(level=level)
+
+    assert [item["id"] for item in retrieve(api_client, level)["files"]] == [
+        level_file.pk
+    ]
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_is_invalidated_on_rating(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    level = LevelFactory()
+    assert retrieve(api_client, level)["rating_count"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        RatingFactory(level=level, author=UserFactory(username="rater"))
+
+    assert retrieve(api_client, level)["rating_count"] == 1
+
+
+@pytest.mark.django_db
+def test_level_retrieve_reads_download_count_fresh(
+    api_client: APIClient, django_capture_on_commit_callbacks
+) -> None:
+    level = Level.objects.get(pk=LevelFactory().pk)
+    retrieve(api_client, level)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        level.download_count += 1
+        level.save(update_fields=["download_count"])
+
+    assert not callbacks
+    assert retrieve(api_client, level)["download_count"] == 1
+
+
+@pytest.mark.django_db
+def test_level_retrieve_cache_does_not_leak_pending_levels(
+    auth_api_client: APIClient,
+) -> None:
+    level = LevelFactory(authors=[auth_api_client.user], is_approved=False)
+
+    assert retrieve(auth_api_client, level)["id"] == level.pk
+    response = APIClient().get(f"/api/levels/{level.pk}/")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
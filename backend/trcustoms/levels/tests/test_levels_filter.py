@@ -0,0 +1,109 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from trcustoms.genres.tests.factories import GenreFactory
+from trcustoms.levels.filters import filter_levels_queryset
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.tags.tests.factories import TagFactory
+from trcustoms.users.tests.factories import UserFactory
+from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
+from trcustoms.walkthroughs.tests.factories import WalkthroughFactory
+
+
+def get_level_names(api_client: APIClient, **params) -> set[str]:
+    response = api_client.get("/api/levels/", params)
+    return {result["name"] for result in response.json()["results"]}
+
+
+@pytest.mark.django_db
+def test_level_filters_require_all_ids(api_client: APIClient) -> None:
+    tags = [TagFactory() for _ in range(3)]
+    genres = [GenreFactory() for _ in range(2)]
+    users = [UserFactory(username=f"author{i}") for i in range(2)]
+    LevelFactory(name="All", tags=tags, genres=genres, authors=users)
+    LevelFactory(name="Some", tags=tags[:2], genres=genres[:1])
+    LevelFactory(name="None")
+
+    def ids(objs) -> str:
+        return ",".join(str(obj.pk) for obj in objs)
+
+    assert get_level_names(api_client, tags=ids(tags[:1])) == {"All", "Some"}
+    assert get_level_names(api_client, tags=ids(tags[:2])) == {"All", "Some"}
+    assert get_level_names(api_client, tags=ids(tags)) == {"All"}
+    assert get_level_names(api_client, tags=ids(tags[:2] + tags[:1])) == {
+        "All",
+        "Some",
+    }
+    assert get_level_names(
+        api_client, tags=ids(tags[:2]), genres=ids(genres)
+    ) == {"All"}
+    assert get_level_names(api_client, authors=ids(users)) == {"All"}
+    assert get_level_names(api_client, tags="999999") == set()
+
+
+@pytest.mark.django_db
+def test_level_filters_do_not_join_per_id() -> None:
+    tags = [TagFactory() for _ in range(5)]
+    queryset = filter_levels_queryset(
+        Level.objects.all(),
+        {"tags": ",".join(str(tag.pk) for tag in tags)},
+    )
+
+    with CaptureQueriesContext(connection) as ctx:
+        list(queryset)
+
+    assert ctx.captured_queries[0]["sql"].count("JOIN") == 0
+
+
+@pytest.mark.django_db
+def test_benchmark_level_filters_agree() -> None:
+    tags = [TagFactory() for _ in range(3)]
+    LevelFactory(tags=tags)
+    LevelFactory(tags=tags[:2])
+    out = StringIO()
+    err = StringIO()
+
+    call_command(
+        "benchmark_level_filters", "--repeat", "1", stdout=out, stderr=err
+    )
+
+    assert len(out.getvalue().splitlines()) == 4
+    assert not err.getvalue()
+
+
+@pytest.mark.django_db
+def test_level_walkthrough_filters(api_client: APIClient) -> None:
+    text_level = LevelFactory(name="Text")
+    video_level = LevelFactory(name="Video")
+    LevelFactory(name="None")
+    WalkthroughFactory(
+        level=text_level,
+        walkthrough_type=WalkthroughType.TEXT,
+        status=WalkthroughStatus.APPROVED,
+    )
+    WalkthroughFactory(
+        level=video_level,
+        walkthrough_type=WalkthroughType.LINK,
+        status=WalkthroughStatus.APPROVED,
+    )
+    WalkthroughFactory(
+        level=video_level,
+        walkthrough_type=WalkthroughType.TEXT,
+        status=WalkthroughStatus.PENDING_APPROVAL,
+    )
+
+    assert get_level_names(api_client, text_walkthroughs=1) == {"Text"}
+    assert get_level_names(api_client, text_walkthroughs=0) == {
+        "Video",
+        "None",
+    }
+    assert get_level_names(api_client, video_walkthroughs=1) == {"Video"}
+    assert get_level_names(
+        api_client, text_walkthroughs=0, video_walkthroughs=0
+    ) == {"None"}
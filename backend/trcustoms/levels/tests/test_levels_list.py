@@ -0,0 +1,174 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from trcustoms.genres.tests.factories import GenreFactory
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.tags.tests.factories import TagFactory
+from trcustoms.users.tests.factories import UserFactory
+
+
+def get_level_names(api_client: APIClient, **params) -> list[str]:
+    response = api_client.get("/api/levels/", params)
+    return sorted(result["name"] for result in response.json()["results"])
+
+
+@pytest.fixture(name="levels", autouse=True)
+def fixture_levels() -> None:
+    user = UserFactory(username="other")
+    LevelFactory(name="Approved", authors=[user])
+    LevelFactory(name="Pending", authors=[user], is_approved=False)
+
+
+@pytest.mark.django_db
+def test_level_listing_hides_pending_levels(api_client: APIClient) -> None:
+    assert get_level_names(api_client) == ["Approved"]
+
+
+@pytest.mark.django_db
+def test_level_listing_shows_own_pending_levels(
+    auth_api_client: APIClient,
+) -> None:
+    LevelFactory(
+        name="Own",
+        authors=[auth_api_client.user, UserFactory(username="coauthor")],
+        is_approved=False,
+    )
+    LevelFactory(
+        name="Own approved",
+        authors=[auth_api_client.user, UserFactory(username="coauthor2")],
+    )
+
+    assert get_level_names(auth_api_client) == [
+        "Approved",
+        "Own",
+        "Own approved",
+    ]
+
+
+@pytest.mark.django_db
+def test_level_listing_shows_pending_levels_to_staff(
+    staff_api_client: APIClient,
+) -> None:
+    assert get_level_names(staff_api_client) == ["Approved", "Pending"]
+
+
+@pytest.mark.django_db
+def test_level_listing_query_is_not_distinct(
+    auth_api_client: APIClient,
+) -> None:
+    with CaptureQueriesContext(connection) as ctx:
+        auth_api_client.get("/api/levels/")
+
+    level_queries = [
+        query["sql"]
+        for query in ctx.captured_queries
+        if 'FROM "levels_level"' in query["sql"]
+    ]
+    assert level_queries
+    assert not any("DISTINCT" in sql for sql in level_queries)
+
+
+@pytest.mark.django_db
+def test_compact_level_listing_matches_full_listing(
+    api_client: APIClient,
+) -> None:
+    LevelFactory(
+        name="Extra",
+        authors=[UserFactory(username="author")],
+        genres=[GenreFactory()],
+        tags=[TagFactory(), TagFactory()],
+    )
+    with timezone.override("Europe/Warsaw"):
+        full = api_client.get("/api/levels/").json()
+        compact = api_client.get(
+            "/api/levels/", {"expand": "authors,genres,tags"}
+        ).json()
+
+    assert compact["total_count"] == full["total_count"]
+    for full_item, compact_item in zip(
+        full["results"], compact["results"], strict=True
+    ):
+        for field in [
+            "id",
+            "name",
+            "created",
+            "last_updated",
+            "download_count",
+            "engine",
+            "duration",
+            "difficulty",
+            "rating_class",
+        ]:
+            assert compact_item[field] == full_item[field]
+        for field in ["authors", "genres", "tags"]:
+            assert sorted(
+                item["id"] for item in compact_item[field]
+            ) == sorted(item["id"] for item in full_item[field])
+
+
+@pytest.mark.django_db
+def test_compact_level_listing_selects_fields(api_client: APIClient) -> None:
+    level = Level.objects.get(name="Approved")
+
+    response = api_client.get("/api/levels/", {"fields": "name,engine"})
+
+    assert response.json()["results"] == [
+        {
+            "id": level.pk,
+            "name": "Approved",
+            "engine": {"id": level.engine.pk, "name": level.engine.name},
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_compact_level_listing_rejects_unknown_fields(
+    api_client: APIClient,
+) -> None:
+    response = api_client.get(
+        "/api/levels/", {"fields": "name,secret", "expand": "files"}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {
+        "fields": ["Unknown field: secret"],
+        "expand": ["Unknown relation: files"],
+    }
+
+
+@pytest.mark.django_db
+def test_compact_level_listing_query_count_does_not_grow(
+    api_client: APIClient,
+) -> None:
+    def count_queries() -> int:
+        with CaptureQueriesContext(connection) as ctx:
+            api_client.get(
+                "/api/levels/",
+                {"expand": "authors,genres,tags,screenshots,external_links"},
+            )
+        return len(ctx.captured_queries)
+
+    baseline = count_queries()
+    for i in range(5):
+        LevelFactory(
+            authors=[UserFactory(username=f"author{i}")],
+            genres=[GenreFactory()],
+            tags=[TagFactory()],
+        )
+
+    assert count_queries() == baseline
+
+
+@pytest.mark.django_db
+def test_benchmark_level_listing_runs() -> None:
+    out = StringIO()
+    call_command("benchmark_level_listing", "--repeat", "1", stdout=out)
+    assert "full serializer" in out.getvalue()
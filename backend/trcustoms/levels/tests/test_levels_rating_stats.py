@@ -0,0 +1,168 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.models import RatingTemplateAnswer
+from trcustoms.ratings.tests.factories import (
+    RatingFactory,
+    RatingTemplateAnswerFactory,
+    RatingTemplateQuestionFactory,
+)
+from trcustoms.users.tests.factories import UserFactory
+
+
+def get_rating_stats(api_client: APIClient, level: Level) -> dict:
+    response = api_client.get(f"/api/levels/{level.pk}/rating_stats/")
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def assert_category_points_in_sync(level: Level) -> None:
+    level.refresh_from_db()
+    stored = (level.trc_rating_count, level.rating_category_points)
+    level.update_rating_category_points(save=False)
+    assert stored == (level.trc_rating_count, level.rating_category_points)
+
+
+@pytest.fixture(name="answers")
+def fixture_answers() -> dict[str, list[RatingTemplateAnswer]]:
+    gameplay = RatingTemplateQuestionFactory(category="Gameplay", weight=2)
+    looks = RatingTemplateQuestionFactory(category="Looks", weight=1)
+    return {
+        "gameplay": [
+            RatingTemplateAnswerFactory(question=gameplay, points=points)
+            for points in [0, 3, 5]
+        ],
+        "looks": [
+            RatingTemplateAnswerFactory(question=looks, points=points)
+            for points in [-1, 4]
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_level_rating_stats(
+    api_client: APIClient, answers: dict[str, list[RatingTemplateAnswer]]
+) -> None:
+    level = LevelFactory()
+    RatingFactory(
+        level=level,
+        author=UserFactory(username="user1"),
+        rating_type=RatingType.TRC,
+    ).answers.set([answers["gameplay"][2], answers["looks"][1]])
+    RatingFactory(
+        level=level,
+        author=UserFactory(username="user2"),
+        rating_type=RatingType.TRC,
+    ).answers.set([answers["gameplay"][1], answers["looks"][0]])
+    RatingFactory(
+        level=level,
+        author=UserFactory(username="user3"),
+        rating_type=RatingType.TRLE,
+    )
+
+    assert get_rating_stats(api_client, level) == {
+        "trc_rating_count": 2,
+        "trle_rating_count": 1,
+        "categories": [
+            {
+                "category": "Gameplay",
+                "total_points": 8,
+                "min_points": 0,
+                "max_points": 10,
+            },
+            {
+                "category": "Looks",
+                "total_points": 1,
+                "min_points": -1,
+                "max_points": 4,
+            },
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_level_rating_stats_query_count_does_not_grow(
+    api_client: APIClient, answers: dict[str, list[RatingTemplateAnswer]]
+) -> None:
+    level = LevelFactory()
+    get_rating_stats(api_client, level)
+
+    with CaptureQueriesContext(connection) as ctx:
+        get_rating_stats(api_client, level)
+    baseline = len(ctx.captured_queries)
+
+    for i in range(5):
+        RatingFactory(
+            level=level,
+            author=UserFactory(username=f"user{i}"),
+            rating_type=RatingType.TRC,
+        ).answers.set([answers["gameplay"][1], answers["looks"][1]])
+
+    with CaptureQueriesContext(connection) as ctx:
+        get_rating_stats(api_client, level)
+    assert len(ctx.captured_queries) == baseline
+
+
+@pytest.mark.django_db
+def test_level_category_points_follow_rating_changes(
+    answers: dict[str, list[RatingTemplateAnswer]],
+) -> None:
+    level = LevelFactory()
+    other_level = LevelFactory()
+    rating = RatingFactory(
+        level=level,
+        author=UserFactory(username="user"),
+        rating_type=RatingType.TRC,
+    )
+    assert_category_points_in_sync(level)
+
+    rating.answers.set([answers["gameplay"][2], answers["looks"][1]])
+    assert_category_points_in_sync(level)
+    assert level.rating_category_points == {"Gameplay": 10, "Looks": 4}
+
+    rating.answers.set([answers["gameplay"][0], answers["looks"][1]])
+    assert_category_points_in_sync(level)
+    assert level.rating_category_points == {"Looks": 4}
+
+    rating.level = other_level
+    rating.save()
+    assert_category_points_in_sync(level)
+    assert_category_points_in_sync(other_level)
+    assert level.trc_rating_count == 0
+    assert other_level.rating_category_points == {"Looks": 4}
+
+    rating.rating_type = RatingType.TRLE
+    rating.save()
+    assert_category_points_in_sync(other_level)
+    assert other_level.trc_rating_count == 0
+
+    rating.rating_type = RatingType.TRC
+    rating.save()
+    rating.delete()
+    assert_category_points_in_sync(other_level)
+    assert other_level.trc_rating_count == 0
+    assert other_level.rating_category_points == {}
+
+
+@pytest.mark.django_db
+def test_level_rating_stats_follow_template_changes(
+    api_client: APIClient,
+    answers: dict[str, list[RatingTemplateAnswer]],
+    django_capture_on_commit_callbacks,
+) -> None:
+    level = LevelFactory()
+    get_rating_stats(api_client, level)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        RatingTemplateAnswerFactory(
+            question=answers["looks"][0].question, points=7
+        )
+
+    categories = get_rating_stats(api_client, level)["categories"]
+    assert categories[1]["max_points"] == 7
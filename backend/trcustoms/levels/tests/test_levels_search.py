@@ -0,0 +1,126 @@
+import pytest
+from rest_framework.test import APIClient
+
+from trcustoms.engines.tests.factories import EngineFactory
+from trcustoms.genres.tests.factories import GenreFactory
+from trcustoms.levels.logic import update_level_search_vectors
+from trcustoms.levels.models import Level
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.tags.logic import merge_tags
+from trcustoms.tags.tests.factories import TagFactory
+from trcustoms.users.tests.factories import UserFactory
+
+
+def search(api_client: APIClient, text: str, **params) -> list[str]:
+    response = api_client.get("/api/levels/", {"search": text, **params})
+    return [result["name"] for result in response.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_level_search_matches_level_data(api_client: APIClient) -> None:
+    LevelFactory(
+        name="Temple of Horus",
+        authors=[UserFactory(username="Phil", first_name="Philip")],
+        tags=[TagFactory(name="Egypt")],
+        genres=[GenreFactory(name="Adventure")],
+        engine=EngineFactory(name="TR4"),
+    )
+    LevelFactory(name="Tomb of Seth")
+
+    assert search(api_client, "templ") == ["Temple of Horus"]
+    assert search(api_client, "phil horus") == ["Temple of Horus"]
+    assert search(api_client, "egypt") == ["Temple of Horus"]
+    assert search(api_client, "advent") == ["Temple of Horus"]
+    assert search(api_client, "tr4") == ["Temple of Horus"]
+    assert search(api_client, "of") == ["Tomb of Seth", "Temple of Horus"]
+    assert search(api_client, "temple seth") == []
+
+
+@pytest.mark.django_db
+def test_level_search_ranks_name_matches_first(api_client: APIClient) -> None:
+    LevelFactory(name="Lost Tomb", authors=[UserFactory(username="Crypt")])
+    LevelFactory(name="Crypt Keeper")
+
+    assert search(api_client, "crypt") == ["Crypt Keeper", "Lost Tomb"]
+    assert search(api_client, "crypt", sort="name") == [
+        "Crypt Keeper",
+        "Lost Tomb",
+    ]
+    assert search(api_client, "crypt", sort="-name") == [
+        "Lost Tomb",
+        "Crypt Keeper",
+    ]
+
+
+@pytest.mark.django_db
+def test_level_search_ignores_query_syntax(api_client: APIClient) -> None:
+    LevelFactory(name="Lara's Home")
+
+    assert search(api_client, "lara's & !|") == ["Lara's Home"]
+    assert search(api_client, "'") == ["Lara's Home"]
+    assert search(api_client, "&") == []
+
+
+@pytest.mark.django_db
+def test_level_search_follows_level_changes(api_client: APIClient) -> None:
+    level = LevelFactory(name="Old Name")
+    user = UserFactory(username="Somebody")
+    tag = TagFactory(name="Snow")
+
+    level.name = "New Name"
+    level.save()
+    level.authors.add(user)
+    level.tags.add(tag)
+    assert search(api_client, "new somebody snow") == ["New Name"]
+
+    level.tags.remove(tag)
+    assert search(api_client, "snow") == []
+
+    user.authored_levels.clear()
+    assert search(api_client, "somebody") == []
+
+
+@pytest.mark.django_db
+def test_level_search_follows_related_changes(api_client: APIClient) -> None:
+    user = UserFactory(username="Somebody")
+    tag = TagFactory(name="Snow")
+    genre = GenreFactory(name="Puzzle")
+    LevelFactory(name="Level", authors=[user], tags=[tag], genres=[genre])
+
+    user.username = "Renamed"
+    user.save()
+    assert search(api_client, "somebody") == []
+    assert search(api_client, "renamed") == ["Level"]
+
+    genre.delete()
+    assert search(api_client, "puzzle") == []
+
+    TagFactory(name="Ice")
+    merge_tags("Snow", "Ice", request=None)
+    assert search(api_client, "snow") == []
+    assert search(api_client, "ice") == ["Level"]
+
+
+@pytest.mark.django_db
+def test_update_level_search_vectors_restores_search_data() -> None:
+    LevelFactory(
+        authors=[UserFactory(username="foo")],
+        tags=[TagFactory()],
+        genres=[GenreFactory()],
+    )
+    LevelFactory()
+    expected = list(
+        Level.objects.order_by("pk").values_list("search_vector", flat=True)
+    )
+    Level.objects.update(search_vector=None)
+
+    assert update_level_search_vectors() == 2
+    assert (
+        list(
+            Level.objects.order_by("pk").values_list(
+                "search_vector", flat=True
+            )
+        )
+        == expected
+    )
+    assert update_level_search_vectors() == 0
@@ -113,3 +113,38 @@ class TestVideoOnlyWalkthroughsQueryset:
         assert Level.objects.with_text_only_walkthroughs().count() == 0
         assert Level.objects.with_both_walkthroughs().count() == 1
         assert Level.objects.with_no_walkthroughs().count() == 0
+
+    def test_walkthrough_unapproved_and_deleted(self) -> None:
+        level = LevelFactory()
+        walkthrough = WalkthroughFactory(
+            level=level,
+            walkthrough_type=WalkthroughType.TEXT,
+            status=WalkthroughStatus.APPROVED,
+        )
+        assert Level.objects.with_text_only_walkthroughs().count() == 1
+
+        walkthrough.status = WalkthroughStatus.REJECTED
+        walkthrough.save()
+        assert Level.objects.with_text_only_walkthroughs().count() == 0
+        assert Level.objects.with_no_walkthroughs().count() == 1
+
+        walkthrough.status = WalkthroughStatus.APPROVED
+        walkthrough.save()
+        walkthrough.delete()
+        assert Level.objects.with_text_only_walkthroughs().count() == 0
+        assert Level.objects.with_no_walkthroughs().count() == 1
+
+    def test_walkthrough_moved_to_another_level(self) -> None:
+        level1 = LevelFactory()
+        level2 = LevelFactory()
+        walkthrough = WalkthroughFactory(
+            level=level1,
+            walkthrough_type=WalkthroughType.LINK,
+            status=WalkthroughStatus.APPROVED,
+        )
+
+        walkthrough.level = level2
+        walkthrough.save()
+
+        assert list(Level.objects.with_video_only_walkthroughs()) == [level2]
+        assert list(Level.objects.with_no_walkthroughs()) == [level1]
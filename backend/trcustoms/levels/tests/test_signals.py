@@ -1,8 +1,12 @@
 from datetime import datetime, timezone
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from trcustoms.levels.models import Level
 from trcustoms.levels.tests.factories import LevelFactory, LevelFileFactory
+from trcustoms.users.tests.factories import UserFactory
 
 
 @pytest.mark.django_db
@@ -24,3 +28,61 @@ def test_deleting_files_updates_last_user_content_updated() -> None:
     level.refresh_from_db()
 
     assert level.last_user_content_updated is None
+
+
+def create_level_file_queries(level: Level, **kwargs) -> list[str]:
+    with CaptureQueriesContext(connection) as ctx:
+        LevelFileFactory(level=level, **kwargs)
+    return [query["sql"] for query in ctx.captured_queries]
+
+
+@pytest.mark.django_db
+def test_saving_level_file_updates_level_in_one_write() -> None:
+    level = LevelFactory(
+        authors=[UserFactory(username=f"author{i}") for i in range(3)]
+    )
+    LevelFileFactory(level=level, download_count=2)
+    LevelFileFactory(level=level, download_count=3)
+
+    queries = create_level_file_queries(level, download_count=4)
+
+    assert (
+        len(
+            [sql for sql in queries if sql.startswith('UPDATE "levels_level"')]
+        )
+        == 1
+    )
+    assert not [sql for sql in queries if '"users_user"' in sql]
+    level = Level.objects.get(pk=level.pk)
+    level_file = level.files.order_by("-version").first()
+    assert level.download_count == 9
+    assert level.last_file == level_file
+    assert level.last_user_content_updated == level_file.created
+
+
+@pytest.mark.django_db
+def test_saving_level_file_query_count_does_not_grow() -> None:
+    small_level = LevelFactory()
+    LevelFileFactory(level=small_level)
+    big_level = LevelFactory(
+        authors=[UserFactory(username=f"author{i}") for i in range(5)]
+    )
+    for _ in range(5):
+        LevelFileFactory(level=big_level)
+
+    assert len(create_level_file_queries(small_level)) == len(
+        create_level_file_queries(big_level)
+    )
+
+
+@pytest.mark.django_db
+def test_saving_unchanged_level_file_does_not_write_level() -> None:
+    level_file = LevelFileFactory(level=LevelFactory())
+
+    with CaptureQueriesContext(connection) as ctx:
+        level_file.save()
+
+    assert not any(
+        query["sql"].startswith('UPDATE "levels_level"')
+        for query in ctx.captured_queries
+    )
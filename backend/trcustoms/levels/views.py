@@ -1,10 +1,8 @@
 from pathlib import Path
 
-import boto3
-from botocore.config import Config
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.http import HttpResponseRedirect
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import mixins, status, viewsets
@@ -13,13 +11,20 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from storages.utils import clean_name
 
+from trcustoms.common.pagination import KeysetPagination
 from trcustoms.common.serializers import EmptySerializer
 from trcustoms.levels.filters import filter_levels_queryset
+from trcustoms.levels.listing import (
+    get_compact_listing,
+    get_compact_listing_fields,
+    is_compact_listing_requested,
+)
 from trcustoms.levels.logic import (
     approve_level,
+    get_cached_level_data,
     get_category_ratings,
+    get_level_file_download_url,
     increment_download_counter,
     reject_level,
 )
@@ -41,7 +46,6 @@ from trcustoms.permissions import (
     IsAccessingOwnResource,
     has_permission,
 )
-from trcustoms.ratings.consts import RatingType
 from trcustoms.users.models import UserPermission
 from trcustoms.utils import slugify, stream_file_field
 
@@ -102,8 +106,9 @@ class LevelViewSet(
         "external_links",
         "cover",
         "rating_class",
-    ).distinct()
+    )
 
+    pagination_class = KeysetPagination
     serializer_class = LevelListingSerializer
     serializer_class_by_action = {
         "retrieve": LevelDetailsSerializer,
@@ -113,19 +118,15 @@ class LevelViewSet(
     }
 
     ordering_fields = []
-    search_fields = [
-        "name",
-        "authors__username",
-        "authors__first_name",
-        "authors__last_name",
-        "^genres__name",
-        "^tags__name",
-        "=engine__name",
-    ]
-
-    def get_object(self):
+    # searching is handled by SearchLevelFilter
+    search_fields = []
+
+    def get_object(self, queryset=None):
         auth_user = self.request.user
-        obj = get_object_or_404(self.queryset, pk=self.kwargs["pk"])
+        obj = get_object_or_404(
+            self.queryset if queryset is None else queryset,
+            pk=self.kwargs["pk"],
+        )
         self.check_object_permissions(self.request, obj)
 
         is_author = auth_user and obj.authors.filter(pk=auth_user.pk).exists()
@@ -138,19 +139,54 @@ class LevelViewSet(
 
         return obj
 
+    def retrieve(self, request, *args, **kwargs):
+        # visibility is checked for every request; only the serialized
+        # level, which is the same for everyone, is cached
+        level = self.get_object(
+            queryset=Level.objects.only("pk", "is_approved", "download_count")
+        )
+        data = get_cached_level_data(
+            level.pk,
+            request.build_absolute_uri("/"),
+            lambda: self.get_serializer(self.get_object()).data,
+        )
+        return Response({**data, "download_count": level.download_count})
+
+    def list(self, request, *args, **kwargs):
+        if not is_compact_listing_requested(request.query_params):
+            return super().list(request, *args, **kwargs)
+
+        fields = get_compact_listing_fields(request.query_params)
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .only("pk")
+        )
+        page = self.paginate_queryset(queryset)
+        levels = queryset if page is None else page
+        data = get_compact_listing([level.pk for level in levels], fields)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
     def get_queryset(self):
         auth_user = self.request.user
         queryset = super().get_queryset()
         queryset = filter_levels_queryset(queryset, self.request.query_params)
         if not has_permission(auth_user, UserPermission.VIEW_PENDING_LEVELS):
-            queryset = queryset.filter(
-                Q(is_approved=True)
-                | (
-                    Q(authors__pk=auth_user.pk)
-                    if (auth_user and not auth_user.is_anonymous)
-                    else Q()
+            # an EXISTS rather than a join keeps the rows unique without
+            # DISTINCT
+            if auth_user and not auth_user.is_anonymous:
+                queryset = queryset.filter(
+                    Q(is_approved=True)
+                    | Exists(
+                        Level.authors.through.objects.filter(
+                            level_id=OuterRef("pk"), user_id=auth_user.pk
+                        )
+                    )
                 )
-            )
+            else:
+                queryset = queryset.filter(is_approved=True)
         return queryset
 
     @action(detail=True, methods=["post"])
@@ -171,15 +207,19 @@ class LevelViewSet(
 
     @action(detail=True, methods=["get"])
     def rating_stats(self, request, pk: int) -> Response:
-        level = self.get_object()
+        level = self.get_object(
+            queryset=Level.objects.only(
+                "pk",
+                "is_approved",
+                "rating_count",
+                "trc_rating_count",
+                "rating_category_points",
+            )
+        )
 
         data = {
-            "trc_rating_count": level.ratings.filter(
-                rating_type=RatingType.TRC
-            ).count(),
-            "trle_rating_count": level.ratings.filter(
-                rating_type=RatingType.TRLE
-            ).count(),
+            "trc_rating_count": level.trc_rating_count,
+            "trle_rating_count": level.rating_count - level.trc_rating_count,
             "categories": get_category_ratings(level),
         }
 
@@ -209,39 +249,7 @@ class LevelFileViewSet(viewsets.GenericViewSet):
                 file.file.content, parts, as_attachment=True
             )
 
-        file_field = file.file.content
-
-        path = Path(file_field.name)
+        path = Path(file.file.content.name)
         filename = "-".join(map(slugify, parts)) + path.suffix
-
-        parameters = {
-            "ResponseContentDisposition": (f"attachment; filename={filename}"),
-        }
-
-        # url = file_field.storage.url(file_field.name, parameters=parameters)
-
-        client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            endpoint_url=settings.AWS_S3_ENDPOINT_URL,
-            config=Config(
-                s3={"addressing_style": "path"},
-                signature_version="s3v4",
-                retries=dict(max_attempts=3),
-            ),
-        )
-
-        url = client.generate_presigned_url(
-            ClientMethod="get_object",
-            ExpiresIn=60,
-            Params={
-                "Bucket": file_field.storage.bucket_name,
-                "Key": file_field.storage._normalize_name(
-                    clean_name(file_field.name)
-                ),
-                **parameters,
-            },
-        )
-
+        url = get_level_file_download_url(file, filename)
         return HttpResponseRedirect(redirect_to=url)
@@ -2,15 +2,16 @@ from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from trcustoms.playlists.models import PlaylistItem
-from trcustoms.tasks import update_awards
+from trcustoms.tasks import schedule_award_updates
 
 
 @receiver(post_save, sender=PlaylistItem)
 def update_level_player_on_playlist_item_change(sender, instance, **kwargs):
     instance.user.update_played_level_count()
-    for author in instance.level.authors.iterator():
-        update_awards.delay(author.pk)
-    update_awards.delay(instance.user.pk)
+    schedule_award_updates(
+        *instance.level.authors.values_list("pk", flat=True),
+        instance.user.pk,
+    )
 
 
 @receiver(pre_delete, sender=PlaylistItem)
@@ -22,6 +23,7 @@ def remember_playlist_item_user(sender, instance, using, **kwargs):
 @receiver(post_delete, sender=PlaylistItem)
 def update_level_player_on_playlist_item_delete(sender, instance, **kwargs):
     instance._old_user.update_played_level_count()
-    for author in instance._old_level.authors.iterator():
-        update_awards.delay(author.pk)
-    update_awards.delay(instance._old_user.pk)
+    schedule_award_updates(
+        *instance._old_level.authors.values_list("pk", flat=True),
+        instance._old_user.pk,
+    )
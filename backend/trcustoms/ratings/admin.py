@@ -1,7 +1,6 @@
 from django.contrib import admin
 
 from trcustoms.audit_logs.mixins import AuditLogAdminMixin
-from trcustoms.ratings.logic import get_rating_score
 from trcustoms.ratings.models import (
     Rating,
     RatingTemplateAnswer,
@@ -33,9 +32,6 @@ class RatingAdmin(AuditLogAdminMixin, admin.ModelAdmin):
     readonly_fields = ["created", "last_updated", "score", "rating_class"]
     raw_id_fields = ["level", "author"]
 
-    def score(self, obj):
-        return get_rating_score(obj)
-
 
 @admin.register(RatingTemplateQuestion)
 class RatingTemplateQuestionAdmin(admin.ModelAdmin):
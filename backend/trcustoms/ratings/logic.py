@@ -1,10 +1,27 @@
 from functools import cache
 from statistics import mean
 
-from django.db.models import F, Max, Sum
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.db.models import (
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
 
+from trcustoms.levels.models import Level
 from trcustoms.ratings.consts import RatingType
 from trcustoms.ratings.models import Rating, RatingTemplateQuestion
+from trcustoms.utils import update_denormalized_field
+
+RATING_TEMPLATE_POINTS_CACHE_KEY = "rating_template_points"
 
 
 @cache
@@ -14,7 +31,99 @@ def get_max_rating_score() -> int:
     ).aggregate(Sum("value"))["value__sum"]
 
 
-def get_rating_score(rating: Rating) -> float:
+def calculate_rating_template_points() -> dict[str, dict[str, int]]:
+    """Sum the lowest and highest weighted points of the rating template
+    questions in each category, in question order.
+    """
+    result = {}
+    for question in (
+        RatingTemplateQuestion.objects.filter(category__isnull=False)
+        .annotate(
+            min_points=Min(F("answers__points") * F("weight")),
+            max_points=Max(F("answers__points") * F("weight")),
+        )
+        .order_by("position")
+        .values_list("category", "min_points", "max_points", named=True)
+    ):
+        points = result.setdefault(
+            question.category, {"min_points": 0, "max_points": 0}
+        )
+        points["min_points"] += question.min_points or 0
+        points["max_points"] += question.max_points or 0
+    return result
+
+
+def get_rating_template_points() -> dict[str, dict[str, int]]:
+    return django_cache.get_or_set(
+        RATING_TEMPLATE_POINTS_CACHE_KEY,
+        calculate_rating_template_points,
+        timeout=None,
+    )
+
+
+def invalidate_rating_template_cache() -> None:
+    django_cache.delete(RATING_TEMPLATE_POINTS_CACHE_KEY)
+    get_max_rating_score.cache_clear()
+
+
+def get_rating_category_points(rating: Rating) -> dict[str, int]:
+    """Sum the weighted points of a TRC rating per question category."""
+    if rating.rating_type != RatingType.TRC or not rating.pk:
+        return {}
+    return {
+        category: points
+        for category, points in rating.answers.filter(
+            question__category__isnull=False
+        )
+        .order_by()
+        .values_list("question__category")
+        .annotate(points=Sum(F("points") * F("question__weight")))
+        if points
+    }
+
+
+def update_level_rating_category_points(
+    level_id: int,
+    old_points: dict[str, int],
+    new_points: dict[str, int],
+    count_delta: int,
+) -> None:
+    """Apply a TRC rating change to the level category point totals.
+
+    Only the difference between the old and the new points of the rating
+    is applied, so the cost does not depend on how many ratings the level
+    has.
+    """
+    points_delta = {
+        category: new_points.get(category, 0) - old_points.get(category, 0)
+        for category in old_points.keys() | new_points.keys()
+    }
+    if not count_delta and not any(points_delta.values()):
+        return
+
+    with transaction.atomic():
+        level = (
+            Level.objects.select_for_update()
+            .filter(pk=level_id)
+            .only("trc_rating_count", "rating_category_points")
+            .first()
+        )
+        if not level:
+            return
+        points = level.rating_category_points
+        for category, delta in points_delta.items():
+            if total := points.get(category, 0) + delta:
+                points[category] = total
+            else:
+                points.pop(category, None)
+        # do not trigger modification time changes
+        Level.objects.filter(pk=level_id).update(
+            trc_rating_count=level.trc_rating_count + count_delta,
+            rating_category_points=points,
+        )
+
+
+def calculate_rating_score(rating: Rating) -> float:
     if rating.rating_type == RatingType.TRLE:
         return (
             mean(
@@ -30,7 +139,7 @@ def get_rating_score(rating: Rating) -> float:
 
     if rating.rating_type == RatingType.TRC:
         max_score = get_max_rating_score()
-        if not max_score:
+        if not max_score or not rating.pk:
             return 0
         return (
             rating.answers.annotate(
@@ -40,3 +149,64 @@ def get_rating_score(rating: Rating) -> float:
         ) / max_score
 
     assert False, "Invalid rating type"
+
+
+def get_rating_score(rating: Rating) -> float:
+    return rating.score
+
+
+def update_rating_score(rating: Rating, save: bool = True) -> None:
+    score = calculate_rating_score(rating)
+    if score != rating.score:
+        rating.score = score
+        if save:
+            rating.save(update_fields=["score"])
+
+
+def update_rating_scores(queryset: QuerySet | None = None) -> int:
+    """Recalculate the stored score of many ratings at once.
+
+    Issues one UPDATE per rating type rather than aggregating answers for
+    each rating separately. Returns the number of changed ratings.
+    """
+    if queryset is None:
+        queryset = Rating.objects.all()
+
+    trle_score = (
+        Coalesce(F("trle_score_gameplay"), Value(0))
+        + Coalesce(F("trle_score_enemies"), Value(0))
+        + Coalesce(F("trle_score_atmosphere"), Value(0))
+        + Coalesce(F("trle_score_lighting"), Value(0))
+    )
+    updated = update_denormalized_field(
+        queryset.filter(rating_type=RatingType.TRLE),
+        "score",
+        Cast(trle_score, output_field=FloatField()) / Value(40.0),
+    )
+
+    trc_queryset = queryset.filter(rating_type=RatingType.TRC)
+    if max_score := get_max_rating_score():
+        answer_points = (
+            Rating.answers.through.objects.filter(rating_id=OuterRef("pk"))
+            .values("rating_id")
+            .annotate(
+                total=Sum(
+                    F("ratingtemplateanswer__points")
+                    * F("ratingtemplateanswer__question__weight")
+                )
+            )
+            .values("total")
+        )
+        updated += update_denormalized_field(
+            trc_queryset,
+            "score",
+            Cast(
+                Coalesce(Subquery(answer_points), Value(0)),
+                output_field=FloatField(),
+            )
+            / Value(float(max_score)),
+        )
+    else:
+        updated += update_denormalized_field(trc_queryset, "score", Value(0.0))
+
+    return updated
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.3 on 2026-10-18 11:40
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def forward_func(apps, schema_editor):
+    Rating = apps.get_model("ratings", "Rating")
+    RatingTemplateQuestion = apps.get_model(
+        "ratings", "RatingTemplateQuestion"
+    )
+
+    Rating.objects.filter(rating_type="le").update(
+        score=Cast(
+            Coalesce(F("trle_score_gameplay"), Value(0))
+            + Coalesce(F("trle_score_enemies"), Value(0))
+            + Coalesce(F("trle_score_atmosphere"), Value(0))
+            + Coalesce(F("trle_score_lighting"), Value(0)),
+            output_field=FloatField(),
+        )
+        / Value(40.0)
+    )
+
+    max_score = RatingTemplateQuestion.objects.annotate(
+        value=Max(F("answers__points")) * F("weight")
+    ).aggregate(Sum("value"))["value__sum"]
+    if not max_score:
+        return
+
+    answer_points = (
+        Rating.answers.through.objects.filter(rating_id=OuterRef("pk"))
+        .values("rating_id")
+        .annotate(
+            total=Sum(
+                F("ratingtemplateanswer__points")
+                * F("ratingtemplateanswer__question__weight")
+            )
+        )
+        .values("total")
+    )
+    Rating.objects.filter(rating_type="mo").update(
+        score=Cast(
+            Coalesce(Subquery(answer_points), Value(0)),
+            output_field=FloatField(),
+        )
+        / Value(float(max_score))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ratings", "0006_alter_rating_last_user_content_updated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rating",
+            name="score",
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(forward_func, migrations.RunPython.noop),
+    ]
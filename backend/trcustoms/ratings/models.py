@@ -74,6 +74,9 @@ class Rating(UserContentDatesInfo, DatesInfo):
     trle_score_atmosphere = models.IntegerField(blank=True, null=True)
     trle_score_lighting = models.IntegerField(blank=True, null=True)
 
+    # denormalized fields for faster db lookups
+    score = models.FloatField(default=0)
+
     rating_class = models.ForeignKey(
         RatingClass, blank=True, null=True, on_delete=models.SET_NULL
     )
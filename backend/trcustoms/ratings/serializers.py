@@ -14,7 +14,7 @@ from trcustoms.ratings.models import (
     RatingTemplateAnswer,
     RatingTemplateQuestion,
 )
-from trcustoms.tasks import update_awards
+from trcustoms.tasks import schedule_award_updates
 from trcustoms.users.models import UserPermission
 from trcustoms.users.serializers import UserNestedSerializer
 
@@ -154,7 +154,7 @@ class RatingDetailsSerializer(RatingListingSerializer):
 
         rating = self.handle_m2m(rating_factory, validated_data)
         send_rating_submission_mail(rating)
-        update_awards.delay(rating.author.pk)
+        schedule_award_updates(rating.author.pk)
         return rating
 
     def update(self, instance, validated_data):
@@ -167,7 +167,7 @@ class RatingDetailsSerializer(RatingListingSerializer):
 
         rating = self.handle_m2m(rating_factory, validated_data)
         send_rating_update_mail(rating)
-        update_awards.delay(rating.author.pk)
+        schedule_award_updates(rating.author.pk)
         return rating
 
 
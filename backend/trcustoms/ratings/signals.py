@@ -1,46 +1,138 @@
+from django.db import transaction
 from django.db.models.signals import (
     m2m_changed,
     post_delete,
     post_save,
+    pre_delete,
     pre_save,
 )
 from django.dispatch import receiver
 
-from trcustoms.ratings.models import Rating
-from trcustoms.scoring import get_object_rating_class
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.logic import (
+    get_rating_category_points,
+    invalidate_rating_template_cache,
+    update_level_rating_category_points,
+    update_rating_score,
+)
+from trcustoms.ratings.models import (
+    Rating,
+    RatingTemplateAnswer,
+    RatingTemplateQuestion,
+)
+from trcustoms.scoring import (
+    get_object_rating_class,
+    update_level_rating_score,
+)
 from trcustoms.signals import disable_signals
 
 
+def update_rating_class(instance: Rating) -> None:
+    instance.rating_class = get_object_rating_class(instance)
+    instance.save(update_fields=["rating_class", "position"])
+
+
 @receiver(pre_save, sender=Rating)
 def handle_rating_pre_save(sender, instance, **kwargs):
     if instance.id:
-        instance._old_level = Rating.objects.get(id=instance.id).level
+        old_rating = Rating.objects.get(id=instance.id)
+        instance._old_level = old_rating.level
+        instance._old_score = old_rating.score
+        instance._old_rating_type = old_rating.rating_type
+        instance._old_category_points = get_rating_category_points(old_rating)
     else:
         instance.position = instance.level.ratings.count() + 1
 
 
 @receiver(post_save, sender=Rating)
+def handle_rating_creation_and_updates(sender, instance, created, **kwargs):
+    old_level = getattr(instance, "_old_level", None)
+    old_score = getattr(instance, "_old_score", 0)
+    with disable_signals():
+        update_rating_score(instance)
+        update_rating_class(instance)
+        score = instance.score
+        if created:
+            update_level_rating_score(instance.level, score, 1)
+        elif old_level and old_level.pk != instance.level.pk:
+            update_level_rating_score(old_level, -old_score, -1)
+            update_level_rating_score(instance.level, score, 1)
+        else:
+            update_level_rating_score(instance.level, score - old_score, 0)
+        instance.author.update_rated_level_count()
+    update_rating_category_stats(instance, created)
+
+
+def update_rating_category_stats(instance: Rating, created: bool) -> None:
+    is_trc = instance.rating_type == RatingType.TRC
+    if created:
+        if is_trc:
+            update_level_rating_category_points(instance.level_id, {}, {}, 1)
+        return
+
+    old_level = getattr(instance, "_old_level", None)
+    old_level_id = old_level.pk if old_level else instance.level_id
+    was_trc = (
+        getattr(instance, "_old_rating_type", instance.rating_type)
+        == RatingType.TRC
+    )
+    if old_level_id == instance.level_id and was_trc == is_trc:
+        # the points only change along with the answers
+        return
+
+    update_level_rating_category_points(
+        old_level_id,
+        getattr(instance, "_old_category_points", {}),
+        {},
+        -int(was_trc),
+    )
+    update_level_rating_category_points(
+        instance.level_id,
+        {},
+        get_rating_category_points(instance),
+        int(is_trc),
+    )
+
+
 @receiver(m2m_changed, sender=Rating.answers.through)
-def handle_rating_creation_and_updates(sender, instance, **kwargs):
+def handle_rating_answers_change(sender, instance, action, **kwargs):
+    if action.startswith("pre_"):
+        instance._old_score = instance.score
+        instance._old_category_points = get_rating_category_points(instance)
+        return
+
+    update_level_rating_category_points(
+        instance.level_id,
+        getattr(instance, "_old_category_points", {}),
+        get_rating_category_points(instance),
+        0,
+    )
+    old_score = getattr(instance, "_old_score", instance.score)
     with disable_signals():
-        instance.rating_class = get_object_rating_class(instance)
-        instance.save(update_fields=["rating_class", "position"])
-        level = instance.level
-        level.rating_class = get_object_rating_class(level)
-        level.update_rating_count()
-        level.save(update_fields=["rating_class"])
-        if old_level := getattr(instance, "_old_level", None):
-            old_level.update_rating_count()
-        author = instance.author
-        author.update_rated_level_count()
+        update_rating_score(instance)
+        update_rating_class(instance)
+        if instance.score != old_score:
+            update_level_rating_score(
+                instance.level, instance.score - old_score, 0
+            )
+
+
+@receiver(pre_delete, sender=Rating)
+def handle_rating_pre_delete(sender, instance, **kwargs):
+    instance._old_category_points = get_rating_category_points(instance)
 
 
 @receiver(post_delete, sender=Rating)
 def handle_rating_deletion(sender, instance, **kwargs):
+    if instance.rating_type == RatingType.TRC:
+        update_level_rating_category_points(
+            instance.level_id,
+            getattr(instance, "_old_category_points", {}),
+            {},
+            -1,
+        )
     level = instance.level
-    level.rating_class = get_object_rating_class(level)
-    level.update_rating_count()
-    level.save(update_fields=["rating_class"])
+    update_level_rating_score(level, -instance.score, -1)
     author = instance.author
     author.update_rated_level_count()
 
@@ -50,3 +142,11 @@ def handle_rating_deletion(sender, instance, **kwargs):
         if position != rating.position:
             # do not trigger modification time changes
             Rating.objects.filter(pk=rating.pk).update(position=position)
+
+
+@receiver(post_save, sender=RatingTemplateQuestion)
+@receiver(post_delete, sender=RatingTemplateQuestion)
+@receiver(post_save, sender=RatingTemplateAnswer)
+@receiver(post_delete, sender=RatingTemplateAnswer)
+def handle_rating_template_change(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_rating_template_cache)
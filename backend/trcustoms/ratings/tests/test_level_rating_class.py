@@ -0,0 +1,177 @@
+from itertools import count
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trcustoms.common.consts import RatingClassSubject
+from trcustoms.common.tests.factories import RatingClassFactory
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.models import Rating
+from trcustoms.ratings.tests.factories import (
+    RatingFactory,
+    RatingTemplateAnswerFactory,
+    RatingTemplateQuestionFactory,
+)
+from trcustoms.scoring import LevelScorer, get_object_rating_class
+from trcustoms.users.tests.factories import UserFactory
+
+rater_counter = count()
+
+
+@pytest.fixture(name="level_rating_classes", autouse=True)
+def fixture_level_rating_classes() -> None:
+    RatingClassFactory(
+        target=RatingClassSubject.LEVEL,
+        position=-1,
+        min_rating_count=1,
+        min_rating_average=None,
+        max_rating_average=0.5,
+        name="Negative",
+    )
+    RatingClassFactory(
+        target=RatingClassSubject.LEVEL,
+        position=1,
+        min_rating_count=1,
+        min_rating_average=0.5,
+        max_rating_average=None,
+        name="Positive",
+    )
+
+
+@pytest.fixture(name="answers")
+def fixture_answers() -> list:
+    question = RatingTemplateQuestionFactory()
+    return [
+        RatingTemplateAnswerFactory(question=question, points=0),
+        RatingTemplateAnswerFactory(question=question, points=5),
+        RatingTemplateAnswerFactory(question=question, points=10),
+    ]
+
+
+def create_trc_rating(level, answer) -> Rating:
+    rating = RatingFactory(
+        level=level,
+        author=UserFactory(username=f"rater{next(rater_counter)}"),
+        rating_type=RatingType.TRC,
+    )
+    rating.answers.set([answer])
+    return rating
+
+
+def assert_level_in_sync(level) -> None:
+    level.refresh_from_db()
+    scores = LevelScorer.get_review_scores(level)
+    assert level.rating_count == len(scores)
+    assert level.rating_score_sum == pytest.approx(sum(scores))
+    assert level.rating_class == get_object_rating_class(level)
+
+
+@pytest.mark.django_db
+def test_level_rating_class_follows_rating_creation(answers: list) -> None:
+    level = LevelFactory()
+
+    create_trc_rating(level, answers[2])
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Positive"
+
+    create_trc_rating(level, answers[0])
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Negative"
+
+    create_trc_rating(level, answers[2])
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Positive"
+
+
+@pytest.mark.django_db
+def test_level_rating_class_follows_rating_update(answers: list) -> None:
+    level = LevelFactory()
+    rating = create_trc_rating(level, answers[0])
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Negative"
+
+    rating.answers.set([answers[2]])
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Positive"
+
+
+@pytest.mark.django_db
+def test_level_rating_class_follows_trle_rating_update() -> None:
+    level = LevelFactory()
+    rating = RatingFactory(
+        level=level,
+        rating_type=RatingType.TRLE,
+        trle_score_gameplay=2,
+        trle_score_enemies=2,
+        trle_score_atmosphere=2,
+        trle_score_lighting=2,
+    )
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Negative"
+
+    rating.trle_score_gameplay = 10
+    rating.trle_score_enemies = 10
+    rating.save()
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Positive"
+
+
+@pytest.mark.django_db
+def test_level_rating_class_follows_rating_level_change(
+    answers: list,
+) -> None:
+    level1 = LevelFactory()
+    level2 = LevelFactory()
+    rating = create_trc_rating(level1, answers[2])
+
+    rating.level = level2
+    rating.save()
+
+    assert_level_in_sync(level1)
+    assert_level_in_sync(level2)
+    assert level1.rating_class is None
+    assert level2.rating_class.name == "Positive"
+
+
+@pytest.mark.django_db
+def test_level_rating_class_follows_rating_deletion(answers: list) -> None:
+    level = LevelFactory()
+    rating1 = create_trc_rating(level, answers[2])
+    rating2 = create_trc_rating(level, answers[0])
+    rating3 = create_trc_rating(level, answers[0])
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Negative"
+
+    rating2.delete()
+    rating3.delete()
+    assert_level_in_sync(level)
+    assert level.rating_class.name == "Positive"
+
+    rating1.delete()
+    assert_level_in_sync(level)
+    assert level.rating_class is None
+    assert level.rating_score_sum == 0
+
+
+@pytest.mark.django_db
+def test_level_rating_class_update_cost_does_not_grow(answers: list) -> None:
+    def count_rating_queries(level) -> int:
+        rating = RatingFactory.build(
+            level=level,
+            author=UserFactory(username=f"rater{next(rater_counter)}"),
+            rating_type=RatingType.TRC,
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            rating.save()
+            rating.answers.set([answers[1]])
+        return len(ctx.captured_queries)
+
+    level = LevelFactory()
+    count_rating_queries(level)
+    baseline = count_rating_queries(level)
+    for _ in range(10):
+        count_rating_queries(level)
+
+    assert count_rating_queries(level) == baseline
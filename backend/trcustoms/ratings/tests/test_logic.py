@@ -0,0 +1,110 @@
+import pytest
+
+from trcustoms.levels.tests.factories import LevelFactory
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.logic import (
+    calculate_rating_score,
+    update_rating_scores,
+)
+from trcustoms.ratings.models import Rating
+from trcustoms.ratings.tests.factories import (
+    RatingFactory,
+    RatingTemplateAnswerFactory,
+    RatingTemplateQuestionFactory,
+)
+from trcustoms.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_rating_score_follows_answer_changes() -> None:
+    """Test that the stored score is kept current when answers change."""
+    question1 = RatingTemplateQuestionFactory(weight=1)
+    question2 = RatingTemplateQuestionFactory(weight=3)
+    answer1_low = RatingTemplateAnswerFactory(question=question1, points=0)
+    answer1_high = RatingTemplateAnswerFactory(question=question1, points=4)
+    answer2_high = RatingTemplateAnswerFactory(question=question2, points=4)
+
+    rating = RatingFactory(rating_type=RatingType.TRC)
+    assert rating.score == 0
+
+    rating.answers.set([answer1_high, answer2_high])
+    rating.refresh_from_db()
+    assert rating.score == 1.0
+
+    rating.answers.set([answer1_low, answer2_high])
+    rating.refresh_from_db()
+    assert rating.score == 0.75
+
+
+@pytest.mark.django_db
+def test_rating_score_follows_trle_score_changes() -> None:
+    """Test that the stored score is kept current on legacy rating edits."""
+    rating = RatingFactory(
+        rating_type=RatingType.TRLE,
+        trle_score_gameplay=10,
+        trle_score_enemies=10,
+        trle_score_atmosphere=0,
+        trle_score_lighting=None,
+    )
+    rating.refresh_from_db()
+    assert rating.score == 0.5
+
+    rating.trle_score_atmosphere = 10
+    rating.trle_score_lighting = 10
+    rating.save()
+    rating.refresh_from_db()
+    assert rating.score == 1.0
+
+
+@pytest.mark.django_db
+def test_update_rating_scores_matches_per_rating_calculation() -> None:
+    """Test that the set-based backfill agrees with the per-rating path."""
+    questions = [
+        RatingTemplateQuestionFactory(weight=1),
+        RatingTemplateQuestionFactory(weight=2),
+    ]
+    answers = [
+        RatingTemplateAnswerFactory(question=questions[0], points=1),
+        RatingTemplateAnswerFactory(question=questions[0], points=3),
+        RatingTemplateAnswerFactory(question=questions[1], points=2),
+        RatingTemplateAnswerFactory(question=questions[1], points=5),
+    ]
+    level = LevelFactory()
+    trc_rating1 = RatingFactory(
+        level=level,
+        author=UserFactory(username="foo"),
+        rating_type=RatingType.TRC,
+    )
+    trc_rating1.answers.set([answers[0], answers[3]])
+    trc_rating2 = RatingFactory(
+        level=level,
+        author=UserFactory(username="bar"),
+        rating_type=RatingType.TRC,
+    )
+    trc_rating2.answers.set([answers[1], answers[2]])
+    RatingFactory(
+        level=level,
+        author=UserFactory(username="baz"),
+        rating_type=RatingType.TRC,
+    )
+    RatingFactory(
+        level=level,
+        author=UserFactory(username="qux"),
+        rating_type=RatingType.TRLE,
+        trle_score_gameplay=7,
+        trle_score_enemies=3,
+        trle_score_atmosphere=None,
+        trle_score_lighting=9,
+    )
+    expected = {
+        rating.pk: calculate_rating_score(rating)
+        for rating in Rating.objects.all()
+    }
+    Rating.objects.update(score=-1)
+
+    assert update_rating_scores() == 4
+
+    assert {
+        rating.pk: pytest.approx(rating.score)
+        for rating in Rating.objects.all()
+    } == expected
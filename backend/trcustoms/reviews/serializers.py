@@ -7,7 +7,7 @@ from trcustoms.mails import (
     send_review_update_mail,
 )
 from trcustoms.reviews.models import Review
-from trcustoms.tasks import update_awards
+from trcustoms.tasks import schedule_award_updates
 from trcustoms.users.serializers import UserNestedSerializer
 
 
@@ -86,7 +86,7 @@ class ReviewDetailsSerializer(ReviewListingSerializer):
         review.bump_last_user_content_updated()
         review.save()
         send_review_submission_mail(review)
-        update_awards.delay(review.author.pk)
+        schedule_award_updates(review.author.pk)
         return review
 
     def update(self, instance, validated_data):
@@ -94,5 +94,5 @@ class ReviewDetailsSerializer(ReviewListingSerializer):
         review.bump_last_user_content_updated()
         review.save()
         send_review_update_mail(review)
-        update_awards.delay(review.author.pk)
+        schedule_award_updates(review.author.pk)
         return review
@@ -2,6 +2,7 @@ from rest_framework import mixins, viewsets
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
+from trcustoms.common.pagination import KeysetPagination
 from trcustoms.mixins import (
     AuditLogModelWatcherMixin,
     MultiSerializerMixin,
@@ -69,6 +70,7 @@ class ReviewViewSet(
         ],
     }
 
+    pagination_class = KeysetPagination
     serializer_class = ReviewListingSerializer
     serializer_class_by_action = {
         "retrieve": ReviewDetailsSerializer,
@@ -1,7 +1,8 @@
 from functools import cache
 from statistics import mean
 
-from django.db.models import Model, QuerySet
+from django.db import transaction
+from django.db.models import F, Model, QuerySet
 
 from trcustoms.common.consts import RatingClassSubject
 from trcustoms.common.models import RatingClass
@@ -9,6 +10,10 @@ from trcustoms.levels.models import Level
 from trcustoms.ratings.logic import get_rating_score
 from trcustoms.ratings.models import Rating
 
+# Running score sums accumulate floating point error; round the average so
+# that levels sitting exactly on a class boundary resolve like mean() would.
+SCORE_AVERAGE_PRECISION = 9
+
 
 @cache
 def get_rating_classes(target: RatingClassSubject) -> QuerySet:
@@ -77,3 +82,56 @@ def get_object_rating_class(instance: Level | Rating) -> RatingClass:
     average = mean(ratings)
     count = len(ratings)
     return get_rating_class(target, average, count)
+
+
+def get_level_rating_class(level: Level) -> RatingClass:
+    """Resolve the level rating class from its denormalized score totals."""
+    if not level.rating_count:
+        return None
+    average = round(
+        level.rating_score_sum / level.rating_count, SCORE_AVERAGE_PRECISION
+    )
+    return get_rating_class(LevelScorer.target, average, level.rating_count)
+
+
+def move_level_rating_class(
+    old_rating_class_id: int | None, new_rating_class_id: int | None
+) -> None:
+    """Move one level between the level counts of two rating classes."""
+    if old_rating_class_id == new_rating_class_id:
+        return
+    if old_rating_class_id:
+        RatingClass.objects.filter(pk=old_rating_class_id).update(
+            level_count=F("level_count") - 1
+        )
+    if new_rating_class_id:
+        RatingClass.objects.filter(pk=new_rating_class_id).update(
+            level_count=F("level_count") + 1
+        )
+
+
+def update_level_rating_score(
+    level: Level, score_delta: float, count_delta: int
+) -> None:
+    """Apply a rating score change to the level running totals.
+
+    Runs in constant time regardless of how many ratings the level has, and
+    updates the level rating class accordingly.
+    """
+    with transaction.atomic():
+        locked_level = (
+            Level.objects.select_for_update()
+            .only("rating_score_sum", "rating_count", "rating_class_id")
+            .get(pk=level.pk)
+        )
+        level.rating_count = locked_level.rating_count + count_delta
+        level.rating_score_sum = locked_level.rating_score_sum + score_delta
+        if not level.rating_count and level.rating_score_sum:
+            # drop any float residue once the last rating is gone
+            level.rating_score_sum = 0
+        old_rating_class_id = locked_level.rating_class_id
+        level.rating_class = get_level_rating_class(level)
+        level.save(
+            update_fields=["rating_class", "rating_score_sum", "rating_count"]
+        )
+        move_level_rating_class(old_rating_class_id, level.rating_class_id)
@@ -130,10 +130,12 @@ LOGGING = {
     },
 }
 
+REDIS_URL = "redis://trcustoms-redis:6379"
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        "LOCATION": "redis://trcustoms-redis:6379",
+        "LOCATION": REDIS_URL,
     }
 }
 
@@ -233,8 +235,8 @@ ADMIN_DIR = get_setting("ADMIN_DIR")
 MEDIA_URL = "/uploads/"
 MEDIA_ROOT = BASE_DIR / "uploads"
 
-CELERY_BROKER_URL = "redis://trcustoms-redis:6379"
-CELERY_RESULT_BACKEND = "redis://trcustoms-redis:6379"
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_IMPORTS = ("trcustoms.tasks",)
@@ -259,6 +261,8 @@ MAX_TAG_LENGTH = 20
 
 # Fingerprint expiration for download counter (in timedelta hours)
 DOWNLOAD_FINGERPRINT_EXPIRATION: timedelta = timedelta(hours=2)
+# Validity of the presigned S3 URLs level file downloads redirect to
+DOWNLOAD_URL_EXPIRATION: timedelta = timedelta(minutes=5)
 
 EMAIL_HOST = get_setting("EMAIL_HOST")
 EMAIL_PORT = int(get_setting("EMAIL_PORT"))
@@ -304,5 +308,7 @@ if TESTING:
     del REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"]
     del REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
     CELERY_TASK_ALWAYS_EAGER = True
+    # keep the cache of parallel test workers and of separate runs apart
+    CACHES["default"]["KEY_PREFIX"] = f"test{os.getpid()}"
     PASSWORD_HASHERS = ("django.contrib.auth.hashers.MD5PasswordHasher",)
     os.environ["TESTING"] = "1"  # for xdist, which destroys sys.argv
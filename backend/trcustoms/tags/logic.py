@@ -1,6 +1,7 @@
 from rest_framework.request import Request
 
 from trcustoms.audit_logs.utils import track_model_update
+from trcustoms.levels.logic import update_level_search_vectors
 from trcustoms.levels.models import Level
 from trcustoms.tags.models import Tag
 
@@ -38,8 +39,11 @@ def merge_tags(source: str, target: str, request: Request | None) -> None:
         changes=[f"Merged to {target_tag.name}"],
         notify=True,
     ):
+        level_ids = list(
+            Level.objects.filter(tags=source_tag).values_list("id", flat=True)
+        )
         levels = (
-            Level.objects.filter(tags=source_tag)
+            Level.objects.filter(id__in=level_ids)
             .exclude(tags=target_tag)
             .values("id")
         )
@@ -51,3 +55,4 @@ def merge_tags(source: str, target: str, request: Request | None) -> None:
             ]
         )
     source_tag.delete()
+    update_level_search_vectors(Level.objects.filter(id__in=level_ids))
@@ -8,10 +8,20 @@ from trcustoms.celery import app
 from trcustoms.tasks.delete_stalled_drafts import delete_stalled_drafts
 from trcustoms.tasks.delete_unreferenced_files import delete_unreferenced_files
 from trcustoms.tasks.delete_unreferenced_tags import delete_unreferenced_tags
+from trcustoms.tasks.flush_download_counters import (
+    buffer_download,
+    flush_download_counters,
+)
 from trcustoms.tasks.merge_duplicate_files import merge_duplicate_files
 from trcustoms.tasks.prune_unused_accounts import prune_unused_accounts
-from trcustoms.tasks.update_awards import update_awards
+from trcustoms.tasks.update_awards import (
+    schedule_award_updates,
+    update_awards,
+    update_pending_awards,
+)
+from trcustoms.tasks.update_awards_rarity import update_awards_rarity
 from trcustoms.tasks.update_featured_levels import update_featured_levels
+from trcustoms.tasks.update_site_stats import update_site_stats
 
 
 @app.on_after_finalize.connect
@@ -34,12 +44,23 @@ def setup_periodic_tasks(sender, **kwargs: Any) -> None:
         crontab(hour=3, minute=0), update_featured_levels.s()
     )
     sender.add_periodic_task(crontab(minute=0), prune_unused_accounts.s())
+    sender.add_periodic_task(crontab(minute=30), update_awards_rarity.s())
+    sender.add_periodic_task(crontab(minute=45), update_site_stats.s())
+    sender.add_periodic_task(
+        crontab(minute="*/5"), flush_download_counters.s()
+    )
 
 
 __all__ = [
+    "buffer_download",
     "delete_unreferenced_files",
     "delete_unreferenced_tags",
+    "flush_download_counters",
     "merge_duplicate_files",
+    "schedule_award_updates",
     "update_awards",
+    "update_awards_rarity",
     "update_featured_levels",
+    "update_pending_awards",
+    "update_site_stats",
 ]
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Model, Value, When
+from redis import Redis
+
+from trcustoms.celery import app, logger
+from trcustoms.config.models import SiteStats
+from trcustoms.levels.models import Level, LevelFile
+
+DOWNLOAD_COUNTS_KEY = "level_file_download_counts"
+FLUSH_LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+def get_download_counts_redis() -> tuple[Redis, str]:
+    """Return the Redis client behind the default cache, which also holds
+    the download fingerprints, and the key of the download count buffer.
+    """
+    key = cache.make_and_validate_key(DOWNLOAD_COUNTS_KEY)
+    # pylint: disable=protected-access
+    return cache._cache.get_client(key, write=True), key
+
+
+def buffer_download(file_id: int) -> None:
+    redis, key = get_download_counts_redis()
+    redis.hincrby(key, file_id, 1)
+
+
+def increment_download_counts(
+    model: type[Model], counts: dict[int, int]
+) -> None:
+    if not counts:
+        return
+    model.objects.filter(pk__in=counts).update(
+        download_count=F("download_count")
+        + Case(
+            *[When(pk=pk, then=Value(count)) for pk, count in counts.items()],
+            output_field=IntegerField(),
+        )
+    )
+
+
+def flush_buffered_downloads() -> int:
+    """Write the buffered download counts to level files and levels.
+
+    The buffer is renamed before being read so that downloads arriving in
+    the meantime go to a fresh buffer. A buffer left behind by a failed
+    flush is written first. Returns the number of flushed downloads.
+
+    Only one flush runs at a time. The renamed buffer gets a token that is
+    saved along with the counts, so a buffer that was written but not
+    deleted is not written again.
+    """
+    redis, key = get_download_counts_redis()
+    lock_key = f"{key}:lock"
+    lock_token = uuid4().hex
+    if not redis.set(lock_key, lock_token, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        return flush_locked_buffer(redis, key)
+    finally:
+        if redis.get(lock_key) == lock_token.encode():
+            redis.delete(lock_key)
+
+
+def flush_locked_buffer(redis: Redis, key: str) -> int:
+    flushing_key = f"{key}:flushing"
+    token_key = f"{key}:token"
+    if not redis.exists(flushing_key):
+        if not redis.exists(key):
+            return 0
+        with redis.pipeline() as pipe:
+            pipe.rename(key, flushing_key)
+            pipe.set(token_key, uuid4().hex)
+            pipe.execute()
+    elif not redis.exists(token_key):
+        redis.set(token_key, uuid4().hex)
+    flush_token = redis.get(token_key).decode()
+
+    file_counts = {
+        int(file_id): int(count)
+        for file_id, count in redis.hgetall(flushing_key).items()
+    }
+    level_counts = defaultdict(int)
+    for file_id, level_id in LevelFile.objects.filter(
+        pk__in=file_counts
+    ).values_list("pk", "level_id"):
+        level_counts[level_id] += file_counts[file_id]
+
+    # bypass the signals: they would recount the downloads of all files of
+    # each level, which is what buffering the downloads avoids. downloads of
+    # files deleted in the meantime count towards neither their level nor
+    # the site total.
+    with transaction.atomic():
+        site_stats = SiteStats.objects.select_for_update().first()
+        if site_stats and site_stats.download_flush_token == flush_token:
+            # written by a flush that failed to delete the buffer
+            file_counts = {}
+        else:
+            increment_download_counts(LevelFile, file_counts)
+            increment_download_counts(Level, level_counts)
+            SiteStats.objects.update(
+                total_downloads=F("total_downloads")
+                + sum(level_counts.values()),
+                download_flush_token=flush_token,
+            )
+    redis.delete(flushing_key, token_key)
+    return sum(file_counts.values())
+
+
+@app.task
+def flush_download_counters() -> None:
+    if count := flush_buffered_downloads():
+        logger.info(f"flushed {count} downloads")
@@ -1,9 +1,75 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from redis import Redis
+
 from trcustoms.awards.logic import update_awards as recalculate
-from trcustoms.celery import app
+from trcustoms.awards.logic import update_awards_batch
+from trcustoms.celery import app, logger
 from trcustoms.users.models import User
 
+UPDATE_AWARDS_DELAY = timedelta(seconds=30)
+PENDING_USERS_KEY = "award_updates_pending"
+SCHEDULED_KEY = "award_updates_scheduled"
+
+
+def get_award_updates_redis() -> tuple[Redis, str, str]:
+    """Return the Redis client behind the default cache, and the keys of
+    the pending users set and of the scheduled run flag.
+    """
+    pending_key = cache.make_and_validate_key(PENDING_USERS_KEY)
+    scheduled_key = cache.make_and_validate_key(SCHEDULED_KEY)
+    # pylint: disable=protected-access
+    client = cache._cache.get_client(pending_key, write=True)
+    return client, pending_key, scheduled_key
+
 
 @app.task
 def update_awards(user_id: int, **kwargs) -> None:
     user = User.objects.get(pk=user_id)
     recalculate(user, **kwargs)
+
+
+@app.task
+def update_pending_awards() -> None:
+    redis, pending_key, scheduled_key = get_award_updates_redis()
+    # drop the flag before taking the users, so that anyone queued after
+    # this point schedules a new run rather than getting lost
+    redis.delete(scheduled_key)
+    with redis.pipeline() as pipe:
+        pipe.smembers(pending_key)
+        pipe.delete(pending_key)
+        members, _deleted = pipe.execute()
+    user_ids = [int(member) for member in members]
+    if not user_ids:
+        return
+    logger.info(f"updating awards of {len(user_ids)} users")
+    update_awards_batch(User.objects.filter(pk__in=user_ids))
+
+
+def schedule_award_updates(*user_ids: int) -> None:
+    """Recalculate the awards of the given users in the background.
+
+    Requests made within UPDATE_AWARDS_DELAY are collected in a Redis set
+    and handled together by a single update_pending_awards run, so each
+    user is only processed once no matter how many times they were queued.
+    """
+    if not user_ids:
+        return
+
+    if app.conf.task_always_eager:
+        # tasks run inline, there is no window to collect the users in
+        update_awards_batch(User.objects.filter(pk__in=user_ids))
+        return
+
+    redis, pending_key, scheduled_key = get_award_updates_redis()
+    redis.sadd(pending_key, *user_ids)
+    if redis.set(
+        scheduled_key,
+        1,
+        nx=True,
+        ex=UPDATE_AWARDS_DELAY * 2,
+    ):
+        update_pending_awards.apply_async(
+            countdown=UPDATE_AWARDS_DELAY.total_seconds()
+        )
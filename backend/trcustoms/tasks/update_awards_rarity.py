@@ -0,0 +1,7 @@
+from trcustoms.awards.logic import update_all_awards_stats
+from trcustoms.celery import app
+
+
+@app.task
+def update_awards_rarity() -> None:
+    update_all_awards_stats()
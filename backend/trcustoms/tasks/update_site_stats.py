@@ -0,0 +1,7 @@
+from trcustoms.celery import app
+from trcustoms.config.logic import update_site_stats as recalculate
+
+
+@app.task
+def update_site_stats() -> None:
+    recalculate()
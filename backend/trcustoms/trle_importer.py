@@ -0,0 +1,691 @@
+import json
+import logging
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from itertools import chain, groupby, islice
+from operator import itemgetter
+from pathlib import Path
+from typing import TypeVar
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from trcustoms.common.models import Country
+from trcustoms.config.logic import invalidate_config_cache, update_site_stats
+from trcustoms.engines.models import Engine
+from trcustoms.levels.consts import LevelLinkType
+from trcustoms.levels.logic import (
+    invalidate_level_cache,
+    update_level_denormalized_fields,
+)
+from trcustoms.levels.models import (
+    Level,
+    LevelDifficulty,
+    LevelDuration,
+    LevelExternalLink,
+    LevelFile,
+)
+from trcustoms.ratings.consts import RatingType
+from trcustoms.ratings.logic import update_rating_scores
+from trcustoms.ratings.models import Rating
+from trcustoms.reviews.consts import ReviewType
+from trcustoms.reviews.models import Review
+from trcustoms.scoring import get_level_rating_class, get_object_rating_class
+from trcustoms.signals import disable_signals
+from trcustoms.tags.models import Tag
+from trcustoms.tasks import schedule_award_updates
+from trcustoms.trle_scraper import (
+    TRLEAuthor,
+    TRLELevel,
+    TRLELevelReview,
+    TRLELevelWalkthrough,
+    TRLEReviewer,
+    TRLEUser,
+)
+from trcustoms.users.consts import UserSource
+from trcustoms.users.logic import update_user_denormalized_fields
+from trcustoms.users.models import User
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CHUNK_SIZE = 1000
+
+TRLE_DIFFICULTIES = {
+    "easy": "Easy",
+    "medium": "Medium",
+    "challenging": "Hard",
+    "very challenging": "Very hard",
+}
+TRLE_DURATIONS = {
+    "short": "Short (<1 hour)",
+    "medium": "Medium (1+ hours)",
+    "long": "Long (3+ hours)",
+    "very long": "Very long (6+ hours)",
+}
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_date(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value else None
+
+
+def to_datetime(value: date | None) -> datetime | None:
+    if value is None:
+        return None
+    return datetime.combine(value, time.min, tzinfo=dt_timezone.utc)
+
+
+def read_jsonl(path: Path, factory: Callable[[dict], T]) -> list[T]:
+    """Read the items written by the trle_crawl command."""
+    if not path.exists():
+        return []
+    with path.open() as handle:
+        return [factory(json.loads(line)) for line in handle if line.strip()]
+
+
+def parse_user(data: dict, cls: type[TRLEUser]) -> TRLEUser:
+    return cls(**{**data, "birthday": parse_date(data["birthday"])})
+
+
+def parse_level(data: dict) -> TRLELevel:
+    return TRLELevel(
+        **{
+            **data,
+            "release_date": parse_date(data["release_date"]),
+            "average_rating": Decimal(data["average_rating"]),
+            "walkthrough": (
+                TRLELevelWalkthrough(**data["walkthrough"])
+                if data["walkthrough"]
+                else None
+            ),
+            "reviews": [
+                TRLELevelReview(
+                    **{
+                        **review,
+                        "publication_date": parse_date(
+                            review["publication_date"]
+                        ),
+                    }
+                )
+                for review in data["reviews"]
+            ],
+        }
+    )
+
+
+def read_crawl_output(
+    path: Path,
+) -> tuple[list[TRLELevel], list[TRLEAuthor], list[TRLEReviewer]]:
+    """Read the levels, authors and reviewers crawled into a directory.
+
+    Items crawled more than once are only returned in their latest form.
+    """
+    levels = read_jsonl(path / "levels.jsonl", parse_level)
+    authors = read_jsonl(
+        path / "authors.jsonl", lambda data: parse_user(data, TRLEAuthor)
+    )
+    reviewers = read_jsonl(
+        path / "reviewers.jsonl", lambda data: parse_user(data, TRLEReviewer)
+    )
+    return (
+        list({level.level_id: level for level in levels}.values()),
+        list({author.author_id: author for author in authors}.values()),
+        list(
+            {reviewer.reviewer_id: reviewer for reviewer in reviewers}.values()
+        ),
+    )
+
+
+@dataclass
+class TRLEImportStats:
+    users: int = 0
+    levels_created: int = 0
+    levels_updated: int = 0
+    levels_skipped: int = 0
+    ratings: int = 0
+    reviews: int = 0
+    reviews_skipped: int = 0
+
+
+class TRLEImporter:
+    """Write scraped TRLE users, levels and reviews to the database.
+
+    Rows are written in chunks with bulk operations while the model signals
+    are disabled, so none of the per-object bookkeeping runs (rating
+    recounts, site statistics, award updates). Instead, the denormalized
+    fields of everything that was touched are recalculated with set-based
+    updates once all rows are in.
+
+    The importer does not take `trle_id` as a unique key of levels, so
+    levels are matched in Python and then created or updated in bulk.
+    Users, level files, ratings and reviews are upserted on their unique
+    constraints.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self.stats = TRLEImportStats()
+        self.author_user_ids: dict[int, int] = {}
+        self.reviewer_user_ids: dict[int, int] = {}
+        self.level_ids: dict[int, int] = {}
+
+    def run(
+        self,
+        levels: Iterable[TRLELevel],
+        authors: Iterable[TRLEAuthor],
+        reviewers: Iterable[TRLEReviewer],
+    ) -> TRLEImportStats:
+        with disable_signals(), transaction.atomic():
+            self.import_users(authors, reviewers)
+            for chunk in chunked(levels, self.chunk_size):
+                self.import_levels(chunk)
+            self.update_denormalized_fields()
+
+            level_ids = list(self.level_ids.values())
+            user_ids = list(
+                set(self.author_user_ids.values())
+                | set(self.reviewer_user_ids.values())
+            )
+            transaction.on_commit(invalidate_config_cache)
+            transaction.on_commit(lambda: invalidate_level_cache(*level_ids))
+            transaction.on_commit(lambda: schedule_award_updates(*user_ids))
+        return self.stats
+
+    def import_users(
+        self,
+        authors: Iterable[TRLEAuthor],
+        reviewers: Iterable[TRLEReviewer],
+    ) -> None:
+        trle_users = self.group_trle_users(authors, reviewers)
+        country_ids = {
+            name.lower(): pk
+            for pk, name in Country.objects.values_list("pk", "name")
+        }
+
+        for keys in chunked(trle_users, self.chunk_size):
+            existing_users = self.find_existing_users(
+                {key: trle_users[key] for key in keys}
+            )
+            users: dict[str, User] = {}
+            for key in keys:
+                author_id, reviewer_id, trle_user = trle_users[key]
+                if row := existing_users.get(key):
+                    # keep the account as it is, and only link it to TRLE
+                    users[row["username_lower"]] = User(
+                        username=row["username"],
+                        trle_author_id=author_id or row["trle_author_id"],
+                        trle_reviewer_id=(
+                            reviewer_id or row["trle_reviewer_id"]
+                        ),
+                    )
+                else:
+                    users[key] = self.build_user(
+                        trle_user, author_id, reviewer_id, country_ids
+                    )
+
+            User.objects.bulk_create(
+                users.values(),
+                update_conflicts=True,
+                unique_fields=["username"],
+                update_fields=["trle_author_id", "trle_reviewer_id"],
+            )
+            self.stats.users += len(users)
+
+            for row in (
+                User.objects.annotate(username_lower=Lower("username"))
+                .filter(username_lower__in=users)
+                .values("pk", "trle_author_id", "trle_reviewer_id")
+            ):
+                if author_id := row["trle_author_id"]:
+                    self.author_user_ids[author_id] = row["pk"]
+                if reviewer_id := row["trle_reviewer_id"]:
+                    self.reviewer_user_ids[reviewer_id] = row["pk"]
+
+    @staticmethod
+    def group_trle_users(
+        authors: Iterable[TRLEAuthor],
+        reviewers: Iterable[TRLEReviewer],
+    ) -> dict[str, tuple[int | None, int | None, TRLEUser]]:
+        """Merge the TRLE authors and reviewers sharing a nickname."""
+        trle_users: dict[str, tuple[int | None, int | None, TRLEUser]] = {}
+        for trle_user in chain(authors, reviewers):
+            if not trle_user.nickname:
+                continue
+            key = trle_user.nickname.lower()
+            author_id, reviewer_id, _ = trle_users.get(key, (None, None, None))
+            if isinstance(trle_user, TRLEAuthor):
+                author_id = trle_user.author_id
+            else:
+                reviewer_id = trle_user.reviewer_id
+            trle_users[key] = (author_id, reviewer_id, trle_user)
+        return trle_users
+
+    @staticmethod
+    def find_existing_users(
+        trle_users: dict[str, tuple[int | None, int | None, TRLEUser]],
+    ) -> dict[str, dict]:
+        """Match TRLE users to existing accounts.
+
+        Accounts already linked to the same TRLE author or reviewer win over
+        accounts that merely share the nickname.
+        """
+        author_ids = {author_id for author_id, _, _ in trle_users.values()}
+        reviewer_ids = {
+            reviewer_id for _, reviewer_id, _ in trle_users.values()
+        }
+        by_name, by_author_id, by_reviewer_id = {}, {}, {}
+        for row in (
+            User.objects.annotate(username_lower=Lower("username"))
+            .filter(
+                Q(username_lower__in=trle_users)
+                | Q(trle_author_id__in=author_ids - {None})
+                | Q(trle_reviewer_id__in=reviewer_ids - {None})
+            )
+            .values(
+                "username_lower",
+                "username",
+                "trle_author_id",
+                "trle_reviewer_id",
+            )
+        ):
+            by_name[row["username_lower"]] = row
+            if row["trle_author_id"]:
+                by_author_id[row["trle_author_id"]] = row
+            if row["trle_reviewer_id"]:
+                by_reviewer_id[row["trle_reviewer_id"]] = row
+
+        return {
+            key: row
+            for key, (author_id, reviewer_id, _) in trle_users.items()
+            if (
+                row := by_author_id.get(author_id)
+                or by_reviewer_id.get(reviewer_id)
+                or by_name.get(key)
+            )
+        }
+
+    @staticmethod
+    def build_user(
+        trle_user: TRLEUser,
+        author_id: int | None,
+        reviewer_id: int | None,
+        country_ids: dict[str, int],
+    ) -> User:
+        """Build a placeholder account for a TRLE user without one."""
+        first_name, _, last_name = (trle_user.full_name or "").partition(" ")
+        return User(
+            username=trle_user.nickname,
+            password=make_password(None),
+            first_name=first_name[:150],
+            last_name=last_name[:150],
+            source=UserSource.trle,
+            is_active=False,
+            trle_author_id=author_id,
+            trle_reviewer_id=reviewer_id,
+            country_id=country_ids.get((trle_user.country or "").lower()),
+            website_url=(
+                trle_user.homepage
+                if len(trle_user.homepage or "") <= 256
+                else None
+            ),
+        )
+
+    @staticmethod
+    def get_ids_by_name(
+        model: type, names: dict[str, str] | None = None
+    ) -> dict[str, int]:
+        """Map the lowercase TRLE names of a lookup model to primary keys."""
+        ids = {
+            name.lower(): pk
+            for pk, name in model.objects.values_list("pk", "name")
+        }
+        if names is None:
+            return ids
+        return {
+            trle_name: ids[name.lower()]
+            for trle_name, name in names.items()
+            if name.lower() in ids
+        }
+
+    def import_levels(self, trle_levels: list[TRLELevel]) -> None:
+        engine_ids = self.get_ids_by_name(Engine)
+        difficulty_ids = self.get_ids_by_name(
+            LevelDifficulty, TRLE_DIFFICULTIES
+        )
+        duration_ids = self.get_ids_by_name(LevelDuration, TRLE_DURATIONS)
+
+        existing_ids: dict[int, int] = {}
+        for trle_id, pk in (
+            Level.objects.filter(
+                trle_id__in=[trle_level.level_id for trle_level in trle_levels]
+            )
+            .order_by("pk")
+            .values_list("trle_id", "pk")
+        ):
+            existing_ids.setdefault(trle_id, pk)
+
+        new_levels: list[tuple[Level, TRLELevel]] = []
+        existing_levels: list[tuple[Level, TRLELevel]] = []
+        for trle_level in trle_levels:
+            engine_id = engine_ids.get(trle_level.file_type.lower())
+            if engine_id is None:
+                logger.warning(
+                    "Skipping TRLE level %d: unknown engine %s",
+                    trle_level.level_id,
+                    trle_level.file_type,
+                )
+                self.stats.levels_skipped += 1
+                continue
+            level = Level(
+                pk=existing_ids.get(trle_level.level_id),
+                name=trle_level.title[:100],
+                description=trle_level.synopsis,
+                engine_id=engine_id,
+                difficulty_id=difficulty_ids.get(
+                    (trle_level.difficulty or "").lower()
+                ),
+                duration_id=duration_ids.get(
+                    (trle_level.duration or "").lower()
+                ),
+                trle_id=trle_level.level_id,
+                is_approved=True,
+                is_pending_approval=False,
+            )
+            if level.pk:
+                existing_levels.append((level, trle_level))
+            else:
+                new_levels.append((level, trle_level))
+
+        Level.objects.bulk_update(
+            [level for level, _trle_level in existing_levels],
+            ["name", "description", "engine", "difficulty", "duration"],
+            batch_size=self.chunk_size,
+        )
+        Level.objects.bulk_create(
+            [level for level, _trle_level in new_levels],
+            batch_size=self.chunk_size,
+        )
+        # creation dates are always set to now by bulk_create
+        dated_levels = []
+        for level, trle_level in new_levels:
+            if trle_level.release_date:
+                level.created = to_datetime(trle_level.release_date)
+                dated_levels.append(level)
+        Level.objects.bulk_update(
+            dated_levels, ["created"], batch_size=self.chunk_size
+        )
+        self.stats.levels_created += len(new_levels)
+        self.stats.levels_updated += len(existing_levels)
+
+        imported = existing_levels + new_levels
+        for level, trle_level in imported:
+            self.level_ids[trle_level.level_id] = level.pk
+
+        self.import_level_authors(imported)
+        self.import_level_tags(imported)
+        self.import_level_files(imported)
+        self.import_level_links(imported)
+        self.import_level_reviews(imported)
+
+    def import_level_authors(
+        self, imported: list[tuple[Level, TRLELevel]]
+    ) -> None:
+        through = Level.authors.through
+        through.objects.bulk_create(
+            [
+                through(level_id=level.pk, user_id=user_id)
+                for level, trle_level in imported
+                for author_id in trle_level.author_ids
+                if (user_id := self.author_user_ids.get(author_id))
+            ],
+            ignore_conflicts=True,
+            batch_size=self.chunk_size,
+        )
+
+    def import_level_tags(
+        self, imported: list[tuple[Level, TRLELevel]]
+    ) -> None:
+        names = {
+            trle_level.category.lower(): trle_level.category
+            for _level, trle_level in imported
+            if trle_level.category
+        }
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in names.values()],
+            ignore_conflicts=True,
+        )
+        tag_ids = {
+            name: pk
+            for pk, name in Tag.objects.annotate(name_lower=Lower("name"))
+            .filter(name_lower__in=names)
+            .values_list("pk", "name_lower")
+        }
+        through = Level.tags.through
+        through.objects.bulk_create(
+            [
+                through(
+                    level_id=level.pk,
+                    tag_id=tag_ids[trle_level.category.lower()],
+                )
+                for level, trle_level in imported
+                if trle_level.category
+            ],
+            ignore_conflicts=True,
+            batch_size=self.chunk_size,
+        )
+
+    def import_level_files(
+        self, imported: list[tuple[Level, TRLELevel]]
+    ) -> None:
+        # the file itself stays on TRLE; the row carries its download count.
+        # levels with uploaded files count their own downloads, so leave
+        # them alone.
+        level_ids = [level.pk for level, _trle_level in imported]
+        uploaded_level_ids = set(
+            LevelFile.objects.filter(
+                level_id__in=level_ids, file__isnull=False
+            ).values_list("level_id", flat=True)
+        )
+        LevelFile.objects.bulk_create(
+            [
+                LevelFile(
+                    level_id=level.pk,
+                    version=1,
+                    download_count=trle_level.downloads,
+                )
+                for level, trle_level in imported
+                if level.pk not in uploaded_level_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["level", "version"],
+            update_fields=["download_count"],
+            batch_size=self.chunk_size,
+        )
+
+    def import_level_links(
+        self, imported: list[tuple[Level, TRLELevel]]
+    ) -> None:
+        links = []
+        for level, trle_level in imported:
+            urls = [(trle_level.website_url, LevelLinkType.MAIN)] + [
+                (url, LevelLinkType.SHOWCASE)
+                for url in trle_level.showcase_urls
+            ]
+            links.extend(
+                LevelExternalLink(
+                    level_id=level.pk,
+                    url=url,
+                    position=position,
+                    link_type=link_type,
+                )
+                for position, (url, link_type) in enumerate(
+                    (url, link_type)
+                    for url, link_type in urls
+                    if url and len(url) <= 256
+                )
+            )
+        LevelExternalLink.objects.bulk_create(
+            links, ignore_conflicts=True, batch_size=self.chunk_size
+        )
+
+    def import_level_reviews(
+        self, imported: list[tuple[Level, TRLELevel]]
+    ) -> None:
+        ratings: dict[tuple[int, int], Rating] = {}
+        reviews: dict[tuple[int, int], Review] = {}
+        dates: dict[tuple[int, int], datetime | None] = {}
+        for level, trle_level in imported:
+            trle_reviews = sorted(
+                trle_level.reviews,
+                key=lambda review: review.publication_date or date.max,
+            )
+            for position, trle_review in enumerate(trle_reviews, 1):
+                user_id = self.reviewer_user_ids.get(trle_review.reviewer_id)
+                if user_id is None:
+                    self.stats.reviews_skipped += 1
+                    continue
+                key = (level.pk, user_id)
+                dates[key] = to_datetime(trle_review.publication_date)
+                ratings[key] = Rating(
+                    level_id=level.pk,
+                    author_id=user_id,
+                    position=position,
+                    rating_type=RatingType.TRLE,
+                    trle_score_gameplay=trle_review.rating_gameplay,
+                    trle_score_enemies=trle_review.rating_enemies,
+                    trle_score_atmosphere=trle_review.rating_atmosphere,
+                    trle_score_lighting=trle_review.rating_lighting,
+                )
+                if trle_review.text:
+                    reviews[key] = Review(
+                        level_id=level.pk,
+                        author_id=user_id,
+                        position=position,
+                        review_type=ReviewType.TRLE,
+                        text=trle_review.text,
+                    )
+
+        # never overwrite ratings and reviews posted on TRCustoms
+        level_ids = [level.pk for level, _trle_level in imported]
+        for key in (
+            Rating.objects.filter(level_id__in=level_ids)
+            .exclude(rating_type=RatingType.TRLE)
+            .values_list("level_id", "author_id")
+        ):
+            ratings.pop(key, None)
+        for key in (
+            Review.objects.filter(level_id__in=level_ids)
+            .exclude(review_type=ReviewType.TRLE)
+            .values_list("level_id", "author_id")
+        ):
+            reviews.pop(key, None)
+
+        Rating.objects.bulk_create(
+            ratings.values(),
+            update_conflicts=True,
+            unique_fields=["level", "author"],
+            update_fields=[
+                "trle_score_gameplay",
+                "trle_score_enemies",
+                "trle_score_atmosphere",
+                "trle_score_lighting",
+            ],
+            batch_size=self.chunk_size,
+        )
+        Review.objects.bulk_create(
+            reviews.values(),
+            update_conflicts=True,
+            unique_fields=["level", "author"],
+            update_fields=["text"],
+            batch_size=self.chunk_size,
+        )
+        self.stats.ratings += len(ratings)
+        self.stats.reviews += len(reviews)
+
+        # upserted rows come back without primary keys, and with their
+        # creation dates set to now
+        for model, upserted in [(Rating, ratings), (Review, reviews)]:
+            objs = []
+            for pk, level_id, author_id in model.objects.filter(
+                level_id__in=level_ids
+            ).values_list("pk", "level_id", "author_id"):
+                key = (level_id, author_id)
+                if key in upserted and (created := dates.get(key)):
+                    objs.append(model(pk=pk, created=created))
+            model.objects.bulk_update(
+                objs, ["created"], batch_size=self.chunk_size
+            )
+        self.update_positions(level_ids)
+
+    def update_positions(self, level_ids: list[int]) -> None:
+        """Number the ratings and reviews of each level by creation date.
+
+        Matches what the deletion signals do, now that the TRLE rows are
+        mixed in with the ones posted on TRCustoms.
+        """
+        for model in [Rating, Review]:
+            rows = (
+                model.objects.filter(level_id__in=level_ids)
+                .order_by("level_id", "created", "pk")
+                .values_list("level_id", "pk", "position")
+            )
+            objs = [
+                model(pk=pk, position=position)
+                for _level_id, level_rows in groupby(rows, key=itemgetter(0))
+                for position, (_, pk, old_position) in enumerate(level_rows, 1)
+                if position != old_position
+            ]
+            model.objects.bulk_update(
+                objs, ["position"], batch_size=self.chunk_size
+            )
+
+    def update_denormalized_fields(self) -> None:
+        levels = Level.objects.filter(pk__in=self.level_ids.values())
+        ratings = Rating.objects.filter(level__in=levels)
+        update_rating_scores(ratings)
+        update_level_denormalized_fields(levels)
+        update_user_denormalized_fields(
+            User.objects.filter(
+                pk__in=set(self.author_user_ids.values())
+                | set(self.reviewer_user_ids.values())
+            )
+        )
+
+        changed_ratings = []
+        for rating in ratings.only("pk", "score", "rating_class").iterator():
+            rating_class = get_object_rating_class(rating)
+            rating_class_id = rating_class.pk if rating_class else None
+            if rating_class_id != rating.rating_class_id:
+                rating.rating_class_id = rating_class_id
+                changed_ratings.append(rating)
+        Rating.objects.bulk_update(
+            changed_ratings, ["rating_class"], batch_size=self.chunk_size
+        )
+
+        changed_levels = []
+        for level in levels.only(
+            "pk", "rating_count", "rating_score_sum", "rating_class"
+        ).iterator():
+            rating_class = get_level_rating_class(level)
+            rating_class_id = rating_class.pk if rating_class else None
+            if rating_class_id != level.rating_class_id:
+                level.rating_class_id = rating_class_id
+                changed_levels.append(level)
+        Level.objects.bulk_update(
+            changed_levels, ["rating_class"], batch_size=self.chunk_size
+        )
+
+        # also recounts the levels of each rating class
+        update_site_stats()
@@ -1,64 +1,104 @@
+import hashlib
 import html
 import logging
 import re
+import sqlite3
 import tempfile
-from collections.abc import Iterable
+import threading
+import time
+from collections.abc import Callable, Iterable
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
-from datetime import date
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
 from decimal import Decimal
+from functools import cache
 from pathlib import Path
-from typing import IO
-from urllib.parse import urljoin
+from typing import IO, TypeVar
+from urllib.parse import urljoin, urlparse
 
 import dateutil.parser
+import lxml.etree
 import lxml.html
 import requests
 import urllib3
+from lxml.cssselect import CSSSelector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from trcustoms.markdown import html_to_markdown
 
 logger = logging.getLogger(__name__)
 
+TRLE_URL = "https://www.trle.net/"
+RETRY_STATUSES = [429, 500, 502, 503, 504]
 
-def strip_tags(value: str) -> str:
-    return re.sub(r"<[^>]*?>", "", value)
+T = TypeVar("T")
 
 
-def get_outer_html(node) -> str:
-    return lxml.html.tostring(node, encoding=str).strip()
+TAG_RE = re.compile(r"<[^>]*?>")
+NUMBER_RE = re.compile(r"\d+")
+# <br/>, optionally followed by a bullet, carriage returns and the opening
+# and closing tag of the serialized node. A carriage return right before
+# <br/> is swallowed, the same way "\r" + "\n" used to be.
+INNER_HTML_MARKUP_RE = re.compile(r"\r?<br/?>(\s*-)?|\r\n?|^<[^>]+>|</[^>]+>$")
+# whitespace containing line breaks, or repeated spaces
+INNER_HTML_WHITESPACE_RE = re.compile(r"[ \n]*\n[ \n]*(?=(-?))|  +")
+YOUTUBE_URL_RE = re.compile(
+    r"https?://(?:www\.)?"
+    r"(?:youtube\.com|youtu\.be)/"
+    r"(?:v/|/u/\w/|embed/|watch\?)?"
+    r"\??(?:v=)?"
+    r"([^#&?]*).*"
+)
+BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n+")
+REVIEW_ANCHOR_RE = re.compile(r"<a name[^>]*></a>")
+REVIEW_ANCHOR_XPATH = lxml.etree.XPath("descendant-or-self::a[@name = $name]")
 
 
-def get_inner_html(node) -> str:
-    ret = get_outer_html(node)
-    ret = ret.strip()
+@cache
+def get_selector(expr: str) -> CSSSelector:
+    return CSSSelector(expr, translator="html")
 
-    # condense <br/> followed by a bullet
-    ret = re.sub(r"<br/?>\s*-", "\n-", ret, flags=re.M)
 
-    # expand raw <br/>
-    ret = re.sub(r"<br/?>", "\n", ret)
+def select(node, expr: str) -> list:
+    """Same as `node.cssselect(expr)`, without translating the selector to
+    XPath on every call.
+    """
+    return get_selector(expr)(node)
 
-    # strip HTML tags
-    ret = re.sub(r"^<[^>]+>|<\/[^>]+>$", "", ret)
 
-    # fix carriage returns
-    ret = ret.replace("\r\n", "\n")
-    ret = ret.replace("\r", "\n")
+def strip_tags(value: str) -> str:
+    return TAG_RE.sub("", value)
 
-    # fix whitespace around line breaks
-    ret = re.sub(r" +\n", "\n", ret, flags=re.M)
-    ret = re.sub(r"\n +", "\n", ret, flags=re.M)
 
-    # merge lines that are not separated by a blank line
-    ret = re.sub(r"(?<!\n)\n(?![-\n])", " ", ret, flags=re.M)
+def get_outer_html(node) -> str:
+    return lxml.html.tostring(node, encoding=str).strip()
 
-    # condense spaces
-    ret = re.sub("  +", " ", ret)
-    ret = re.sub(r"\n\n\n+", r"\n\n", ret, flags=re.M)
 
-    ret = ret.strip()
-    return ret
+def replace_inner_html_markup(match: re.Match) -> str:
+    if match.group(0).lstrip("\r").startswith("<br"):
+        # condense <br/> followed by a bullet
+        return "\n-" if match.group(1) is not None else "\n"
+    if match.group(0).startswith("\r"):
+        return "\n"
+    return ""
+
+
+def replace_inner_html_whitespace(match: re.Match) -> str:
+    if (newlines := match.group(0).count("\n")) >= 2:
+        return "\n\n"
+    if newlines:
+        # merge lines that are not separated by a blank line, unless the
+        # next one is a bullet
+        return "\n" if match.group(1) else " "
+    return " "
+
+
+def get_inner_html(node) -> str:
+    ret = get_outer_html(node)
+    ret = INNER_HTML_MARKUP_RE.sub(replace_inner_html_markup, ret)
+    ret = INNER_HTML_WHITESPACE_RE.sub(replace_inner_html_whitespace, ret)
+    return ret.strip()
 
 
 def get_text(node) -> str:
@@ -69,10 +109,25 @@ def unescape(text: str | None) -> str:
     return html.unescape(text or "")
 
 
+@cache
+def get_html_parser(encoding: str | None) -> lxml.html.HTMLParser:
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
 def get_document_from_response(
     response: requests.Response,
 ) -> lxml.html.HtmlElement:
-    return lxml.html.fromstring(response.text.encode())
+    # let lxml decode the bytes. requests falls back to ISO-8859-1 for text
+    # responses whose Content-Type has no charset, so only pass an encoding
+    # that was actually sent; otherwise lxml looks for a meta charset in
+    # the document itself
+    encoding = response.encoding
+    content_type = response.headers.get("Content-Type")
+    if content_type is not None and "charset" not in content_type.lower():
+        encoding = None
+    return lxml.html.fromstring(
+        response.content, parser=get_html_parser(encoding)
+    )
 
 
 @dataclass
@@ -97,11 +152,13 @@ class TRLEUser:
 
 @dataclass
 class TRLEReviewer(TRLEUser):
+    reviewer_id: int
     level_ids: list[int]
 
 
 @dataclass
 class TRLEAuthor(TRLEUser):
+    author_id: int
     level_ids: list[int]
 
 
@@ -139,32 +196,249 @@ class TRLELevel:
     showcase_urls: list[str]
 
 
+class RateLimiter:
+    """Space out the requests made to the same host by all threads."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_request_time: dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if self.interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_time.get(host, now))
+            self.next_request_time[host] = request_time + self.interval
+        time.sleep(request_time - now)
+
+
+class CrawlCheckpoint:
+    """Ids of the items crawled so far, appended to a text file as they
+    complete so that an interrupted crawl can skip them when resumed.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.done: set[int] = set()
+        if path.exists():
+            self.done = {int(line) for line in path.read_text().split()}
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def add(self, item_id: int) -> None:
+        with self.lock:
+            if item_id in self.done:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as handle:
+                handle.write(f"{item_id}\n")
+            self.done.add(item_id)
+
+
+def get_content_hash(response: requests.Response) -> str:
+    return hashlib.sha256(response.content).hexdigest()
+
+
+@dataclass
+class PageCacheStats:
+    fresh: int = 0
+    revalidated: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    new: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.fresh + self.revalidated
+
+    @property
+    def misses(self) -> int:
+        return self.unchanged + self.changed + self.new
+
+    def __str__(self) -> str:
+        counts = ", ".join(
+            f"{field.name} {getattr(self, field.name)}"
+            for field in fields(self)
+        )
+        return f"{self.hits} hits, {self.misses} misses ({counts})"
+
+
+class PageCache:
+    """Persistent cache of TRLE pages kept in an SQLite database.
+
+    Pages younger than `max_age` are served without a request. Older pages
+    are revalidated with a conditional GET when the server sent an ETag or
+    a Last-Modified header; most TRLE pages come without either, in which
+    case the content hash tells whether a downloaded page has changed.
+    """
+
+    def __init__(self, path: Path, max_age: timedelta | None = None) -> None:
+        self.max_age = max_age
+        self.stats = PageCacheStats()
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, "
+                "etag TEXT, "
+                "last_modified TEXT, "
+                "content_hash TEXT NOT NULL, "
+                "encoding TEXT, "
+                "content BLOB NOT NULL, "
+                "fetched_at REAL NOT NULL)"
+            )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get(
+        self, url: str, fetch: Callable[..., requests.Response]
+    ) -> requests.Response:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified, content_hash, encoding, "
+                "fetched_at FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+        if row is None:
+            response = fetch(url)
+            if response.status_code == 200:
+                self._count("new")
+                self._store(url, response, get_content_hash(response))
+            return response
+
+        etag, last_modified, content_hash, encoding, fetched_at = row
+        if (
+            self.max_age is not None
+            and time.time() - fetched_at < self.max_age.total_seconds()
+        ):
+            self._count("fresh")
+            return self._load(url, encoding)
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = fetch(url, headers=headers or None)
+
+        if response.status_code == 304:
+            self._count("revalidated")
+            self._touch(url)
+            return self._load(url, encoding)
+        if response.status_code != 200:
+            return response
+        if (new_content_hash := get_content_hash(response)) == content_hash:
+            self._count("unchanged")
+            self._touch(url)
+        else:
+            self._count("changed")
+            self._store(url, response, new_content_hash)
+        return response
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _load(self, url: str, encoding: str | None) -> requests.Response:
+        with self.lock:
+            (content,) = self.connection.execute(
+                "SELECT content FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.encoding = encoding
+        response._content = content
+        return response
+
+    def _store(
+        self, url: str, response: requests.Response, content_hash: str
+    ) -> None:
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    content_hash,
+                    response.encoding,
+                    response.content,
+                    time.time(),
+                ),
+            )
+
+    def _touch(self, url: str) -> None:
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?",
+                (time.time(), url),
+            )
+
+
 class TRLEScraper:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        base_url: str = TRLE_URL,
+        rate_limiter: RateLimiter | None = None,
+        page_cache: PageCache | None = None,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        pool_size: int = 10,
+    ) -> None:
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.page_cache = page_cache
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=["HEAD", "GET"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_url(self, path: str) -> str:
+        return urljoin(self.base_url, path)
 
     def fetch_reviewer(self, reviewer_id: int) -> TRLEReviewer | None:
         doc = self.get_document(
-            f"https://www.trle.net/sc/reviewerfeatures.php?rid={reviewer_id}",
+            self.get_url(f"sc/reviewerfeatures.php?rid={reviewer_id}"),
         )
 
         level_ids = [
             int(match.group(0))
-            for node in doc.cssselect(".medGText a[href*='reviews']")
-            if (match := re.search(r"\d+", node.get("href")))
+            for node in select(doc, ".medGText a[href*='reviews']")
+            if (match := NUMBER_RE.search(node.get("href")))
         ]
-        image_url = urljoin(
-            "https://trle.net/",
-            doc.cssselect(".navText img")[0].get("src").replace(" ", "%20"),
+        image_url = self.get_url(
+            select(doc, ".navText img")[0].get("src").replace(" ", "%20"),
         )
-        nickname = unescape(doc.cssselect(".subHeader a")[0].text)
+        nickname = unescape(select(doc, ".subHeader a")[0].text)
         if not nickname:
             return None
 
         texts = [
-            get_text(node)
-            for node in doc.cssselect(".bodyText:not([colspan])")
+            get_text(node) for node in select(doc, ".bodyText:not([colspan])")
         ]
         attrs = {
             texts[i].rstrip(":"): unescape(texts[i + 1])
@@ -175,6 +449,7 @@ class TRLEScraper:
         country, city = country_city.split("/")
 
         return TRLEReviewer(
+            reviewer_id=reviewer_id,
             nickname=nickname,
             full_name=attrs["name"] or None,
             image_url=image_url,
@@ -194,25 +469,23 @@ class TRLEScraper:
 
     def fetch_author(self, author_id: int) -> TRLEAuthor | None:
         doc = self.get_document(
-            f"https://trle.net/sc/authorfeatures.php?aid={author_id}",
+            self.get_url(f"sc/authorfeatures.php?aid={author_id}"),
         )
 
         level_ids = [
             int(match.group(0))
-            for node in doc.cssselect(".medGText a[href*='levelfeatures']")
-            if (match := re.search(r"\d+", node.get("href")))
+            for node in select(doc, ".medGText a[href*='levelfeatures']")
+            if (match := NUMBER_RE.search(node.get("href")))
         ]
-        image_url = urljoin(
-            "https://trle.net/",
-            doc.cssselect(".navText img")[0].get("src").replace(" ", "%20"),
+        image_url = self.get_url(
+            select(doc, ".navText img")[0].get("src").replace(" ", "%20"),
         )
-        nickname = unescape(doc.cssselect(".subHeader a")[0].text)
+        nickname = unescape(select(doc, ".subHeader a")[0].text)
         if not nickname:
             return None
 
         texts = [
-            get_text(node)
-            for node in doc.cssselect(".bodyText:not([colspan])")
+            get_text(node) for node in select(doc, ".bodyText:not([colspan])")
         ]
         attrs = {
             texts[i].rstrip(":"): unescape(texts[i + 1])
@@ -223,6 +496,7 @@ class TRLEScraper:
         country, city = country_city.split("/")
 
         return TRLEAuthor(
+            author_id=author_id,
             nickname=nickname,
             full_name=attrs["name"] or None,
             image_url=image_url,
@@ -242,37 +516,38 @@ class TRLEScraper:
 
     def fetch_level(self, level_id: int) -> TRLELevel | None:
         doc = self.get_document(
-            f"https://trle.net/sc/levelfeatures.php?lid={level_id}"
+            self.get_url(f"sc/levelfeatures.php?lid={level_id}")
         )
 
         author_ids = [
             int(match.group(0))
-            for node in doc.cssselect(
-                ".subHeader.Stil2 a[href*='authorfeatures']"
+            for node in select(
+                doc, ".subHeader.Stil2 a[href*='authorfeatures']"
             )
-            if (match := re.search(r"\d+", node.get("href")))
+            if (match := NUMBER_RE.search(node.get("href")))
         ]
 
         if not author_ids:
             return None
 
-        title = get_text(doc.cssselect(".subHeader.Stil2")[0]).split("\n")[0]
+        title = get_text(select(doc, ".subHeader.Stil2")[0]).split("\n")[0]
         synopsis = html_to_markdown(
-            get_inner_html(doc.cssselect("tr:nth-child(5) .medGText")[0])
+            get_inner_html(select(doc, "tr:nth-child(5) .medGText")[0])
         )
 
-        main_image_url = urljoin(
-            "https://trle.net/", doc.cssselect(".navText img")[0].get("src")
+        main_image_url = self.get_url(
+            select(doc, ".navText img")[0].get("src")
         )
         screenshot_urls = [
-            urljoin("https://trle.net/", node.getparent().get("href"))
-            for node in doc.cssselect("a>img[src*='screens']")
+            self.get_url(node.getparent().get("href"))
+            for node in select(doc, "a>img[src*='screens']")
         ]
 
         texts = [
             strip_tags(lxml.html.tostring(node).decode()).strip()
-            for node in doc.cssselect(
-                "table.bodyText td.bodyText:not(:first-child):not([colspan])"
+            for node in select(
+                doc,
+                "table.bodyText td.bodyText:not(:first-child):not([colspan])",
             )
         ]
         attrs = {
@@ -280,13 +555,13 @@ class TRLEScraper:
             for i in range(0, len(texts), 2)
         }
 
-        download_url = f"https://www.trle.net/scadm/trle_dl.php?lid={level_id}"
+        download_url = self.get_url(f"scadm/trle_dl.php?lid={level_id}")
         website_url = self.get_url_redirect(download_url)
         if website_url is not None and website_url.startswith(
-            "https://www.trle.net/sc/levelsfeatures"
+            self.get_url("sc/levelsfeatures")
         ):
             website_url = None
-        if website_url.endswith(".zip"):
+        if website_url is not None and website_url.endswith(".zip"):
             website_url = None
 
         showcase_urls: list[str] = []
@@ -296,17 +571,9 @@ class TRLEScraper:
                 showcase_urls.append(url)
             return ""
 
-        synopsis = re.sub(
-            r"https?://(?:www\.)?"
-            r"(?:youtube\.com|youtu\.be)/"
-            r"(?:v/|/u/\w/|embed/|watch\?)?"
-            r"\??(?:v=)?"
-            r"([^#&?]*).*",
-            process_yt_links,
-            synopsis,
-        )
+        synopsis = YOUTUBE_URL_RE.sub(process_yt_links, synopsis)
         synopsis = synopsis.strip()
-        synopsis = re.sub(r"\n\s*\n\s*\n+", "\n\n", synopsis, flags=re.M)
+        synopsis = BLANK_LINES_RE.sub("\n\n", synopsis)
 
         return TRLELevel(
             level_id=level_id,
@@ -338,38 +605,35 @@ class TRLEScraper:
     ) -> TRLELevelWalkthrough | None:
         try:
             content = self.get_raw_document(
-                f"https://www.trle.net/walk/{level_id}.htm"
+                self.get_url(f"walk/{level_id}.htm")
             )
         except requests.exceptions.RequestException:
             return None
         return TRLELevelWalkthrough(level_id=level_id, content=content)
 
     def fetch_level_reviews(self, level_id: int) -> Iterable[TRLELevelReview]:
-        doc = self.get_document(
-            f"https://trle.net/sc/reviews.php?lid={level_id}"
-        )
+        doc = self.get_document(self.get_url(f"sc/reviews.php?lid={level_id}"))
 
-        for row_node in doc.cssselect(
-            ".FindTable tr:not(:first-child):not(:last-child)"
+        for row_node in select(
+            doc, ".FindTable tr:not(:first-child):not(:last-child)"
         ):
-            match = re.search(
-                r"\d+", row_node.cssselect(".medGText a")[0].get("href")
+            match = NUMBER_RE.search(
+                select(row_node, ".medGText a")[0].get("href")
             )
             assert match
             reviewer_id = int(match.group(0))
 
-            reviewer_name = row_node.cssselect(".medGText a")[0].text
+            reviewer_name = select(row_node, ".medGText a")[0].text
             ratings = [
                 int(get_text(node))
-                for node in row_node.cssselect("td[align='center']")
+                for node in select(row_node, "td[align='center']")
             ]
 
-            try:
-                text_node = doc.cssselect(f"a[name='{reviewer_name}']")[
-                    0
-                ].getparent()
-            except IndexError:
-                text_node = None
+            text_node = None
+            if reviewer_name and (
+                anchors := REVIEW_ANCHOR_XPATH(doc, name=reviewer_name)
+            ):
+                text_node = anchors[0].getparent()
 
             text = get_inner_html(text_node) if text_node is not None else ""
             text = re.sub(
@@ -377,14 +641,14 @@ class TRLEScraper:
                 "",
                 text,
             )
-            text = re.sub(r"<a name[^>]*><\/a>", "", text)
-            text = re.sub('^"', "", text)
+            text = REVIEW_ANCHOR_RE.sub("", text)
+            text = text.removeprefix('"')
             # text = " ".join(text.splitlines())
             text = html_to_markdown(text)
 
             publication_date: date | None = None
             if text_node is not None and len(
-                node := text_node.cssselect("small")
+                node := select(text_node, "small")
             ):
                 publication_date = dateutil.parser.parse(
                     node[0].text.lstrip("(").rstrip(")")
@@ -402,39 +666,44 @@ class TRLEScraper:
             )
 
     def fetch_all_author_ids(self) -> Iterable[int]:
-        doc = self.get_document("https://www.trle.net/sc/bGalleryWorld.php")
+        doc = self.get_document(self.get_url("sc/bGalleryWorld.php"))
 
         country_urls: set[str] = set()
-        for node in doc.cssselect("a[href*='bGalleryCountry.php']"):
-            country_url = urljoin("https://trle.net/", node.get("href"))
+        for node in select(doc, "a[href*='bGalleryCountry.php']"):
+            country_url = self.get_url(node.get("href"))
             country_urls.add(country_url)
 
         for country_url in country_urls:
             doc = self.get_document(country_url)
-            for node in doc.cssselect("a[href*='authorfeatures']"):
-                if match := re.search(r"\d+", node.get("href")):
+            for node in select(doc, "a[href*='authorfeatures']"):
+                if match := NUMBER_RE.search(node.get("href")):
                     author_id = int(match.group(0))
                     yield author_id
 
     def fetch_all_level_ids(self) -> Iterable[int]:
-        doc = self.get_document("https://www.trle.net/rPost.php")
-        for node in doc.cssselect("[name='lid'] option"):
+        doc = self.get_document(self.get_url("rPost.php"))
+        for node in select(doc, "[name='lid'] option"):
             if value := node.get("value"):
                 level_id = int(value)
                 yield level_id
 
     def fetch_all_reviewer_ids(self) -> Iterable[int]:
-        doc = self.get_document("https://www.trle.net/rPost.php")
-        for node in doc.cssselect("[name='rid'] option"):
+        doc = self.get_document(self.get_url("rPost.php"))
+        for node in select(doc, "[name='rid'] option"):
             if value := node.get("value"):
                 reviewer_id = int(value)
                 yield reviewer_id
 
     def get_document(self, url: str) -> lxml.html.HtmlElement:
-        return get_document_from_response(self._get(url))
+        return get_document_from_response(self.get_page(url))
 
     def get_raw_document(self, url: str) -> str:
-        return self._get(url).text
+        return self.get_page(url).text
+
+    def get_page(self, url: str) -> requests.Response:
+        if self.page_cache is None:
+            return self._get(url)
+        return self.page_cache.get(url, self._get)
 
     def get_size(self, url) -> int | None:
         response = self._head(url)
@@ -464,6 +733,8 @@ class TRLEScraper:
         headers: dict[str, str] | None = None,
     ) -> requests.Response:
         logger.debug("HEAD %s %s", url, headers)
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
         return self.session.head(
             url,
             timeout=30,
@@ -479,6 +750,8 @@ class TRLEScraper:
         headers: dict[str, str] | None = None,
     ) -> requests.Response:
         logger.debug("GET %s %s", url, headers)
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
         return self.session.get(
             url,
             timeout=30,
@@ -531,3 +804,50 @@ class TRLEScraper:
 
         assert file.tell() == file_size
         return result
+
+
+class TRLECrawler:
+    """Fetch many TRLE items at once with a bounded number of threads.
+
+    Every item is fetched by a single call such as `TRLEScraper.fetch_level`
+    and the scraper's rate limiter keeps the threads from flooding the
+    host. Items that fail are logged and left out of the checkpoint, so
+    they get retried when the crawl is run again.
+    """
+
+    def __init__(self, workers: int = 8) -> None:
+        self.workers = workers
+
+    def crawl(
+        self,
+        fetch: Callable[[int], T],
+        item_ids: Iterable[int],
+        checkpoint: CrawlCheckpoint | None = None,
+    ) -> Iterable[tuple[int, T]]:
+        """Yield the fetched items in the order they complete.
+
+        An item is added to the checkpoint only once the caller asks for
+        the next one, i.e. after it has been processed.
+        """
+        pending = [
+            item_id
+            for item_id in dict.fromkeys(item_ids)
+            if checkpoint is None or item_id not in checkpoint
+        ]
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            future_to_id = {
+                executor.submit(fetch, item_id): item_id for item_id in pending
+            }
+            for future in as_completed(future_to_id):
+                item_id = future_to_id[future]
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception("Failed to fetch item %d", item_id)
+                    continue
+                yield item_id, result
+                if checkpoint is not None:
+                    checkpoint.add(item_id)
+        finally:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,63 @@
+import hashlib
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from trcustoms.uploads.models import UploadedFile
+from trcustoms.uploads.storage import S3StagedUploadedFile
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """Hash uploaded files while they are being received and write them
+    straight to where the storage of uploaded files can take them over.
+
+    With S3 the file goes to a staging object that the storage copies into
+    place, and otherwise to a temporary file that the storage moves into
+    place. Either way the content is not read again to be saved, and its
+    MD5 is available as the `md5sum` attribute of the uploaded file.
+    """
+
+    def __init__(self, request=None, storage=None) -> None:
+        super().__init__(request)
+        self.storage = (
+            storage or UploadedFile._meta.get_field("content").storage
+        )
+        self.file = None
+        self.md5 = None
+
+    def new_file(self, *args, **kwargs) -> None:
+        super().new_file(*args, **kwargs)
+        self.md5 = hashlib.md5()
+        if isinstance(self.storage, S3Boto3Storage):
+            self.file = S3StagedUploadedFile(
+                self.storage,
+                self.file_name,
+                self.content_type,
+                self.charset,
+                self.content_type_extra,
+            )
+        else:
+            self.file = TemporaryUploadedFile(
+                self.file_name,
+                self.content_type,
+                0,
+                self.charset,
+                self.content_type_extra,
+            )
+
+    def receive_data_chunk(self, raw_data, start) -> None:
+        self.md5.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.md5sum = self.md5.hexdigest()
+        self.file.size = file_size
+        if isinstance(self.file, S3StagedUploadedFile):
+            return self.file.complete()
+        self.file.seek(0)
+        return self.file
+
+    def upload_interrupted(self) -> None:
+        if self.file is not None:
+            self.file.close()
@@ -9,10 +9,14 @@ from trcustoms.uploads.models import UploadedFile
 @receiver(pre_save, sender=UploadedFile)
 def update_uploaded_file_checksum_and_size(sender, instance, **kwargs):
     if instance.content:
-        md5 = hashlib.md5()
-        for chunk in instance.content.chunks():
-            md5.update(chunk)
-        instance.md5sum = md5.hexdigest()
+        # files received by StreamingUploadHandler are hashed on arrival
+        md5sum = getattr(instance.content._file, "md5sum", None)
+        if md5sum is None:
+            md5 = hashlib.md5()
+            for chunk in instance.content.chunks():
+                md5.update(chunk)
+            md5sum = md5.hexdigest()
+        instance.md5sum = md5sum
         instance.size = instance.content.size
     else:
         instance.md5sum = None
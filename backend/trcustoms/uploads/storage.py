@@ -1,13 +1,203 @@
+import uuid
+from functools import cache
+from io import BytesIO
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage, Storage
+from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+from trcustoms.uploads.consts import MEGABYTE
+
+S3_STAGING_DIRECTORY = "staging"
+S3_PART_SIZE = 8 * MEGABYTE
+
+
+class S3StagedUploadedFile(UploadedFile):
+    """A file written to a staging object of an S3 bucket while it is being
+    uploaded, using a multipart upload.
+
+    Saving it to a storage of the same bucket copies the object on the S3
+    side. The staging object is deleted when the file is closed, which
+    Django does at the end of the request.
+    """
+
+    def __init__(
+        self,
+        storage: S3Boto3Storage,
+        name: str,
+        content_type: str,
+        charset: str | None,
+        content_type_extra: dict | None = None,
+    ) -> None:
+        super().__init__(
+            None, name, content_type, 0, charset, content_type_extra
+        )
+        self.storage = storage
+        self.staging_name = f"{S3_STAGING_DIRECTORY}/{uuid.uuid4()}"
+        self.key = storage._normalize_name(clean_name(self.staging_name))
+        self.md5sum: str | None = None
+        self._file = None
+        self._buffer = bytearray()
+        self._parts: list[dict] = []
+        self._upload_id: str | None = None
+        self._is_staged = False
+
+    @property
+    def file(self):
+        if self._file is None and self._is_staged:
+            self._file = self.storage.open(self.staging_name)
+        return self._file
+
+    @file.setter
+    def file(self, value) -> None:
+        self._file = value
+
+    @property
+    def client(self) -> BaseClient:
+        return self.storage.connection.meta.client
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= S3_PART_SIZE:
+            self._upload_part()
+
+    def complete(self) -> UploadedFile:
+        """Finish the upload and return the uploaded file.
+
+        Files smaller than a single part never reach S3 here; they are
+        returned as in-memory files and saved to S3 in one request.
+        """
+        if self._upload_id is None:
+            memory_file = InMemoryUploadedFile(
+                BytesIO(self._buffer),
+                None,
+                self.name,
+                self.content_type,
+                self.size,
+                self.charset,
+                self.content_type_extra,
+            )
+            memory_file.md5sum = self.md5sum
+            return memory_file
+
+        if self._buffer:
+            self._upload_part()
+        self.client.complete_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+        self._upload_id = None
+        self._is_staged = True
+        return self
+
+    def close(self) -> None:
+        self._buffer.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.storage.bucket_name,
+                Key=self.key,
+                UploadId=self._upload_id,
+            )
+            self._upload_id = None
+        if self._is_staged:
+            self.storage.delete(self.staging_name)
+            self._is_staged = False
+
+    def _upload_part(self) -> None:
+        if self._upload_id is None:
+            self._upload_id = self.client.create_multipart_upload(
+                Bucket=self.storage.bucket_name,
+                Key=self.key,
+                ContentType=self.content_type,
+            )["UploadId"]
+        part_number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.storage.bucket_name,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buffer),
+        )
+        self._parts.append(
+            {"ETag": response["ETag"], "PartNumber": part_number}
+        )
+        self._buffer.clear()
 
 
 class S3MediaStorage(S3Boto3Storage):
     location = settings.AWS_MEDIA_LOCATION
 
+    def _save(self, name, content):
+        if not (
+            isinstance(content, S3StagedUploadedFile)
+            and content.storage.bucket_name == self.bucket_name
+        ):
+            return super()._save(name, content)
+
+        # single request copies are limited to 5 GB, which is well above
+        # the largest allowed upload
+        cleaned_name = clean_name(name)
+        name = self._normalize_name(cleaned_name)
+        self.connection.meta.client.copy_object(
+            Bucket=self.bucket_name,
+            Key=name,
+            CopySource={
+                "Bucket": content.storage.bucket_name,
+                "Key": content.key,
+            },
+            MetadataDirective="REPLACE",
+            **self._get_write_parameters(name, content),
+        )
+        return cleaned_name
+
 
 def get_user_upload_storage() -> type[Storage]:
     if settings.USE_AWS_STORAGE:
         return S3MediaStorage
     return FileSystemStorage
+
+
+@cache
+def get_s3_client() -> BaseClient:
+    """Return an S3 client shared by the whole process.
+
+    Building a client resolves the credentials and endpoint and loads the
+    botocore service model, which is too slow to do on every request.
+    Clients are thread-safe, unlike the default boto3 session, so the
+    client gets a session of its own.
+    """
+    return boto3.session.Session().client(
+        "s3",
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+        config=Config(
+            s3={"addressing_style": "path"},
+            signature_version="s3v4",
+            retries=dict(max_attempts=3),
+        ),
+    )
+
+
+def generate_presigned_url(
+    storage: S3Boto3Storage, name: str, expires_in: int, **parameters
+) -> str:
+    return get_s3_client().generate_presigned_url(
+        ClientMethod="get_object",
+        ExpiresIn=expires_in,
+        Params={
+            "Bucket": storage.bucket_name,
+            "Key": storage._normalize_name(clean_name(name)),
+            **parameters,
+        },
+    )
@@ -0,0 +1,138 @@
+import os
+from hashlib import md5
+from unittest.mock import patch
+
+import boto3
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from trcustoms.uploads.consts import MEGABYTE, UploadType
+from trcustoms.uploads.models import UploadedFile
+from trcustoms.uploads.storage import S3_PART_SIZE, S3MediaStorage
+
+
+def upload(
+    auth_api_client: APIClient, content: bytes, name: str = "level.zip"
+) -> dict:
+    return auth_api_client.post(
+        "/api/uploads/",
+        data={
+            "content": SimpleUploadedFile(
+                name, content, content_type="application/zip"
+            ),
+            "upload_type": UploadType.LEVEL_FILE,
+        },
+        format="multipart",
+    )
+
+
+@pytest.fixture(name="s3_storage")
+def fixture_s3_storage() -> S3MediaStorage:
+    moto = pytest.importorskip("moto")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with (
+        override_settings(
+            AWS_ACCESS_KEY_ID="key",
+            AWS_SECRET_ACCESS_KEY="secret",
+            AWS_S3_ENDPOINT_URL=None,
+        ),
+        moto.mock_aws(),
+    ):
+        boto3.client("s3").create_bucket(Bucket="bucket")
+        storage = S3MediaStorage(
+            bucket_name="bucket", access_key="key", secret_key="secret"
+        )
+        with patch.object(
+            UploadedFile._meta.get_field("content"), "storage", storage
+        ):
+            yield storage
+
+
+def get_bucket_keys(storage: S3MediaStorage) -> list[str]:
+    return sorted(obj.key for obj in storage.bucket.objects.all())
+
+
+@pytest.mark.django_db
+def test_upload_is_hashed_once(auth_api_client: APIClient) -> None:
+    content = os.urandom(3 * MEGABYTE)
+
+    with patch("trcustoms.uploads.signals.hashlib") as signals_hashlib:
+        response = upload(auth_api_client, content)
+
+    assert response.status_code == status.HTTP_200_OK, response.content
+    signals_hashlib.md5.assert_not_called()
+    uploaded_file = UploadedFile.objects.get(pk=response.data["id"])
+    assert uploaded_file.md5sum == md5(content).hexdigest()
+    assert uploaded_file.size == len(content)
+    assert uploaded_file.content.read() == content
+
+
+@pytest.mark.django_db
+def test_upload_to_s3_uses_multipart_upload(
+    auth_api_client: APIClient, s3_storage: S3MediaStorage
+) -> None:
+    content = os.urandom(S3_PART_SIZE + MEGABYTE)
+
+    with (
+        patch("trcustoms.uploads.signals.hashlib") as signals_hashlib,
+        patch.object(S3Boto3Storage, "_save") as upload_to_s3,
+    ):
+        response = upload(auth_api_client, content)
+
+    assert response.status_code == status.HTTP_200_OK, response.content
+    signals_hashlib.md5.assert_not_called()
+    upload_to_s3.assert_not_called()
+    uploaded_file = UploadedFile.objects.get(pk=response.data["id"])
+    assert uploaded_file.md5sum == md5(content).hexdigest()
+    assert uploaded_file.size == len(content)
+    assert get_bucket_keys(s3_storage) == [
+        f"media/{uploaded_file.content.name}"
+    ]
+    obj = s3_storage.bucket.Object(f"media/{uploaded_file.content.name}")
+    assert obj.get()["Body"].read() == content
+    assert obj.content_type == "application/zip"
+    assert obj.cache_control == "max-age=86400"
+
+
+@pytest.mark.django_db
+def test_small_upload_to_s3_skips_staging(
+    auth_api_client: APIClient, s3_storage: S3MediaStorage
+) -> None:
+    content = b"small level"
+
+    with patch.object(
+        s3_storage.connection.meta.client, "create_multipart_upload"
+    ) as create_multipart_upload:
+        response = upload(auth_api_client, content)
+
+    assert response.status_code == status.HTTP_200_OK, response.content
+    create_multipart_upload.assert_not_called()
+    uploaded_file = UploadedFile.objects.get(pk=response.data["id"])
+    assert uploaded_file.md5sum == md5(content).hexdigest()
+    assert uploaded_file.content.read() == content
+
+
+@pytest.mark.django_db
+def test_rejected_upload_to_s3_is_discarded(
+    auth_api_client: APIClient, s3_storage: S3MediaStorage
+) -> None:
+    content = os.urandom(S3_PART_SIZE + MEGABYTE)
+
+    response = auth_api_client.post(
+        "/api/uploads/",
+        data={
+            "content": SimpleUploadedFile(
+                "level.zip", content, content_type="application/zip"
+            ),
+            "upload_type": UploadType.USER_PICTURE,
+        },
+        format="multipart",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not UploadedFile.objects.exists()
+    assert get_bucket_keys(s3_storage) == []
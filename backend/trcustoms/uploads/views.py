@@ -10,6 +10,7 @@ from trcustoms.common.serializers import EmptySerializer
 from trcustoms.mixins import PermissionsMixin
 from trcustoms.tasks.convert_images import RECOMMENDED_SIZE, convert_image
 from trcustoms.uploads.consts import UploadType
+from trcustoms.uploads.handlers import StreamingUploadHandler
 from trcustoms.uploads.models import UploadedFile
 from trcustoms.uploads.serializers import UploadedFileDetailsSerializer
 from trcustoms.utils import stream_file_field
@@ -44,6 +45,10 @@ class UploadViewSet(PermissionsMixin, viewsets.GenericViewSet):
 
     parser_classes = [MultiPartParser]
 
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [StreamingUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     def create(self, request) -> Response:
         uploaded_file = UploadedFile(uploader=request.user)
         serializer = UploadedFileDetailsSerializer(
@@ -1,3 +1,4 @@
+from django.db.models import Count, QuerySet
 from django.utils import timezone
 from rest_framework.request import Request
 
@@ -7,13 +8,20 @@ from trcustoms.audit_logs.utils import (
     track_model_deletion,
     track_model_update,
 )
+from trcustoms.levels.models import Level
 from trcustoms.mails import (
     send_ban_mail,
     send_registration_rejection_mail,
     send_unban_mail,
     send_welcome_mail,
 )
+from trcustoms.playlists.models import PlaylistItem
+from trcustoms.ratings.models import Rating
+from trcustoms.reviews.models import Review
 from trcustoms.users.models import User
+from trcustoms.utils import aggregate_subquery, update_denormalized_field
+from trcustoms.walkthroughs.consts import WalkthroughStatus
+from trcustoms.walkthroughs.models import Walkthrough
 
 
 def activate_user(user: User, request: Request | None) -> None:
@@ -137,3 +145,57 @@ def confirm_user_email(user: User, request: Request | None) -> None:
             notify=True,
         ):
             pass
+
+
+def update_user_denormalized_fields(
+    queryset: QuerySet | None = None,
+) -> dict[str, int]:
+    """Set-based counterpart of the User.update_* methods.
+
+    Recalculates each field for all users in the queryset with a single
+    UPDATE. Returns the number of changed users for each field.
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+
+    authorships = Level.authors.through.objects.all()
+    values = {
+        "authored_level_count_all": aggregate_subquery(
+            authorships, "user", Count("*"), 0
+        ),
+        "authored_level_count_approved": aggregate_subquery(
+            authorships.filter(level__is_approved=True),
+            "user",
+            Count("*"),
+            0,
+        ),
+        "rated_level_count": aggregate_subquery(
+            Rating.objects.filter(level__is_approved=True),
+            "author",
+            Count("*"),
+            0,
+        ),
+        "reviewed_level_count": aggregate_subquery(
+            Review.objects.filter(level__is_approved=True),
+            "author",
+            Count("*"),
+            0,
+        ),
+        "authored_walkthrough_count_all": aggregate_subquery(
+            Walkthrough.objects.all(), "author", Count("*"), 0
+        ),
+        "authored_walkthrough_count_approved": aggregate_subquery(
+            Walkthrough.objects.filter(status=WalkthroughStatus.APPROVED),
+            "author",
+            Count("*"),
+            0,
+        ),
+        "played_level_count": aggregate_subquery(
+            PlaylistItem.objects.played(), "user", Count("*"), 0
+        ),
+    }
+
+    return {
+        field: update_denormalized_field(queryset, field, value)
+        for field, value in values.items()
+    }
@@ -3,10 +3,15 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MaxLengthValidator, MinLengthValidator
 from django.db import transaction
 from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from rest_framework_simplejwt.exceptions import TokenError
 
-from trcustoms.awards.logic import get_award_rarity, get_award_user_percentage
+from trcustoms.awards.logic import (
+    AwardStats,
+    get_all_awards_stats,
+    get_award_stats,
+)
 from trcustoms.awards.models import UserAward
 from trcustoms.common.fields import CustomCharField
 from trcustoms.common.models import Country
@@ -40,11 +45,19 @@ class UserAwardSerializer(serializers.ModelSerializer):
     rarity = serializers.SerializerMethodField()
     user_percentage = serializers.SerializerMethodField()
 
+    @cached_property
+    def awards_stats(self) -> dict[tuple[str, int], AwardStats]:
+        return get_all_awards_stats()
+
     def get_rarity(self, instance: UserAward) -> int:
-        return get_award_rarity(instance.code, instance.tier)
+        return get_award_stats(
+            instance.code, instance.tier, self.awards_stats
+        ).rarity
 
     def get_user_percentage(self, instance: UserAward) -> int:
-        return get_award_user_percentage(instance.code, instance.tier)
+        return get_award_stats(
+            instance.code, instance.tier, self.awards_stats
+        ).user_percentage
 
     class Meta:
         model = UserAward
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Any
 
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.http import FileResponse
 from rest_framework import status
 
@@ -90,6 +91,12 @@ def parse_ints(source: str | None) -> list[int]:
         return []
 
 
+def parse_list(source: str | None) -> list[str]:
+    if not source:
+        return []
+    return [item.strip() for item in source.split(",") if item.strip()]
+
+
 def parse_bool(source: str | None) -> bool | None:
     if not source:
         return None
@@ -138,3 +145,45 @@ def check_model_references(obj: models.Model):
         if has_reverse_one_to_one or has_reverse_other:
             return True
     return False
+
+
+class IsDistinctFrom(models.Func):  # pylint: disable=abstract-method
+    """NULL-safe inequality check, usable directly in filter()."""
+
+    arg_joiner = " IS DISTINCT FROM "
+    template = "%(expressions)s"
+    output_field = models.BooleanField()
+
+
+def aggregate_subquery(
+    queryset: models.QuerySet,
+    outer_field: str,
+    aggregate: models.Aggregate,
+    default: Any = None,
+) -> models.Expression:
+    """Build a correlated subquery aggregating queryset rows that point to
+    the outer row through outer_field.
+    """
+    subquery = models.Subquery(
+        queryset.filter(**{outer_field: models.OuterRef("pk")})
+        .order_by()
+        .values(outer_field)
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    if default is None:
+        return subquery
+    return Coalesce(subquery, models.Value(default))
+
+
+def update_denormalized_field(
+    queryset: models.QuerySet, field: str, value: models.Expression
+) -> int:
+    """Recalculate a denormalized field with a single UPDATE statement.
+
+    Only rows whose stored value differs from the new one are written.
+    Returns the number of changed rows.
+    """
+    return queryset.filter(IsDistinctFrom(models.F(field), value)).update(
+        **{field: value}
+    )
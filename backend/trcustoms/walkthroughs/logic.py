@@ -10,7 +10,7 @@ from trcustoms.mails import (
     send_walkthrough_rejected_mail,
     send_walkthrough_submission_mail,
 )
-from trcustoms.tasks import update_awards
+from trcustoms.tasks import schedule_award_updates
 from trcustoms.walkthroughs.consts import WalkthroughStatus
 from trcustoms.walkthroughs.models import Walkthrough
 
@@ -44,7 +44,7 @@ def approve_walkthrough(
         walkthrough.status = WalkthroughStatus.APPROVED
         walkthrough.rejection_reason = None
         walkthrough.save()
-        update_awards.delay(walkthrough.author.pk)
+        schedule_award_updates(walkthrough.author.pk)
     clear_audit_log_action_flags(obj=walkthrough)
 
 
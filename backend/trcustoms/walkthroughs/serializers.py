@@ -6,7 +6,7 @@ from trcustoms.common.fields import CustomCharField
 from trcustoms.levels.models import Level
 from trcustoms.levels.serializers import LevelNestedSerializer
 from trcustoms.mails import send_walkthrough_update_mail
-from trcustoms.tasks import update_awards
+from trcustoms.tasks import schedule_award_updates
 from trcustoms.users.serializers import UserNestedSerializer
 from trcustoms.walkthroughs.consts import WalkthroughStatus, WalkthroughType
 from trcustoms.walkthroughs.models import Walkthrough
@@ -115,7 +115,7 @@ class WalkthroughDetailsSerializer(WalkthroughListingSerializer):
 
         walkthrough = walkthrough_factory()
         walkthrough.save()
-        update_awards.delay(walkthrough.author.pk)
+        schedule_award_updates(walkthrough.author.pk)
         return walkthrough
 
     def update(self, instance, validated_data):
@@ -132,7 +132,7 @@ class WalkthroughDetailsSerializer(WalkthroughListingSerializer):
 
         if walkthrough.status == WalkthroughStatus.APPROVED:
             send_walkthrough_update_mail(walkthrough)
-        update_awards.delay(walkthrough.author.pk)
+        schedule_award_updates(walkthrough.author.pk)
         return walkthrough
 
 
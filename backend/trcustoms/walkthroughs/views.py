@@ -6,6 +6,7 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from trcustoms.common.pagination import KeysetPagination
 from trcustoms.mixins import (
     AuditLogModelWatcherMixin,
     MultiSerializerMixin,
@@ -92,6 +93,7 @@ class WalkthroughViewSet(
         ],
     }
 
+    pagination_class = KeysetPagination
     serializer_class = WalkthroughListingSerializer
     serializer_class_by_action = {
         "create": WalkthroughDetailsSerializer,